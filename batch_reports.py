@@ -0,0 +1,195 @@
+"""
+Batch Reports Module - DERIVATIVES ONLY
+Render metrics, charts and HTML reports for a whole client roster across a bounded process pool
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from config import BATCH_OUTPUT_DIR, BATCH_WORKERS
+from data_processor import TradingDataProcessor
+from instrumentation import json_default
+from run_context import DashboardContext
+from trading_data import TRADING_METADATA
+from visualizer import TradingVisualizer
+from report_generator import ReportGenerator, REPORT_SECTIONS
+
+# Roster reports skip the platform screenshots, which only exist for the primary account
+BATCH_REPORT_SECTIONS = [name for name in REPORT_SECTIONS if name != 'generate_kotak_screenshots_section']
+
+# Accounts queued per worker; bounds the futures held for very large rosters
+_IN_FLIGHT_PER_WORKER = 2
+
+
+def load_roster(path):
+    """
+    Read a roster JSON file: a list of accounts (or {"accounts": [...]}), each with a
+    unique client_code and one P&L source - monthly_pnl, contract_note or pnl_store -
+    plus optional open_positions ({contract name: signed quantity}) for the Greeks and
+    TRADING_METADATA fields (financial_year, client_name, ...) for the report header.
+    """
+    with open(path, encoding='utf-8') as f:
+        roster = json.load(f)
+    accounts = roster['accounts'] if isinstance(roster, dict) else roster
+    
+    codes = [account.get('client_code') for account in accounts]
+    if None in codes or len(set(codes)) != len(codes):
+        raise ValueError("Every roster account needs a unique client_code")
+    return accounts
+
+
+def _account_monthly_pnl(account):
+    """Monthly P&L dict for a roster account from whichever source it names"""
+    if 'monthly_pnl' in account:
+        return account['monthly_pnl']
+    if 'contract_note' in account:
+        from trade_ingestion import aggregate_monthly_pnl
+        return aggregate_monthly_pnl(account['contract_note'], account.get('financial_year'))
+    if 'pnl_store' in account:
+        from pnl_store import PnLStore
+        return PnLStore(account['pnl_store']).monthly_pnl(account['client_code'], account['financial_year'])
+    raise ValueError(f"Account {account['client_code']} has no monthly_pnl, contract_note or pnl_store source")
+
+
+def render_account(account, output_root=None):
+    """
+    Metrics, charts and report for one account in its own directory.
+    Never raises: failures come back as a result record so the batch carries on.
+    """
+    output_root = output_root or BATCH_OUTPUT_DIR
+    client_code = account['client_code']
+    account_dir = os.path.join(output_root, str(client_code))
+    start = time.perf_counter()
+    
+    try:
+        monthly_pnl = _account_monthly_pnl(account)
+        processor = TradingDataProcessor(monthly_pnl, account.get('months') or list(monthly_pnl))
+        # The account's own FY, client name, etc. head its report; the rest falls back to TRADING_METADATA
+        overrides = {key: account[key] for key in TRADING_METADATA if account.get(key) is not None}
+        context = DashboardContext(processor=processor, open_positions=account.get('open_positions', {}),
+                                   account=client_code, metadata=overrides)
+        
+        # Per-chart progress lines from hundreds of workers would only interleave
+        with contextlib.redirect_stdout(io.StringIO()):
+            visualizer = TradingVisualizer(charts_dir=os.path.join(account_dir, 'charts'), context=context)
+            visualizer.generate_all_visualizations(workers=1)
+            report_file = ReportGenerator(context, output_dir=account_dir).generate_full_report(BATCH_REPORT_SECTIONS)
+        
+        seconds = time.perf_counter() - start
+        metadata = {
+            'client_code': client_code,
+            'client_name': account.get('client_name'),
+            'financial_year': account.get('financial_year'),
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'render_seconds': seconds,
+            'report': os.path.basename(report_file),
+            'metrics': context.metrics,
+            'significance': context.significance
+        }
+        with open(os.path.join(account_dir, 'account.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, default=json_default)
+        
+        return {'client_code': client_code, 'status': 'ok', 'report': report_file, 'seconds': seconds}
+    
+    except Exception as e:
+        return {
+            'client_code': client_code,
+            'status': 'failed',
+            'error': f"{type(e).__name__}: {e}",
+            'traceback': traceback.format_exc(),
+            'seconds': time.perf_counter() - start
+        }
+
+
+def _crashed(account, error):
+    """Result record for an account lost with a worker process that died"""
+    return {'client_code': account['client_code'], 'status': 'failed',
+            'error': f"Worker process terminated abruptly ({type(error).__name__})", 'seconds': None}
+
+
+def _run_in_pool(accounts, output_root, workers, on_result):
+    """Feed accounts through a process pool with at most workers * _IN_FLIGHT_PER_WORKER queued"""
+    position = 0
+    while position < len(accounts):
+        # A crashed worker breaks the whole pool: its in-flight accounts fail, a fresh pool continues
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            while position < len(accounts) or pending:
+                while position < len(accounts) and len(pending) < workers * _IN_FLIGHT_PER_WORKER:
+                    account = accounts[position]
+                    pending[pool.submit(render_account, account, output_root)] = account
+                    position += 1
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                broken = None
+                for future in done:
+                    account = pending.pop(future)
+                    try:
+                        on_result(future.result())
+                    except BrokenProcessPool as e:
+                        broken = e
+                        on_result(_crashed(account, e))
+                
+                if broken is not None:
+                    for account in pending.values():
+                        on_result(_crashed(account, broken))
+                    break
+
+
+def run_batch(accounts, output_root=None, workers=None):
+    """Render every roster account; returns the batch summary (also saved as batch_summary.json)"""
+    output_root = output_root or BATCH_OUTPUT_DIR
+    workers = BATCH_WORKERS if workers is None else workers
+    os.makedirs(output_root, exist_ok=True)
+    
+    results = []
+    start = time.perf_counter()
+    
+    def on_result(result):
+        results.append(result)
+        mark = '✓' if result['status'] == 'ok' else '✗'
+        detail = f"{result['seconds']:.2f}s" if result['status'] == 'ok' else result['error']
+        print(f"{mark} [{len(results)}/{len(accounts)}] {result['client_code']}: {detail}")
+    
+    if workers > 1 and len(accounts) > 1:
+        _run_in_pool(accounts, output_root, workers, on_result)
+    else:
+        for account in accounts:
+            on_result(render_account(account, output_root))
+    
+    elapsed = time.perf_counter() - start
+    failed = [result for result in results if result['status'] != 'ok']
+    summary = {
+        'accounts': len(results),
+        'succeeded': len(results) - len(failed),
+        'failed': len(failed),
+        'workers': workers,
+        'elapsed_seconds': elapsed,
+        'accounts_per_minute': len(results) / elapsed * 60 if elapsed > 0 else 0,
+        'results': results
+    }
+    with open(os.path.join(output_root, 'batch_summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    
+    return summary
+
+
+def print_batch_summary(summary):
+    """Print throughput and failures of a batch run"""
+    print("\n" + "=" * 80)
+    print("BATCH REPORT SUMMARY")
+    print("=" * 80)
+    print(f"   Accounts: {summary['accounts']} ({summary['succeeded']} succeeded, {summary['failed']} failed)")
+    print(f"   Workers: {summary['workers']}")
+    print(f"   Elapsed: {summary['elapsed_seconds']:.1f}s")
+    print(f"   Throughput: {summary['accounts_per_minute']:.1f} accounts/min")
+    for result in summary['results']:
+        if result['status'] != 'ok':
+            print(f"   ❌ {result['client_code']}: {result['error']}")
+    print("=" * 80)
\ No newline at end of file
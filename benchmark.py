@@ -0,0 +1,343 @@
+"""
+Benchmark Script - DERIVATIVES ONLY
+Time each dashboard pipeline stage on synthetic data and flag regressions against a baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import matplotlib
+from config import CONTRACT_NOTE_COLUMNS, METRICS_STARTUP_BUDGET_SECONDS, FIGURE_TEMPLATES
+from fy_calendar import FY_MONTHS
+
+# Timings below this many seconds are treated as noise when comparing to a baseline
+NOISE_FLOOR_SECONDS = 0.005
+
+# Processor summaries timed once per backend
+PROCESSOR_SUMMARIES = ('get_segment_summary', 'get_quarterly_summary', 'get_trading_style_summary',
+                       'get_best_worst_months', 'calculate_drawdown')
+
+# Further accounts charted after the first, for the figure-template comparison
+SUCCESSIVE_ACCOUNTS = 5
+
+# Option contracts quoted in the synthetic tick feed
+TICK_CONTRACTS = 40
+
+# Libraries the metrics-only entry point must not import
+HEAVY_MODULES = ('pandas', 'matplotlib', 'seaborn')
+
+
+def make_period_labels(periods):
+    """FY month names while they last, then generic period labels"""
+    if periods <= len(FY_MONTHS):
+        return FY_MONTHS[:periods]
+    return [f"P{i + 1:04d}" for i in range(periods)]
+
+
+def make_synthetic_pnl(periods, accounts, seed=0):
+    """(accounts x periods) matrix of whole-rupee P&L with some flat periods"""
+    rng = np.random.default_rng(seed)
+    pnl = np.rint(rng.normal(1500, 8000, size=(accounts, periods))).astype(np.int64)
+    pnl[rng.random(pnl.shape) < 0.1] = 0
+    return pnl
+
+
+def write_synthetic_contract_note(path, fills, seed=0):
+    """Contract note CSV with `fills` random option fills across FY 2025-26"""
+    rng = np.random.default_rng(seed)
+    cols = CONTRACT_NOTE_COLUMNS
+    days = np.datetime64('2025-04-01') + rng.integers(0, 365, fills).astype('timedelta64[D]')
+    seconds = rng.integers(9 * 3600 + 15 * 60, 15 * 3600 + 30 * 60, fills)
+    
+    frame = pd.DataFrame({
+        cols['trade_date']: pd.to_datetime(days).strftime('%d-%m-%Y'),
+        cols['trade_time']: [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in seconds.tolist()],
+        cols['symbol']: rng.choice(['NIFTY 25000 CE', 'NIFTY 24800 PE', 'SENSEX 82000 CE', 'SENSEX 81500 PE'], fills),
+        cols['side']: rng.choice(['B', 'S'], fills),
+        cols['quantity']: rng.choice([25, 50, 75, 20, 40], fills),
+        cols['price']: np.round(rng.uniform(20, 400, fills), 2),
+        cols['charges']: np.round(rng.uniform(5, 40, fills), 2)
+    })
+    frame.to_csv(path, index=False)
+
+
+def make_synthetic_ticks(ticks, contracts=TICK_CONTRACTS, seed=0):
+    """
+    Chronological random-walk option prices over one session, plus one opening fill
+    per contract so every tick moves the book MTM. Returns (ticks, fills, contract names);
+    the names sort in code order, so a fresh PositionBook interns them to the feed's codes.
+    """
+    from mtm_engine import TICK_DTYPE
+    from trade_ingestion import FILL_DTYPE
+    rng = np.random.default_rng(seed)
+    session_open = np.datetime64('2025-10-14T09:15:00', 'ms')
+    
+    feed = np.empty(ticks, dtype=TICK_DTYPE)
+    feed['timestamp'] = session_open + np.sort(rng.integers(1, 375 * 60 * 1000, ticks)).astype('timedelta64[ms]')
+    feed['symbol'] = rng.integers(0, contracts, ticks)
+    feed['price'] = 200 + np.abs(rng.normal(0, 0.05, ticks).cumsum())
+    
+    fills = np.zeros(contracts, dtype=FILL_DTYPE)
+    fills['timestamp'] = session_open.astype('datetime64[s]')
+    fills['symbol'] = np.arange(contracts)
+    fills['side'] = rng.choice([1, -1], contracts)
+    fills['quantity'] = rng.choice([25, 50, 75], contracts)
+    fills['price'] = 200
+    return feed, fills, [f"NIFTY {24000 + 50 * i} CE" for i in range(contracts)]
+
+
+def measure(func, repeat):
+    """Best wall time over `repeat` runs, plus peak traced allocation of one extra run"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {'seconds': min(times), 'peak_mb': peak / (1024 * 1024)}
+
+
+def measure_cold_start(repeat):
+    """Fresh-interpreter wall time of `main.py --metrics-only --json`, plus any heavy modules it imported"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    args = [os.path.join(here, 'main.py'), '--metrics-only', '--json']
+    
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=here, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    
+    # One extra run under -X importtime lists every module the path pulled in
+    trace = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=here, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    imported = {line.rsplit('|', 1)[-1].strip() for line in trace.splitlines() if line.startswith('import time:')}
+    
+    return {'seconds': min(times), 'peak_mb': None, 'heavy_modules': sorted(imported.intersection(HEAVY_MODULES))}
+
+
+def report_footprint(output_dir, chart_format):
+    """Files and bytes a report needs on disk: the HTML plus any chart files it references"""
+    paths = [os.path.join(output_dir, 'Derivatives_Trading_Report.html')]
+    if chart_format != 'svg':
+        charts_dir = os.path.join(output_dir, 'charts')
+        paths += [os.path.join(charts_dir, name) for name in sorted(os.listdir(charts_dir)) if name.endswith(f'.{chart_format}')]
+    return {'files': len(paths), 'bytes': sum(os.path.getsize(path) for path in paths)}
+
+
+def run_benchmarks(periods, accounts, fills, ticks, repeat, workdir):
+    """Run every pipeline stage and return {stage: {'seconds', 'peak_mb'}}"""
+    from trade_ingestion import aggregate_monthly_pnl, load_contract_note
+    from trade_analytics import TradeAnalytics
+    from data_processor import TradingDataProcessor, PROCESSOR_BACKENDS
+    from analytics import TradingAnalytics
+    from resampling import ResamplingAnalytics
+    from mtm_engine import PositionBook, replay
+    from run_context import DashboardContext
+    from visualizer import TradingVisualizer, CHART_TASKS, CHART_FORMATS
+    from report_generator import ReportGenerator
+    
+    results = {'metrics_only_cold_start': measure_cold_start(repeat)}
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    
+    note_path = os.path.join(workdir, 'contract_note.csv')
+    write_synthetic_contract_note(note_path, fills)
+    results['ingestion'] = measure(lambda: aggregate_monthly_pnl(note_path), repeat)
+    
+    fills = load_contract_note(note_path).fills
+    results['trade_metrics'] = measure(lambda: TradeAnalytics(fills).calculate_trade_metrics(), repeat)
+    
+    # Intraday MTM: opening fills, then the whole tick feed marked in batches
+    tick_feed, opening_fills, contracts = make_synthetic_ticks(ticks)
+    results['mtm_replay'] = measure(lambda: replay(PositionBook(), [tick_feed], opening_fills, contracts), repeat)
+    
+    labels = make_period_labels(periods)
+    matrix = make_synthetic_pnl(periods, accounts)
+    monthly_pnl = dict(zip(labels, matrix[0].tolist()))
+    
+    def build_frame():
+        processor = TradingDataProcessor(monthly_pnl, labels)
+        processor.create_monthly_dataframe()
+    results['create_monthly_dataframe'] = measure(build_frame, repeat)
+    
+    def processor_summaries(backend):
+        processor = TradingDataProcessor(monthly_pnl, labels, backend=backend)
+        for method_name in PROCESSOR_SUMMARIES:
+            getattr(processor, method_name)()
+    for backend in PROCESSOR_BACKENDS:
+        results[f'processor_summaries[{backend}]'] = measure(lambda: processor_summaries(backend), repeat)
+    
+    analytics = TradingAnalytics(TradingDataProcessor(monthly_pnl, labels))
+    results['calculate_all_metrics'] = measure(analytics.calculate_all_metrics, repeat)
+    results['calculate_batch_metrics'] = measure(lambda: TradingAnalytics.calculate_batch_metrics(matrix), repeat)
+    
+    significance = ResamplingAnalytics.from_processor(TradingDataProcessor(monthly_pnl, labels))
+    results['calculate_significance'] = measure(significance.calculate_significance, repeat)
+    
+    charts_dir = os.path.join(workdir, 'charts')
+    os.makedirs(charts_dir, exist_ok=True)
+    context = DashboardContext(monthly_pnl, labels)
+    visualizer = TradingVisualizer(charts_dir=charts_dir, context=context)
+    for method_name, _, _ in CHART_TASKS:
+        results[method_name] = measure(getattr(visualizer, method_name), repeat)
+    
+    report = ReportGenerator(context, output_dir=workdir)
+    with quiet:
+        results['generate_full_report'] = measure(report.generate_full_report, repeat)
+    
+    # Chart files referenced by the report vs vector charts inlined into it, rendered uncached
+    for chart_format in CHART_FORMATS:
+        format_dir = os.path.join(workdir, chart_format)
+        format_visualizer = TradingVisualizer(charts_dir=os.path.join(format_dir, 'charts'), context=context, chart_format=chart_format)
+        format_report = ReportGenerator(context, output_dir=format_dir, chart_format=chart_format)
+        
+        def charts_and_report():
+            format_visualizer.generate_all_visualizations(workers=1, use_cache=False)
+            format_report.generate_full_report()
+        with quiet:
+            result = measure(charts_and_report, repeat)
+        result.update(report_footprint(format_dir, chart_format))
+        results[f'charts_and_report[{chart_format}]'] = result
+    
+    # Charts for further accounts: every figure built from scratch vs pooled templates with only data updated
+    next_visualizers = [TradingVisualizer(charts_dir=charts_dir, context=DashboardContext(dict(zip(labels, row)), labels))
+                        for row in matrix[1:1 + SUCCESSIVE_ACCOUNTS].tolist()]
+    
+    def chart_next_accounts():
+        for next_visualizer in next_visualizers:
+            for method_name, _, _ in CHART_TASKS:
+                getattr(next_visualizer, method_name)()
+    
+    enabled = FIGURE_TEMPLATES['enabled']
+    try:
+        for mode, use_templates in (('fresh', False), ('templates', True)):
+            FIGURE_TEMPLATES['enabled'] = use_templates
+            results[f'charts_next_{len(next_visualizers)}_accounts[{mode}]'] = measure(chart_next_accounts, repeat)
+    finally:
+        FIGURE_TEMPLATES['enabled'] = enabled
+    
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Stages slower than baseline * (1 + tolerance), ignoring sub-noise-floor changes"""
+    regressions = []
+    for stage, current in results['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if previous is None:
+            continue
+        limit = previous['seconds'] * (1 + tolerance)
+        if current['seconds'] > limit and current['seconds'] - previous['seconds'] > NOISE_FLOOR_SECONDS:
+            regressions.append((stage, previous['seconds'], current['seconds']))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    """Print a per-stage timing/memory table"""
+    print("=" * 80)
+    print(f"{'Stage':<40}{'Time (ms)':>12}{'Peak (MB)':>12}{'vs base':>12}")
+    print("-" * 80)
+    for stage, value in results['stages'].items():
+        change = ''
+        previous = (baseline or {}).get('stages', {}).get(stage)
+        if previous and previous['seconds'] > 0:
+            change = f"{(value['seconds'] / previous['seconds'] - 1) * 100:+.0f}%"
+        peak = f"{value['peak_mb']:.2f}" if value['peak_mb'] is not None else '-'
+        print(f"{stage:<40}{value['seconds'] * 1000:>12.2f}{peak:>12}{change:>12}")
+    print("=" * 80)
+    
+    footprints = {stage: value for stage, value in results['stages'].items() if 'bytes' in value}
+    if footprints:
+        print(f"{'Report on disk':<40}{'Files':>12}{'KB':>12}")
+        print("-" * 80)
+        for stage, value in footprints.items():
+            print(f"{stage:<40}{value['files']:>12}{value['bytes'] / 1024:>12.1f}")
+        print("=" * 80)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the derivatives dashboard pipeline')
+    parser.add_argument('--periods', type=int, default=12, help='P&L periods per account')
+    parser.add_argument('--accounts', type=int, default=500, help='accounts in the batch metrics matrix')
+    parser.add_argument('--fills', type=int, default=200000, help='fills in the synthetic contract note')
+    parser.add_argument('--ticks', type=int, default=1000000, help='ticks in the synthetic intraday feed')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage (best is kept)')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown vs baseline (0.25 = 25%%)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        stages = run_benchmarks(args.periods, args.accounts, args.fills, args.ticks, args.repeat, workdir)
+    
+    results = {
+        'config': {'periods': args.periods, 'accounts': args.accounts, 'fills': args.fills, 'ticks': args.ticks,
+                   'repeat': args.repeat},
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'matplotlib': matplotlib.__version__,
+            'machine': platform.machine()
+        },
+        'stages': stages
+    }
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('config') != results['config']:
+            print("⚠️ Baseline was recorded with a different scale; comparison may be misleading")
+    
+    print_results(results, baseline)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+    
+    status = 0
+    cold_start = stages['metrics_only_cold_start']
+    if cold_start['seconds'] > METRICS_STARTUP_BUDGET_SECONDS:
+        print(f"\n❌ Metrics-only cold start {cold_start['seconds']:.3f}s exceeds the {METRICS_STARTUP_BUDGET_SECONDS:.2f}s budget")
+        status = 1
+    if cold_start['heavy_modules']:
+        print(f"\n❌ Metrics-only path imported {', '.join(cold_start['heavy_modules'])}")
+        status = 1
+    
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}:")
+            for stage, before, after in regressions:
+                print(f"   {stage}: {before * 1000:.2f}ms → {after * 1000:.2f}ms")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
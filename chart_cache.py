@@ -0,0 +1,94 @@
+"""
+Chart Cache Module - DERIVATIVES ONLY
+Content-addressed on-disk cache of rendered charts
+"""
+
+import hashlib
+import os
+import shutil
+import time
+from config import CHART_CACHE
+
+
+class ChartCache:
+    """Reuse rendered chart files whose inputs have not changed"""
+    
+    def __init__(self, cache_dir=None, max_bytes=None, max_age_days=None):
+        self.cache_dir = cache_dir or CHART_CACHE['dir']
+        self.max_bytes = CHART_CACHE['max_bytes'] if max_bytes is None else max_bytes
+        self.max_age_days = CHART_CACHE['max_age_days'] if max_age_days is None else max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(*parts):
+        """Hash arbitrary key material (str or bytes) into a cache key"""
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part if isinstance(part, bytes) else str(part).encode('utf-8')
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+        return digest.hexdigest()
+    
+    def _entry_path(self, key, filename):
+        return os.path.join(self.cache_dir, f"{key}{os.path.splitext(filename)[1]}")
+    
+    def fetch(self, key, dest_path):
+        """Copy a cached chart to dest_path; return False on a miss"""
+        entry = self._entry_path(key, dest_path)
+        try:
+            shutil.copyfile(entry, dest_path)
+            os.utime(entry)  # Mark as recently used for eviction
+        except FileNotFoundError:
+            # Absent, or evicted by another process sharing the cache
+            self.misses += 1
+            return False
+        
+        self.hits += 1
+        return True
+    
+    def store(self, key, src_path):
+        """Add a freshly rendered chart to the cache"""
+        entry = self._entry_path(key, src_path)
+        tmp_path = f"{entry}.{os.getpid()}.tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, entry)
+    
+    def evict(self):
+        """Drop entries older than max_age_days, then least recently used ones over max_bytes"""
+        cutoff = time.time() - self.max_age_days * 86400
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                # Skip in-flight writes from other processes sharing the cache
+                if not entry.is_file() or entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime < cutoff:
+                    self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+    
+    def _remove(self, path):
+        """Delete an entry, tolerating another process having removed it first"""
+        try:
+            os.remove(path)
+            self.evicted += 1
+        except FileNotFoundError:
+            pass
+    
+    def report(self):
+        """Hit/miss/eviction counts for this run"""
+        return {'hits': self.hits, 'misses': self.misses, 'evicted': self.evicted}
\ No newline at end of file
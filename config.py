@@ -1,264 +1,401 @@
-"""
-Configuration file for Trading Dashboard
-Color schemes, output paths, and styling settings
-"""
-
-import os
-
-# Output directories
-OUTPUT_DIR = 'output'
-CHARTS_DIR = os.path.join(OUTPUT_DIR, 'charts')
-REPORT_DIR = OUTPUT_DIR
-
-# Create directories if they don't exist
-os.makedirs(CHARTS_DIR, exist_ok=True)
-os.makedirs(REPORT_DIR, exist_ok=True)
-
-# Month ordering (FY 2024-25: Apr to Oct)
-MONTHS_ORDER = ['Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct']
-
-# Quarter definitions
-QUARTERS = {
-    'Q1': ['Apr', 'May', 'Jun'],
-    'Q2': ['Jul', 'Aug', 'Sep'],
-    'Q3': ['Oct']  # Only October so far
-}
-
-# Color scheme
-COLORS = {
-    'profit': '#10b981',  # Green
-    'loss': '#ef4444',  # Red
-    'systematic': '#10b981',  # Green
-    'learning': '#f59e0b',  # Orange/Yellow
-    'neutral': '#6b7280',  # Gray
-    'kotak_derivative': '#3b82f6',  # Blue
-    'background': '#1f2937',  # Dark gray
-    'text': '#f9fafb',  # Light gray
-    'grid': '#374151'  # Medium gray
-}
-
-# Chart styling
-CHART_STYLE = {
-    'figure_size': (14, 8),
-    'dpi': 100,
-    'font_size': 10,
-    'title_size': 14,
-    'label_size': 11,
-    'legend_size': 9,
-    'background_color': '#1f2937',
-    'text_color': '#f9fafb',
-    'grid_color': '#374151',
-    'grid_alpha': 0.3
-}
-
-# Report styling
-HTML_STYLE = """
-<style>
-    * {
-        margin: 0;
-        padding: 0;
-        box-sizing: border-box;
-    }
-    
-    body {
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        background: linear-gradient(135deg, #1f2937 0%, #111827 100%);
-        color: #f9fafb;
-        padding: 20px;
-        line-height: 1.6;
-    }
-    
-    .container {
-        max-width: 1400px;
-        margin: 0 auto;
-        background: #1f2937;
-        padding: 40px;
-        border-radius: 20px;
-        box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
-    }
-    
-    .header {
-        text-align: center;
-        margin-bottom: 40px;
-        padding-bottom: 30px;
-        border-bottom: 3px solid #10b981;
-    }
-    
-    .header h1 {
-        font-size: 3em;
-        background: linear-gradient(135deg, #10b981, #3b82f6);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 10px;
-    }
-    
-    .header p {
-        font-size: 1.2em;
-        color: #9ca3af;
-    }
-    
-    .summary-cards {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-        gap: 20px;
-        margin-bottom: 40px;
-    }
-    
-    .card {
-        background: #374151;
-        padding: 25px;
-        border-radius: 15px;
-        border-left: 4px solid;
-        transition: transform 0.3s ease;
-    }
-    
-    .card:hover {
-        transform: translateY(-5px);
-    }
-    
-    .card.profit { border-color: #10b981; }
-    .card.loss { border-color: #ef4444; }
-    .card.info { border-color: #3b82f6; }
-    .card.warning { border-color: #f59e0b; }
-    
-    .card h3 {
-        font-size: 0.9em;
-        color: #9ca3af;
-        margin-bottom: 10px;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    .card .value {
-        font-size: 2em;
-        font-weight: bold;
-        margin-bottom: 5px;
-    }
-    
-    .card .subtitle {
-        font-size: 0.85em;
-        color: #6b7280;
-    }
-    
-    .section {
-        margin-bottom: 50px;
-    }
-    
-    .section h2 {
-        font-size: 2em;
-        margin-bottom: 20px;
-        color: #10b981;
-        border-bottom: 2px solid #374151;
-        padding-bottom: 10px;
-    }
-    
-    .chart-container {
-        background: #374151;
-        padding: 30px;
-        border-radius: 15px;
-        margin-bottom: 30px;
-        text-align: center;
-    }
-    
-    .chart-container img {
-        max-width: 100%;
-        height: auto;
-        border-radius: 10px;
-    }
-    
-    .insights-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-        gap: 30px;
-        margin-top: 30px;
-    }
-    
-    .insight-box {
-        background: #374151;
-        padding: 25px;
-        border-radius: 15px;
-    }
-    
-    .insight-box h3 {
-        color: #10b981;
-        margin-bottom: 15px;
-        font-size: 1.3em;
-    }
-    
-    .insight-box ul {
-        list-style: none;
-        padding-left: 0;
-    }
-    
-    .insight-box li {
-        padding: 10px 0;
-        border-bottom: 1px solid #4b5563;
-    }
-    
-    .insight-box li:last-child {
-        border-bottom: none;
-    }
-    
-    .metric-table {
-        width: 100%;
-        border-collapse: collapse;
-        margin-top: 20px;
-        background: #374151;
-        border-radius: 10px;
-        overflow: hidden;
-    }
-    
-    .metric-table th {
-        background: #1f2937;
-        padding: 15px;
-        text-align: left;
-        color: #10b981;
-        font-weight: bold;
-    }
-    
-    .metric-table td {
-        padding: 15px;
-        border-bottom: 1px solid #4b5563;
-    }
-    
-    .metric-table tr:last-child td {
-        border-bottom: none;
-    }
-    
-    .highlight-box {
-        background: linear-gradient(135deg, rgba(16, 185, 129, 0.1), rgba(59, 130, 246, 0.1));
-        border: 2px solid #10b981;
-        padding: 30px;
-        border-radius: 15px;
-        margin: 30px 0;
-    }
-    
-    .highlight-box h3 {
-        color: #10b981;
-        font-size: 1.5em;
-        margin-bottom: 15px;
-    }
-    
-    .footer {
-        text-align: center;
-        margin-top: 50px;
-        padding-top: 30px;
-        border-top: 2px solid #374151;
-        color: #6b7280;
-    }
-    
-    @media print {
-        body {
-            background: white;
-            color: black;
-        }
-        .container {
-            box-shadow: none;
-        }
-    }
-</style>
-"""
-
-# Currency formatting
-CURRENCY_SYMBOL = '₹'
-CURRENCY_FORMAT = '{:,.2f}'
\ No newline at end of file
+"""
+Configuration file for Trading Dashboard
+Color schemes, output paths, and styling settings
+"""
+
+import os
+
+# Output directories
+OUTPUT_DIR = 'output'
+CHARTS_DIR = os.path.join(OUTPUT_DIR, 'charts')
+REPORT_DIR = OUTPUT_DIR
+
+
+def ensure_output_dirs():
+    """Create the output directories; called by the steps that write there, never at import"""
+    os.makedirs(CHARTS_DIR, exist_ok=True)
+    os.makedirs(REPORT_DIR, exist_ok=True)
+
+
+# Last month covered by the dashboard; the default monthly series runs from the start of its
+# financial year through it, with months and quarters derived in fy_calendar.py
+REPORTING_THROUGH = '2025-10'
+
+# NSE trading holidays falling on weekdays (from the exchange's annual circulars); trading days
+# are the weekdays less these, and a weekly expiry on a holiday moves to the previous trading day
+MARKET_HOLIDAYS = [
+    '2025-04-10', '2025-04-14', '2025-04-18', '2025-05-01', '2025-08-15', '2025-08-27',
+    '2025-10-02', '2025-10-21', '2025-10-22', '2025-11-05', '2025-12-25', '2026-01-26'
+]
+
+# Color scheme
+COLORS = {
+    'profit': '#10b981',  # Green
+    'loss': '#ef4444',  # Red
+    'systematic': '#10b981',  # Green
+    'learning': '#f59e0b',  # Orange/Yellow
+    'neutral': '#6b7280',  # Gray
+    'kotak_derivative': '#3b82f6',  # Blue
+    'background': '#1f2937',  # Dark gray
+    'text': '#f9fafb',  # Light gray
+    'grid': '#374151'  # Medium gray
+}
+
+# Chart styling
+CHART_STYLE = {
+    'figure_size': (14, 8),
+    'dpi': 100,
+    'font_size': 10,
+    'title_size': 14,
+    'label_size': 11,
+    'legend_size': 9,
+    'background_color': '#1f2937',
+    'text_color': '#f9fafb',
+    'grid_color': '#374151',
+    'grid_alpha': 0.3
+}
+
+# Columnar P&L history store, partitioned by client code and financial year
+PNL_STORE_DIR = 'pnl_store'
+
+# Checkpoint of the incremental P&L engine state
+PNL_STATE_CHECKPOINT = os.path.join(OUTPUT_DIR, 'pnl_state.json')
+
+# Rolling-window lengths (periods) for risk monitoring, and the window charted
+# on the short monthly series
+ROLLING_WINDOWS = [20, 60, 250]
+ROLLING_CHART_WINDOW = 3
+
+# Cold-start budget for `main.py --metrics-only` (interpreter start to metrics printed)
+METRICS_STARTUP_BUDGET_SECONDS = 0.75
+
+# TradingDataProcessor summaries: 'pandas' (DataFrame) or 'numpy' (structured arrays + bincount)
+PROCESSOR_BACKEND = 'numpy'
+
+# Write buffer for the streaming HTML report writer (bytes)
+REPORT_WRITE_BUFFER = 64 * 1024
+
+# Batch (roster) reports: one directory per account under BATCH_OUTPUT_DIR
+BATCH_OUTPUT_DIR = os.path.join(OUTPUT_DIR, 'accounts')
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+
+# Chart output: 'png' (files under charts/, referenced by the report) or
+# 'svg' (vector charts inlined into the single HTML report)
+CHART_FORMAT = 'png'
+
+# Resampling significance tests (see resampling.py): draws per test, generated in chunks to
+# bound memory and optionally across worker processes; results do not depend on the worker count
+RESAMPLING = {
+    'resamples': 100000,
+    'chunk_size': 10000,
+    'confidence': 0.95,
+    'seed': 2025,
+    'workers': 1
+}
+
+# Live dashboard server (main.py --serve): metrics are pushed to open pages over server-sent
+# events on every appended fill or daily P&L; charts and the report re-render in the background
+# once updates have been quiet for refresh_delay seconds
+DASHBOARD_SERVER = {
+    'host': '127.0.0.1',
+    'port': 8050,
+    'output_dir': os.path.join(OUTPUT_DIR, 'live'),
+    'refresh_delay': 2.0,
+    'keepalive_seconds': 15,
+    'max_body_bytes': 16 * 1024 * 1024
+}
+
+# Chart rendering processes (1 renders serially in-process)
+RENDER_WORKERS = 1
+
+# Styled chart figures kept per process and reused across renders (e.g. batch accounts);
+# only artist data is updated between renders. Each pooled figure keeps its ~10 MB Agg buffer
+FIGURE_TEMPLATES = {
+    'enabled': True,
+    'max_templates': 16
+}
+
+# Rendered chart cache, keyed by a hash of chart inputs, style and rendering code
+CHART_CACHE = {
+    'enabled': True,
+    'dir': os.path.join(OUTPUT_DIR, '.chart_cache'),
+    'max_bytes': 200 * 1024 * 1024,
+    'max_age_days': 30
+}
+
+# Report styling
+HTML_STYLE = """
+<style>
+    * {
+        margin: 0;
+        padding: 0;
+        box-sizing: border-box;
+    }
+    
+    body {
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        background: linear-gradient(135deg, #1f2937 0%, #111827 100%);
+        color: #f9fafb;
+        padding: 20px;
+        line-height: 1.6;
+    }
+    
+    .container {
+        max-width: 1400px;
+        margin: 0 auto;
+        background: #1f2937;
+        padding: 40px;
+        border-radius: 20px;
+        box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
+    }
+    
+    .header {
+        text-align: center;
+        margin-bottom: 40px;
+        padding-bottom: 30px;
+        border-bottom: 3px solid #10b981;
+    }
+    
+    .header h1 {
+        font-size: 3em;
+        background: linear-gradient(135deg, #10b981, #3b82f6);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        margin-bottom: 10px;
+    }
+    
+    .header p {
+        font-size: 1.2em;
+        color: #9ca3af;
+    }
+    
+    .summary-cards {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+        gap: 20px;
+        margin-bottom: 40px;
+    }
+    
+    .card {
+        background: #374151;
+        padding: 25px;
+        border-radius: 15px;
+        border-left: 4px solid;
+        transition: transform 0.3s ease;
+    }
+    
+    .card:hover {
+        transform: translateY(-5px);
+    }
+    
+    .card.profit { border-color: #10b981; }
+    .card.loss { border-color: #ef4444; }
+    .card.info { border-color: #3b82f6; }
+    .card.warning { border-color: #f59e0b; }
+    
+    .card h3 {
+        font-size: 0.9em;
+        color: #9ca3af;
+        margin-bottom: 10px;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+    }
+    
+    .card .value {
+        font-size: 2em;
+        font-weight: bold;
+        margin-bottom: 5px;
+    }
+    
+    .card .subtitle {
+        font-size: 0.85em;
+        color: #6b7280;
+    }
+    
+    .section {
+        margin-bottom: 50px;
+    }
+    
+    .section h2 {
+        font-size: 2em;
+        margin-bottom: 20px;
+        color: #10b981;
+        border-bottom: 2px solid #374151;
+        padding-bottom: 10px;
+    }
+    
+    .chart-container {
+        background: #374151;
+        padding: 30px;
+        border-radius: 15px;
+        margin-bottom: 30px;
+        text-align: center;
+    }
+    
+    .chart-container img,
+    .chart-container svg {
+        max-width: 100%;
+        height: auto;
+        border-radius: 10px;
+    }
+    
+    .insights-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
+        gap: 30px;
+        margin-top: 30px;
+    }
+    
+    .insight-box {
+        background: #374151;
+        padding: 25px;
+        border-radius: 15px;
+    }
+    
+    .insight-box h3 {
+        color: #10b981;
+        margin-bottom: 15px;
+        font-size: 1.3em;
+    }
+    
+    .insight-box ul {
+        list-style: none;
+        padding-left: 0;
+    }
+    
+    .insight-box li {
+        padding: 10px 0;
+        border-bottom: 1px solid #4b5563;
+    }
+    
+    .insight-box li:last-child {
+        border-bottom: none;
+    }
+    
+    .metric-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin-top: 20px;
+        background: #374151;
+        border-radius: 10px;
+        overflow: hidden;
+    }
+    
+    .metric-table th {
+        background: #1f2937;
+        padding: 15px;
+        text-align: left;
+        color: #10b981;
+        font-weight: bold;
+    }
+    
+    .metric-table td {
+        padding: 15px;
+        border-bottom: 1px solid #4b5563;
+    }
+    
+    .metric-table tr:last-child td {
+        border-bottom: none;
+    }
+    
+    .highlight-box {
+        background: linear-gradient(135deg, rgba(16, 185, 129, 0.1), rgba(59, 130, 246, 0.1));
+        border: 2px solid #10b981;
+        padding: 30px;
+        border-radius: 15px;
+        margin: 30px 0;
+    }
+    
+    .highlight-box h3 {
+        color: #10b981;
+        font-size: 1.5em;
+        margin-bottom: 15px;
+    }
+    
+    .footer {
+        text-align: center;
+        margin-top: 50px;
+        padding-top: 30px;
+        border-top: 2px solid #374151;
+        color: #6b7280;
+    }
+    
+    @media print {
+        body {
+            background: white;
+            color: black;
+        }
+        .container {
+            box-shadow: none;
+        }
+    }
+</style>
+"""
+
+# Currency formatting
+CURRENCY_SYMBOL = '₹'
+CURRENCY_FORMAT = '{:,.2f}'
+
+# Contract note (trade book) CSV layout - Kotak Neo export
+CONTRACT_NOTE_COLUMNS = {
+    'trade_date': 'Trade Date',
+    'trade_time': 'Trade Time',
+    'symbol': 'Scrip Name',
+    'side': 'Buy/Sell',
+    'quantity': 'Quantity',
+    'price': 'Price',
+    'charges': 'Charges'
+}
+CONTRACT_NOTE_DATE_FORMAT = '%d-%m-%Y'
+CONTRACT_NOTE_TIME_FORMAT = '%H:%M:%S'
+
+# Recorded intraday tick feed (CSV) for the mark-to-market engine
+TICK_FILE_COLUMNS = {
+    'timestamp': 'Timestamp',
+    'symbol': 'Scrip Name',
+    'price': 'LTP'
+}
+
+# Mark-to-market engine: ticks marked per batch, and whether every MTM point is kept
+# (16 bytes per tick) for the intraday drawdown and daily P&L
+MTM_ENGINE = {
+    'tick_chunk_size': 1000000,
+    'record_series': True
+}
+
+# Black-Scholes inputs for option Greeks: risk-free rate, plus spot, implied volatility and
+# weekly expiry weekday (Mon=0) per underlying. Expiries not encoded in a contract name fall on
+# the next weekly expiry, at the market close
+GREEKS = {
+    'rate': 0.065,
+    'expiry_time': '15:30',
+    'underlyings': {
+        'NIFTY': {'spot': 25000.0, 'volatility': 0.12, 'expiry_weekday': 1},
+        'SENSEX': {'spot': 82000.0, 'volatility': 0.12, 'expiry_weekday': 3}
+    }
+}
+
+# Tail risk (see tail_risk.py): VaR/Expected Shortfall confidence levels (the first is the headline
+# level for the report cards and chart), the RiskMetrics EWMA decay behind filtered historical
+# simulation, and the rolling mode's window in traded periods with the element budget per
+# partitioned chunk of windows (bounds scratch memory)
+TAIL_RISK = {
+    'confidence_levels': (0.95, 0.99),
+    'ewma_decay': 0.94,
+    'rolling_window': 250,
+    'rolling_chunk_elements': 4000000,
+    'histogram_bins': 12
+}
+
+# Rows read per chunk when streaming contract notes (bounds peak memory)
+INGEST_CHUNK_SIZE = 250000
+
+# Holding-time buckets for trade analytics: (label, upper bound in seconds; None = open-ended)
+HOLDING_TIME_BUCKETS = [
+    ('< 5 min', 5 * 60),
+    ('5-30 min', 30 * 60),
+    ('30 min - 1 hr', 60 * 60),
+    ('1 hr - 1 day', 24 * 60 * 60),
+    ('1-7 days', 7 * 24 * 60 * 60),
+    ('> 7 days', None)
+]
\ No newline at end of file
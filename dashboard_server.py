@@ -0,0 +1,548 @@
+"""
+Dashboard Server Module - DERIVATIVES ONLY
+Local asyncio HTTP server keeping metrics, charts and the report hot, with pushed metric updates
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, unquote
+import numpy as np
+from config import DASHBOARD_SERVER, CHART_FORMAT
+from data_processor import TradingDataProcessor, month_lookups
+from fy_calendar import (FY_MONTHS, FY_MONTH_CODES, REPORTING_MONTHS, financial_year_start, parse_financial_year,
+                         fy_month_index)
+from incremental_engine import IncrementalPnLState
+from instrumentation import json_default
+from mtm_engine import PositionBook
+from run_context import DashboardContext
+from trade_ingestion import FILL_DTYPE, FillStore, paise_to_rupees, _to_paise
+from trading_data import kotak_derivative, TRADING_METADATA
+
+# The live report skips the platform screenshots, which only validate the original figures
+LIVE_REPORT_SECTIONS = [
+    'generate_summary_cards',
+    'generate_executive_summary',
+    'generate_performance_charts',
+    'generate_quarterly_analysis',
+    'generate_trading_style_analysis',
+    'generate_risk_management_section',
+    'generate_tail_risk_section',
+    'generate_detailed_metrics_table',
+    'generate_significance_section',
+    'generate_key_learnings',
+    'generate_interview_highlights',
+    'generate_additional_charts'
+]
+
+# Metrics shown on the live panel of the served report: (label, metric, format)
+LIVE_PANEL_METRICS = (
+    ('Net P&L', 'total_pnl', 'currency'),
+    ('Win Rate', 'win_rate', 'percent'),
+    ('Profit Factor', 'profit_factor', 'ratio'),
+    ('Max Drawdown', 'max_drawdown', 'currency'),
+    ('Sharpe Ratio', 'sharpe_ratio', 'ratio'),
+    ('Months Traded', 'total_months_traded', 'count')
+)
+
+# (method, path) -> handler; /charts/<file> and /events are matched separately
+_ROUTES = {
+    ('GET', '/'): '_get_report',
+    ('GET', '/report'): '_get_report',
+    ('GET', '/api/metrics'): '_get_metrics',
+    ('GET', '/api/monthly'): '_get_monthly',
+    ('GET', '/api/state'): '_get_state',
+    ('POST', '/api/daily'): '_post_daily',
+    ('POST', '/api/fills'): '_post_fills'
+}
+
+_STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 503: 'Service Unavailable'
+}
+
+_CONTENT_TYPES = {
+    '.png': 'image/png',
+    '.svg': 'image/svg+xml'
+}
+
+# Undelivered events kept per page; older ones are dropped, as every metrics event supersedes them
+_SUBSCRIBER_BACKLOG = 16
+
+_SIDES = {'B': 1, 'BUY': 1, '1': 1, 'S': -1, 'SELL': -1, '-1': -1}
+
+_LIVE_PANEL_STYLE = (
+    "position: fixed; right: 20px; bottom: 20px; z-index: 10; min-width: 230px; padding: 15px 20px; "
+    "background: #111827; border: 2px solid #10b981; border-radius: 10px; "
+    "box-shadow: 0 10px 25px rgba(0, 0, 0, 0.5); font-size: 0.95em;"
+)
+
+_LIVE_PANEL_SCRIPT = """
+            <script>
+            (function () {
+                const formats = {
+                    currency: v => '₹' + Number(v).toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2}),
+                    percent: v => Number(v).toFixed(1) + '%',
+                    ratio: v => Number(v).toFixed(3),
+                    count: v => String(v)
+                };
+                const status = document.getElementById('live-status');
+                const source = new EventSource('/events');
+                source.addEventListener('metrics', event => {
+                    const update = JSON.parse(event.data);
+                    document.querySelectorAll('[data-live-metric]').forEach(el => {
+                        el.textContent = formats[el.dataset.liveFormat](update.metrics[el.dataset.liveMetric]);
+                    });
+                    status.textContent = 'Live · update ' + update.version;
+                });
+                // Charts and tables caught up with the metrics: pick up the re-rendered report
+                source.addEventListener('report', () => location.reload());
+                source.onerror = () => { status.textContent = 'Reconnecting…'; };
+            })();
+            </script>
+        """
+
+
+def _live_panel():
+    """Fixed metrics panel plus the EventSource script, injected before </body> of the served report"""
+    rows = ''.join(
+        f'<p style="display: flex; justify-content: space-between; gap: 20px; margin: 4px 0;">'
+        f'<span style="color: #9ca3af;">{label}</span>'
+        f'<strong data-live-metric="{metric}" data-live-format="{fmt}">-</strong></p>'
+        for label, metric, fmt in LIVE_PANEL_METRICS
+    )
+    return (f'<div id="live-panel" style="{_LIVE_PANEL_STYLE}">{rows}'
+            f'<p id="live-status" style="margin-top: 8px; color: #6b7280; font-size: 0.85em;">Connecting…</p></div>'
+            f'{_LIVE_PANEL_SCRIPT}').encode('utf-8')
+
+
+def _encode_json(payload):
+    return json.dumps(payload, default=json_default).encode('utf-8')
+
+
+class LiveDashboard:
+    """
+    Monthly P&L held in memory. Closed months live in an IncrementalPnLState and only the
+    open (last) month is re-folded, so each appended fill or daily P&L costs O(1).
+    """
+    
+    def __init__(self, monthly_pnl=None, months=None, financial_year=None):
+        if monthly_pnl is None:
+            monthly_pnl = kotak_derivative
+            months = REPORTING_MONTHS if months is None else months
+        self.months = list(monthly_pnl) if months is None else list(months)
+        self.financial_year = financial_year or TRADING_METADATA['financial_year']
+        self.fy_start = parse_financial_year(self.financial_year)
+        
+        # Exact paise per month, like the ingestion aggregates
+        self._paise = {month: int(_to_paise(monthly_pnl.get(month, 0))) for month in self.months}
+        self._styles, self._quarters = month_lookups()
+        self.fills = FillStore()
+        # Appended fills book realized P&L only; open quantity is carried at average cost
+        self.positions = PositionBook(record=False)
+        self.version = 0
+        self._reseed()
+    
+    @property
+    def monthly_pnl(self):
+        """Monthly P&L dict in rupees, shaped like trading_data.kotak_derivative"""
+        return {month: paise_to_rupees(self._paise[month]) for month in self.months}
+    
+    def _fold(self, state, month):
+        state.append(paise_to_rupees(self._paise[month]), month, self._quarters.get(month), self._styles.get(month, 'Normal'))
+    
+    def _reseed(self):
+        """Replay the closed months into a fresh state; the last month stays open"""
+        self._closed = IncrementalPnLState()
+        for month in self.months[:-1]:
+            self._fold(self._closed, month)
+        self._metrics = None
+    
+    def metrics(self):
+        """Live metrics, keyed like TradingAnalytics.calculate_all_metrics()"""
+        if self._metrics is None:
+            state = self._closed.copy()
+            if self.months:
+                self._fold(state, self.months[-1])
+            self._metrics = state.metrics()
+        return self._metrics
+    
+    def _add_pnl(self, month, paise):
+        """Book realized P&L on a month: in place for the open month, a short replay for earlier ones"""
+        if month in self._paise:
+            self._paise[month] += paise
+            if month != self.months[-1]:
+                self._reseed()
+            return
+        
+        # A month outside the series: extend it in FY order, months in between are flat
+        indexes = [FY_MONTH_CODES[m] for m in self.months] + [FY_MONTH_CODES[month]]
+        months = FY_MONTHS[min(indexes):max(indexes) + 1]
+        later = bool(self.months) and FY_MONTH_CODES[month] > FY_MONTH_CODES[self.months[-1]]
+        previous = self.months[:]
+        for m in months:
+            self._paise.setdefault(m, 0)
+        self._paise[month] += paise
+        self.months = months
+        
+        if later:
+            # Close the previously open month and the flat gap, then open the new month
+            for m in months[len(previous) - 1:-1]:
+                self._fold(self._closed, m)
+        else:
+            self._reseed()
+    
+    def _check_financial_year(self, timestamps):
+        """Every row must fall in this dashboard's FY"""
+        outside = financial_year_start(timestamps) != self.fy_start
+        if outside.any():
+            raise ValueError(f"{np.asarray(timestamps)[outside][0]} is outside FY {self.financial_year}")
+    
+    def _book(self, timestamps, paise):
+        """Group P&L by FY month and book it"""
+        if len(paise) == 0:
+            return
+        self._check_financial_year(timestamps)
+        
+        month_index = fy_month_index(timestamps)
+        totals = np.bincount(month_index, weights=paise, minlength=12)
+        for index in np.flatnonzero(np.bincount(month_index, minlength=12)).tolist():
+            self._add_pnl(FY_MONTHS[index], int(round(totals[index])))
+        self._metrics = None
+        self.version += 1
+    
+    def append_daily_pnl(self, records):
+        """Book daily P&L records: [{"date": "2025-10-14", "pnl": 1250.5}, ...]"""
+        try:
+            dates = np.array([record['date'] for record in records], dtype='datetime64[D]')
+            paise = _to_paise([record['pnl'] for record in records])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Daily P&L records need a date and a pnl ({type(e).__name__}: {e})")
+        self._book(dates, paise)
+    
+    def append_fills(self, records):
+        """
+        Book executed fills: [{"timestamp", "symbol", "side" (B/S, BUY/SELL or +1/-1),
+        "quantity", "price", "charges" (optional)}, ...] at the P&L they realize. Fills go through
+        an average-cost PositionBook in time order, so an opening fill books only its charges and
+        the premium of open positions stays out of the monthly P&L until they are closed.
+        """
+        try:
+            fills = np.empty(len(records), dtype=FILL_DTYPE)
+            fills['timestamp'] = [record['timestamp'] for record in records]
+            fills['side'] = [_SIDES[str(record['side']).strip().upper()] for record in records]
+            fills['quantity'] = [record['quantity'] for record in records]
+            fills['price'] = [record['price'] for record in records]
+            fills['charges'] = [record.get('charges', 0) for record in records]
+            symbols = [record['symbol'] for record in records]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Fills need timestamp, symbol, side, quantity and price ({type(e).__name__}: {e})")
+        
+        if len(fills) == 0:
+            return
+        if not (fills['quantity'] > 0).all():
+            raise ValueError("Fill quantities must be positive")
+        self._check_financial_year(fills['timestamp'])
+        
+        codes = self.positions.intern_symbols(symbols)
+        realized = np.empty(len(fills))
+        for i in np.argsort(fills['timestamp'], kind='stable').tolist():
+            before = self.positions.realized
+            fill = fills[i]
+            self.positions.apply_fill(codes[i], int(fill['side']), int(fill['quantity']), float(fill['price']),
+                                      fill['timestamp'], float(fill['charges']))
+            realized[i] = self.positions.realized - before
+        
+        self._book(fills['timestamp'], _to_paise(realized))
+        fills['symbol'] = self.fills.intern_symbols(symbols)
+        self.fills.append(fills)
+
+
+class DashboardServer:
+    """
+    asyncio HTTP server: the report, charts and JSON metrics are served from memory, and every
+    update is pushed to open pages over server-sent events. Charts and the report re-render on a
+    background thread once updates go quiet, so a fill never waits on matplotlib.
+    """
+    
+    def __init__(self, dashboard=None, host=None, port=None, output_dir=None, chart_format=None, refresh_delay=None):
+        self.dashboard = dashboard if dashboard is not None else LiveDashboard()
+        self.host = host or DASHBOARD_SERVER['host']
+        self.port = DASHBOARD_SERVER['port'] if port is None else port
+        self.output_dir = output_dir or DASHBOARD_SERVER['output_dir']
+        self.chart_format = chart_format or CHART_FORMAT
+        self.refresh_delay = DASHBOARD_SERVER['refresh_delay'] if refresh_delay is None else refresh_delay
+        self.keepalive_seconds = DASHBOARD_SERVER['keepalive_seconds']
+        self.max_body_bytes = DASHBOARD_SERVER['max_body_bytes']
+        
+        # Rendered artifacts of dashboard version rendered_version
+        self.report = None
+        self.charts = {}
+        self.rendered_version = None
+        self.render_seconds = None
+        # Chart cache keys (by chart method) and monthly P&L behind the rendered artifacts
+        self._chart_keys = {}
+        self._rendered_snapshot = None
+        
+        self._subscribers = set()
+        self._refresh_task = None
+        self._refresh_due = 0
+        self._server = None
+        # One render thread: matplotlib figures and the template pool are never shared across threads
+        self._render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dashboard-render')
+    
+    def _render(self, monthly_pnl, months):
+        """Charts and the report for one snapshot of the P&L (blocking; runs on the render thread)"""
+        from visualizer import TradingVisualizer, CHART_TASKS
+        from report_generator import ReportGenerator
+        
+        start = time.perf_counter()
+        context = DashboardContext(processor=TradingDataProcessor(monthly_pnl, months),
+                                   metadata={'financial_year': self.dashboard.financial_year})
+        visualizer = TradingVisualizer(charts_dir=os.path.join(self.output_dir, 'charts'), context=context,
+                                       chart_format=self.chart_format)
+        
+        # Only charts whose inputs, style or code changed since the last render are drawn again
+        keys = visualizer.chart_keys()
+        changed = [name for name, key in keys.items() if self._chart_keys.get(name) != key]
+        if changed:
+            visualizer.generate_all_visualizations(workers=1, charts=changed)
+        
+        charts = dict(self.charts)
+        for name, filename, _ in CHART_TASKS:
+            if name in changed:
+                filename = visualizer.chart_filename(filename)
+                with open(os.path.join(visualizer.charts_dir, filename), 'rb') as f:
+                    charts[filename] = f.read()
+        
+        # Every section reads the monthly metrics, and together they take ~0.1s, so the report is rebuilt whole
+        report = ReportGenerator(context, output_dir=self.output_dir, chart_format=self.chart_format)
+        html, _, tail = b''.join(report.iter_report(LIVE_REPORT_SECTIONS)).rpartition(b'</body>')
+        return html + _live_panel() + b'</body>' + tail, charts, keys, time.perf_counter() - start
+    
+    async def _render_current(self):
+        """
+        Render the dashboard's current version off the event loop and swap it in. Returns None
+        when the monthly P&L is unchanged since the last render (e.g. only opening fills arrived)
+        """
+        version, monthly_pnl, months = self.dashboard.version, self.dashboard.monthly_pnl, list(self.dashboard.months)
+        snapshot = (tuple(months), tuple(monthly_pnl.items()))
+        if snapshot == self._rendered_snapshot:
+            self.rendered_version = version
+            return None
+        
+        loop = asyncio.get_running_loop()
+        report, charts, keys, seconds = await loop.run_in_executor(self._render_executor, self._render, monthly_pnl, months)
+        self.report, self.charts, self.rendered_version, self.render_seconds = report, charts, version, seconds
+        self._chart_keys, self._rendered_snapshot = keys, snapshot
+        return version
+    
+    def _schedule_refresh(self):
+        """Push the re-render back until updates have been quiet for refresh_delay"""
+        self._refresh_due = asyncio.get_running_loop().time() + self.refresh_delay
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+    
+    async def _refresh(self):
+        loop = asyncio.get_running_loop()
+        while self.rendered_version != self.dashboard.version:
+            while loop.time() < self._refresh_due:
+                await asyncio.sleep(self._refresh_due - loop.time())
+            try:
+                version = await self._render_current()
+            except Exception as e:
+                # Keep serving the last good render; the next update retries
+                print(f"❌ Live re-render failed: {type(e).__name__}: {e}")
+                return
+            if version is not None:
+                print(f"♻️ Report re-rendered for update {version} in {self.render_seconds:.2f}s")
+                self.publish('report', {'version': version})
+    
+    def publish(self, event, payload):
+        """Queue one server-sent event for every open page"""
+        message = b'event: ' + event.encode('ascii') + b'\ndata: ' + _encode_json(payload) + b'\n\n'
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+    
+    def _metrics_payload(self):
+        return {'version': self.dashboard.version, 'metrics': self.dashboard.metrics()}
+    
+    # Route handlers: (status, content type, body)
+    
+    def _get_report(self, body):
+        return 200, 'text/html; charset=utf-8', self.report
+    
+    def _get_metrics(self, body):
+        return 200, 'application/json', _encode_json(self._metrics_payload())
+    
+    def _get_monthly(self, body):
+        return 200, 'application/json', _encode_json({'version': self.dashboard.version,
+                                                      'monthly_pnl': self.dashboard.monthly_pnl})
+    
+    def _get_state(self, body):
+        return 200, 'application/json', _encode_json({
+            'version': self.dashboard.version,
+            'rendered_version': self.rendered_version,
+            'render_seconds': self.render_seconds,
+            'financial_year': self.dashboard.financial_year,
+            'months': self.dashboard.months,
+            'fills': len(self.dashboard.fills),
+            'open_positions': self.dashboard.positions.open_positions(),
+            'subscribers': len(self._subscribers)
+        })
+    
+    def _post_update(self, body, append):
+        """Apply appended records, push the new metrics at once and schedule the re-render"""
+        records = json.loads(body)
+        append(records if isinstance(records, list) else [records])
+        payload = self._metrics_payload()
+        self.publish('metrics', payload)
+        self._schedule_refresh()
+        return 200, 'application/json', _encode_json(payload)
+    
+    def _post_daily(self, body):
+        return self._post_update(body, self.dashboard.append_daily_pnl)
+    
+    def _post_fills(self, body):
+        return self._post_update(body, self.dashboard.append_fills)
+    
+    def _get_chart(self, filename):
+        content = self.charts.get(filename)
+        if content is None:
+            return 404, 'application/json', _encode_json({'error': f"No chart {filename!r}"})
+        return 200, _CONTENT_TYPES.get(os.path.splitext(filename)[1], 'application/octet-stream'), content
+    
+    def _route(self, method, path, body):
+        if path.startswith('/charts/'):
+            if method != 'GET':
+                return 405, 'application/json', _encode_json({'error': f"{method} not allowed on {path}"})
+            return self._get_chart(unquote(path[len('/charts/'):]))
+        
+        handler = _ROUTES.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in _ROUTES):
+                return 405, 'application/json', _encode_json({'error': f"{method} not allowed on {path}"})
+            return 404, 'application/json', _encode_json({'error': f"{method} {path} not found"})
+        try:
+            return getattr(self, handler)(body)
+        except ValueError as e:
+            # Malformed JSON (json.JSONDecodeError is a ValueError) or invalid records
+            return 400, 'application/json', _encode_json({'error': str(e)})
+    
+    # HTTP/1.1 plumbing
+    
+    async def _read_request(self, reader):
+        """(method, path, headers, body) of the next request, or None once the client is done"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+        
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, _ = lines[0].split(' ', 2)
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        
+        length = int(headers.get('content-length', 0))
+        if length > self.max_body_bytes:
+            return method, None, headers, None
+        body = await reader.readexactly(length) if length else b''
+        return method, urlsplit(target).path, headers, body
+    
+    @staticmethod
+    def _response_head(status, content_type, length=None, keep_alive=True):
+        head = [f"HTTP/1.1 {status} {_STATUS_TEXT[status]}", f"Content-Type: {content_type}",
+                'Cache-Control: no-cache', f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if length is not None:
+            head.append(f"Content-Length: {length}")
+        return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1')
+    
+    async def _stream_events(self, writer):
+        """Server-sent events: current metrics at once, then every published event, with keepalives"""
+        queue = asyncio.Queue(maxsize=_SUBSCRIBER_BACKLOG)
+        self._subscribers.add(queue)
+        try:
+            writer.write(self._response_head(200, 'text/event-stream'))
+            writer.write(b'event: metrics\ndata: ' + _encode_json(self._metrics_payload()) + b'\n\n')
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    message = b': keepalive\n\n'
+                writer.write(message)
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+    
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                
+                if path is None:
+                    status, content_type, payload = 413, 'application/json', _encode_json({'error': 'Request body too large'})
+                    keep_alive = False
+                elif method == 'GET' and path == '/events':
+                    await self._stream_events(writer)
+                    break
+                elif self.report is None:
+                    status, content_type, payload = 503, 'application/json', _encode_json({'error': 'Dashboard still rendering'})
+                else:
+                    status, content_type, payload = self._route(method, path, body)
+                
+                writer.write(self._response_head(status, content_type, len(payload), keep_alive) + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            # Client went away, or sent something that is not HTTP
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down with the connection open (e.g. an event stream); nothing awaits this task
+            pass
+        finally:
+            writer.close()
+    
+    async def start(self):
+        """Render the initial dashboard, then start listening"""
+        await self._render_current()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+    
+    async def serve_forever(self):
+        await self.start()
+        print(f"🌐 Live dashboard: http://{self.host}:{self.port}/ (initial render {self.render_seconds:.2f}s)")
+        print("   POST /api/daily or /api/fills to append; metrics are pushed to open pages over /events")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+    
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        self._render_executor.shutdown(wait=False)
+
+
+def run_server(host=None, port=None, chart_format=None):
+    """Serve the live dashboard until interrupted"""
+    server = DashboardServer(host=host, port=port, chart_format=chart_format)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Live dashboard stopped")
\ No newline at end of file
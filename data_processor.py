@@ -1,141 +1,325 @@
-"""
-Data Processing Module - DERIVATIVES ONLY
-Processes Kotak Neo derivatives trading data into structured formats
-"""
-
-import pandas as pd
-import numpy as np
-from trading_data import *
-from config import MONTHS_ORDER, QUARTERS
-
-class TradingDataProcessor:
-    """Process and structure derivatives trading data for analysis"""
-    
-    def __init__(self):
-        self.kotak_derivative = kotak_derivative
-        self.months = MONTHS_ORDER
-        
-    def create_monthly_dataframe(self):
-        """Create comprehensive monthly dataframe"""
-        data = []
-        
-        for month in self.months:
-            row = {
-                'Month': month,
-                'Derivative_PnL': self.kotak_derivative.get(month, 0),
-                'Total_PnL': self.kotak_derivative.get(month, 0)
-            }
-            
-            # Add trading style classification
-            if month in TRADING_STYLES['systematic']['months']:
-                row['Trading_Style'] = 'Systematic'
-            elif month in TRADING_STYLES['learning']['months']:
-                row['Trading_Style'] = 'Learning'
-            else:
-                row['Trading_Style'] = 'Normal'
-            
-            # Add quarter classification
-            for quarter, months in QUARTERS.items():
-                if month in months:
-                    row['Quarter'] = quarter
-                    break
-            
-            data.append(row)
-        
-        df = pd.DataFrame(data)
-        
-        # Calculate cumulative P&L
-        df['Cumulative_PnL'] = df['Total_PnL'].cumsum()
-        
-        return df
-    
-    def get_segment_summary(self):
-        """Get summary statistics"""
-        summary = {
-            'Derivatives': {
-                'total': sum(self.kotak_derivative.values()),
-                'months_traded': sum(1 for v in self.kotak_derivative.values() if v != 0),
-                'profitable_months': sum(1 for v in self.kotak_derivative.values() if v > 0),
-                'loss_months': sum(1 for v in self.kotak_derivative.values() if v < 0),
-                'avg_profit': np.mean([v for v in self.kotak_derivative.values() if v > 0]) if any(v > 0 for v in self.kotak_derivative.values()) else 0,
-                'avg_loss': np.mean([v for v in self.kotak_derivative.values() if v < 0]) if any(v < 0 for v in self.kotak_derivative.values()) else 0
-            }
-        }
-        
-        return summary
-    
-    def get_quarterly_summary(self):
-        """Get summary by quarter"""
-        df = self.create_monthly_dataframe()
-        quarterly = df.groupby('Quarter').agg({
-            'Total_PnL': 'sum',
-            'Derivative_PnL': 'sum',
-            'Month': 'count'
-        }).rename(columns={'Month': 'Months_Traded'})
-        
-        return quarterly
-    
-    def get_trading_style_summary(self):
-        """Get summary by trading style"""
-        df = self.create_monthly_dataframe()
-        
-        systematic_data = df[df['Trading_Style'] == 'Systematic']
-        learning_data = df[df['Trading_Style'] == 'Learning']
-        
-        summary = {
-            'Systematic': {
-                'total_pnl': systematic_data['Derivative_PnL'].sum(),
-                'months': len(systematic_data),
-                'profitable_months': len(systematic_data[systematic_data['Derivative_PnL'] > 0]),
-                'avg_pnl': systematic_data['Derivative_PnL'].mean(),
-                'win_rate': (len(systematic_data[systematic_data['Derivative_PnL'] > 0]) / len(systematic_data) * 100) if len(systematic_data) > 0 else 0
-            },
-            'Learning': {
-                'total_pnl': learning_data['Derivative_PnL'].sum(),
-                'months': len(learning_data),
-                'profitable_months': len(learning_data[learning_data['Derivative_PnL'] > 0]),
-                'avg_pnl': learning_data['Derivative_PnL'].mean(),
-                'win_rate': (len(learning_data[learning_data['Derivative_PnL'] > 0]) / len(learning_data) * 100) if len(learning_data) > 0 else 0
-            }
-        }
-        
-        return summary
-    
-    def get_best_worst_months(self):
-        """Get best and worst performing months"""
-        df = self.create_monthly_dataframe()
-        df_traded = df[df['Total_PnL'] != 0].copy()
-        
-        best_month = df_traded.loc[df_traded['Total_PnL'].idxmax()]
-        worst_month = df_traded.loc[df_traded['Total_PnL'].idxmin()]
-        
-        return {
-            'best': {
-                'month': best_month['Month'],
-                'pnl': best_month['Total_PnL']
-            },
-            'worst': {
-                'month': worst_month['Month'],
-                'pnl': worst_month['Total_PnL']
-            }
-        }
-    
-    def calculate_drawdown(self):
-        """Calculate maximum drawdown"""
-        df = self.create_monthly_dataframe()
-        cumulative = df['Cumulative_PnL'].values
-        
-        running_max = np.maximum.accumulate(cumulative)
-        drawdown = cumulative - running_max
-        max_drawdown = np.min(drawdown)
-        
-        # Find drawdown period
-        max_dd_idx = np.argmin(drawdown)
-        peak_idx = np.argmax(cumulative[:max_dd_idx+1]) if max_dd_idx > 0 else 0
-        
-        return {
-            'max_drawdown': max_drawdown,
-            'peak_month': df.iloc[peak_idx]['Month'],
-            'trough_month': df.iloc[max_dd_idx]['Month'],
-            'recovery': cumulative[-1] - cumulative[max_dd_idx] if max_dd_idx < len(cumulative) - 1 else 0
+"""
+Data Processing Module - DERIVATIVES ONLY
+Processes Kotak Neo derivatives trading data into structured formats
+"""
+
+import numpy as np
+from trading_data import *
+from config import PROCESSOR_BACKEND
+from fy_calendar import FY_MONTHS, QUARTER_LABELS, REPORTING_MONTHS, quarter_codes
+from instrumentation import count_calls
+from metrics_engine import group_pnl, drawdown_profile
+
+# Category tables of the array backend; a month outside the FY calendar gets quarter code -1
+QUARTER_CATEGORIES = QUARTER_LABELS
+STYLE_CATEGORIES = ('Normal', 'Learning', 'Systematic')
+
+PROCESSOR_BACKENDS = ('pandas', 'numpy')
+
+def month_lookups():
+    """{month: trading style} and {month: FY quarter}"""
+    style_lookup = {}
+    for month in TRADING_STYLES['learning']['months']:
+        style_lookup[month] = 'Learning'
+    for month in TRADING_STYLES['systematic']['months']:
+        style_lookup[month] = 'Systematic'
+    
+    quarter_lookup = {month: QUARTER_LABELS[code] for month, code in zip(FY_MONTHS, quarter_codes(FY_MONTHS).tolist())}
+    return style_lookup, quarter_lookup
+
+class TradingDataProcessor:
+    """Process and structure derivatives trading data for analysis"""
+    
+    def __init__(self, monthly_pnl=None, months=None, backend=None):
+        self.kotak_derivative = kotak_derivative if monthly_pnl is None else monthly_pnl
+        self.months = REPORTING_MONTHS if months is None else list(months)
+        
+        # Summaries run on the pandas frame or on the array-backed records
+        self.backend = PROCESSOR_BACKEND if backend is None else backend
+        if self.backend not in PROCESSOR_BACKENDS:
+            raise ValueError(f"Unknown processor backend {self.backend!r}; expected one of {PROCESSOR_BACKENDS}")
+        
+        # Monthly frame cache, rebuilt only when the P&L source changes
+        self._frame_cache = None
+        self._frame_version = None
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        
+        # Array-backed records cache, keyed on the same data version
+        self._records_cache = None
+        self._records_version = None
+    
+    @classmethod
+    def from_contract_note(cls, path, financial_year=None):
+        """Build a processor from a Kotak Neo contract note CSV"""
+        from trade_ingestion import aggregate_monthly_pnl
+        return cls(aggregate_monthly_pnl(path, financial_year))
+    
+    @classmethod
+    def from_store(cls, store, client_code, financial_year):
+        """Build a processor from a client's FY partition in a PnLStore"""
+        return cls(store.monthly_pnl(client_code, financial_year))
+    
+    def _data_version(self):
+        """Fingerprint of the P&L source the monthly frame is built from"""
+        return tuple((month, self.kotak_derivative.get(month, 0)) for month in self.months)
+    
+    def monthly_columns(self):
+        """Monthly columns as plain NumPy arrays and lists, for consumers that do not need pandas"""
+        style_lookup, _ = month_lookups()
+        months = list(self.months)
+        pnl = np.array([self.kotak_derivative.get(month, 0) for month in months])
+        
+        # Quarters come from the FY month codes; names outside the calendar get NaN
+        codes = quarter_codes(months)
+        quarters = np.where(codes >= 0, np.array(QUARTER_LABELS, dtype=object)[codes], np.nan)
+        
+        return {
+            'Month': months,
+            'Derivative_PnL': pnl,
+            'Total_PnL': pnl.copy(),
+            'Trading_Style': [style_lookup.get(month, 'Normal') for month in months],
+            'Quarter': quarters.tolist(),
+            'Cumulative_PnL': pnl.cumsum()
+        }
+    
+    @count_calls
+    def _build_monthly_frame(self):
+        """Build the monthly frame column by column"""
+        # pandas is only loaded once something actually asks for the frame
+        import pandas as pd
+        return pd.DataFrame(self.monthly_columns())
+    
+    def _monthly_frame(self):
+        """Return the cached monthly frame, rebuilding it if the data changed"""
+        version = self._data_version()
+        if self._frame_cache is not None and version == self._frame_version:
+            self.cache_stats['hits'] += 1
+            return self._frame_cache
+        
+        self.cache_stats['misses'] += 1
+        self._frame_cache = self._build_monthly_frame()
+        self._frame_version = version
+        return self._frame_cache
+    
+    def _monthly_records(self):
+        """
+        Array-backed monthly series: a structured array with pnl, cumulative and
+        small-integer quarter/style codes (see QUARTER_CATEGORIES, STYLE_CATEGORIES).
+        """
+        version = self._data_version()
+        if self._records_cache is not None and version == self._records_version:
+            return self._records_cache
+        
+        columns = self.monthly_columns()
+        pnl = columns['Total_PnL']
+        style_codes = {style: i for i, style in enumerate(STYLE_CATEGORIES)}
+        
+        records = np.empty(len(pnl), dtype=[('pnl', pnl.dtype), ('cumulative', pnl.dtype),
+                                            ('quarter', np.int8), ('style', np.int8)])
+        records['pnl'] = pnl
+        records['cumulative'] = columns['Cumulative_PnL']
+        records['quarter'] = quarter_codes(columns['Month'])
+        records['style'] = [style_codes[style] for style in columns['Trading_Style']]
+        
+        self._records_cache = (records, columns['Month'])
+        self._records_version = version
+        return self._records_cache
+    
+    def invalidate_cache(self):
+        """Drop the cached monthly frame and records so the next access rebuilds them"""
+        self._frame_cache = None
+        self._frame_version = None
+        self._records_cache = None
+        self._records_version = None
+    
+    def create_monthly_dataframe(self):
+        """Create comprehensive monthly dataframe"""
+        # Hand out a copy so callers cannot mutate the shared cached frame
+        return self._monthly_frame().copy()
+    
+    @count_calls
+    def get_segment_summary(self):
+        """Get summary statistics"""
+        if self.backend == 'numpy':
+            return self._segment_summary_arrays()
+        summary = {
+            'Derivatives': {
+                'total': sum(self.kotak_derivative.values()),
+                'months_traded': sum(1 for v in self.kotak_derivative.values() if v != 0),
+                'profitable_months': sum(1 for v in self.kotak_derivative.values() if v > 0),
+                'loss_months': sum(1 for v in self.kotak_derivative.values() if v < 0),
+                'avg_profit': np.mean([v for v in self.kotak_derivative.values() if v > 0]) if any(v > 0 for v in self.kotak_derivative.values()) else 0,
+                'avg_loss': np.mean([v for v in self.kotak_derivative.values() if v < 0]) if any(v < 0 for v in self.kotak_derivative.values()) else 0
+            }
+        }
+        
+        return summary
+    
+    @count_calls
+    def get_quarterly_summary(self):
+        """Get summary by quarter"""
+        if self.backend == 'numpy':
+            return self._quarterly_summary_arrays()
+        df = self._monthly_frame()
+        quarterly = df.groupby('Quarter').agg({
+            'Total_PnL': 'sum',
+            'Derivative_PnL': 'sum',
+            'Month': 'count'
+        }).rename(columns={'Month': 'Months_Traded'})
+        
+        return quarterly
+    
+    @count_calls
+    def get_trading_style_summary(self):
+        """Get summary by trading style"""
+        if self.backend == 'numpy':
+            return self._trading_style_summary_arrays()
+        df = self._monthly_frame()
+        
+        systematic_data = df[df['Trading_Style'] == 'Systematic']
+        learning_data = df[df['Trading_Style'] == 'Learning']
+        
+        summary = {
+            'Systematic': {
+                'total_pnl': systematic_data['Derivative_PnL'].sum(),
+                'months': len(systematic_data),
+                'profitable_months': len(systematic_data[systematic_data['Derivative_PnL'] > 0]),
+                'avg_pnl': systematic_data['Derivative_PnL'].mean(),
+                'win_rate': (len(systematic_data[systematic_data['Derivative_PnL'] > 0]) / len(systematic_data) * 100) if len(systematic_data) > 0 else 0
+            },
+            'Learning': {
+                'total_pnl': learning_data['Derivative_PnL'].sum(),
+                'months': len(learning_data),
+                'profitable_months': len(learning_data[learning_data['Derivative_PnL'] > 0]),
+                'avg_pnl': learning_data['Derivative_PnL'].mean(),
+                'win_rate': (len(learning_data[learning_data['Derivative_PnL'] > 0]) / len(learning_data) * 100) if len(learning_data) > 0 else 0
+            }
+        }
+        
+        return summary
+    
+    @count_calls
+    def get_best_worst_months(self):
+        """Get best and worst performing months"""
+        if self.backend == 'numpy':
+            return self._best_worst_months_arrays()
+        df = self._monthly_frame()
+        df_traded = df[df['Total_PnL'] != 0].copy()
+        
+        best_month = df_traded.loc[df_traded['Total_PnL'].idxmax()]
+        worst_month = df_traded.loc[df_traded['Total_PnL'].idxmin()]
+        
+        return {
+            'best': {
+                'month': best_month['Month'],
+                'pnl': best_month['Total_PnL']
+            },
+            'worst': {
+                'month': worst_month['Month'],
+                'pnl': worst_month['Total_PnL']
+            }
+        }
+    
+    @count_calls
+    def calculate_drawdown(self):
+        """Calculate maximum drawdown"""
+        if self.backend == 'numpy':
+            return self._calculate_drawdown_arrays()
+        df = self._monthly_frame()
+        cumulative = df['Cumulative_PnL'].values
+        
+        running_max = np.maximum.accumulate(cumulative)
+        drawdown = cumulative - running_max
+        max_drawdown = np.min(drawdown)
+        
+        # Find drawdown period
+        max_dd_idx = np.argmin(drawdown)
+        peak_idx = np.argmax(cumulative[:max_dd_idx+1]) if max_dd_idx > 0 else 0
+        
+        return {
+            'max_drawdown': max_drawdown,
+            'peak_month': df.iloc[peak_idx]['Month'],
+            'trough_month': df.iloc[max_dd_idx]['Month'],
+            'recovery': cumulative[-1] - cumulative[max_dd_idx] if max_dd_idx < len(cumulative) - 1 else 0
+        }
+    
+    def _segment_summary_arrays(self):
+        """get_segment_summary() from one bincount over loss/flat/profit buckets"""
+        values = np.array(list(self.kotak_derivative.values()))
+        bucket = np.sign(values).astype(np.intp) + 1
+        counts = np.bincount(bucket, minlength=3)
+        sums = np.bincount(bucket, weights=values, minlength=3)
+        
+        return {
+            'Derivatives': {
+                'total': sum(self.kotak_derivative.values()),
+                'months_traded': int(counts[0] + counts[2]),
+                'profitable_months': int(counts[2]),
+                'loss_months': int(counts[0]),
+                'avg_profit': sums[2] / counts[2] if counts[2] > 0 else 0,
+                'avg_loss': sums[0] / counts[0] if counts[0] > 0 else 0
+            }
+        }
+    
+    def _quarterly_summary_arrays(self):
+        """get_quarterly_summary() via bincount over quarter codes"""
+        import pandas as pd
+        records, _ = self._monthly_records()
+        totals, counts, _ = group_pnl(records['pnl'], records['quarter'], len(QUARTER_CATEGORIES))
+        present = np.flatnonzero(counts)
+        
+        return pd.DataFrame({
+            'Total_PnL': totals[present],
+            'Derivative_PnL': totals[present],
+            'Months_Traded': counts[present]
+        }, index=pd.Index([QUARTER_CATEGORIES[i] for i in present], name='Quarter'))
+    
+    def _trading_style_summary_arrays(self):
+        """get_trading_style_summary() via bincount over style codes"""
+        records, _ = self._monthly_records()
+        totals, counts, profitable = group_pnl(records['pnl'], records['style'], len(STYLE_CATEGORIES))
+        
+        summary = {}
+        for style in ('Systematic', 'Learning'):
+            code = STYLE_CATEGORIES.index(style)
+            months, wins = int(counts[code]), int(profitable[code])
+            summary[style] = {
+                'total_pnl': totals[code],
+                'months': months,
+                'profitable_months': wins,
+                'avg_pnl': totals[code] / months if months > 0 else np.nan,
+                'win_rate': (wins / months * 100) if months > 0 else 0
+            }
+        
+        return summary
+    
+    def _best_worst_months_arrays(self):
+        """get_best_worst_months() with argmax/argmin over traded periods"""
+        records, months = self._monthly_records()
+        pnl = records['pnl']
+        traded = np.flatnonzero(pnl != 0)
+        best = traded[np.argmax(pnl[traded])]
+        worst = traded[np.argmin(pnl[traded])]
+        
+        return {
+            'best': {
+                'month': months[best],
+                'pnl': pnl[best]
+            },
+            'worst': {
+                'month': months[worst],
+                'pnl': pnl[worst]
+            }
+        }
+    
+    def _calculate_drawdown_arrays(self):
+        """calculate_drawdown() from the shared drawdown kernel"""
+        records, months = self._monthly_records()
+        profile = drawdown_profile(records['cumulative'])
+        
+        return {
+            'max_drawdown': profile['max_drawdown'],
+            'peak_month': months[profile['peak_index']],
+            'trough_month': months[profile['trough_index']],
+            'recovery': profile['recovery']
         }
\ No newline at end of file
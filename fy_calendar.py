@@ -0,0 +1,143 @@
+"""
+FY Calendar Module - DERIVATIVES ONLY
+Indian financial-year months, quarters, trading days and weekly expiries derived from real dates
+"""
+
+import calendar
+import numpy as np
+from config import REPORTING_THROUGH, MARKET_HOLIDAYS, GREEKS
+
+# The Indian financial year runs April to March
+FY_FIRST_MONTH = 4
+
+# Month abbreviations in FY order (Apr ... Mar) and quarter labels, indexed by FY month / quarter code
+FY_MONTHS = [calendar.month_abbr[(FY_FIRST_MONTH - 1 + i) % 12 + 1] for i in range(12)]
+QUARTER_LABELS = ('Q1', 'Q2', 'Q3', 'Q4')
+
+# FY month code (0 = Apr) of each month abbreviation
+FY_MONTH_CODES = {month: i for i, month in enumerate(FY_MONTHS)}
+
+# One date classified against the calendar
+CALENDAR_DTYPE = np.dtype([
+    ('fy_start', np.int16),
+    ('fy_month', np.int8),  # 0 = April
+    ('quarter', np.int8),  # 0 = Q1
+    ('trading_day', np.bool_),
+    ('expiry', 'datetime64[D]')  # weekly expiry the date's contracts run into
+])
+
+# Weekdays less the exchange holidays
+TRADING_CALENDAR = np.busdaycalendar(weekmask='1111100', holidays=np.array(MARKET_HOLIDAYS, dtype='datetime64[D]'))
+
+
+def _month_numbers(timestamps):
+    """Months since 1970-01 of each timestamp"""
+    return np.asarray(timestamps).astype('datetime64[M]').astype(np.int64)
+
+
+def financial_year_start(timestamps):
+    """Starting calendar year of the Indian FY (Apr-Mar) for each timestamp"""
+    return (_month_numbers(timestamps) - (FY_FIRST_MONTH - 1)) // 12 + 1970
+
+
+def financial_year_label(start_year):
+    """Format an FY start year the way TRADING_METADATA does, e.g. 2025 -> '2025-26'"""
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def parse_financial_year(financial_year):
+    """FY start year of a label like '2025-26' (or of a start year itself)"""
+    return int(str(financial_year)[:4])
+
+
+def fy_month_index(timestamps):
+    """FY month code (0 = April) of each timestamp"""
+    return (_month_numbers(timestamps) - (FY_FIRST_MONTH - 1)) % 12
+
+
+def fy_month_start(start_year, index):
+    """First month (datetime64[M]) of FY month code `index` in the FY starting `start_year`"""
+    return np.datetime64(f"{start_year}-{FY_FIRST_MONTH:02d}", 'M') + np.asarray(index)
+
+
+def month_codes(months):
+    """FY month codes of month abbreviations; names outside FY_MONTHS get -1"""
+    return np.array([FY_MONTH_CODES.get(month, -1) for month in months], dtype=np.int8)
+
+
+def quarter_codes(months):
+    """Quarter codes (0 = Q1) of month abbreviations; names outside FY_MONTHS get -1"""
+    codes = month_codes(months)
+    return np.where(codes >= 0, codes // 3, -1).astype(np.int8)
+
+
+def fy_months(financial_year=None, through=None):
+    """
+    Month abbreviations of one FY from April: the whole year, or through the 'YYYY-MM' month
+    `through` (whose FY is used when financial_year is not given).
+    """
+    if through is None:
+        return list(FY_MONTHS)
+    through = np.datetime64(through, 'M')
+    start_year = int(financial_year_start(through)) if financial_year is None else parse_financial_year(financial_year)
+    last = int(through - fy_month_start(start_year, 0))
+    if not 0 <= last < 12:
+        raise ValueError(f"{through} is outside FY {financial_year_label(start_year)}")
+    return FY_MONTHS[:last + 1]
+
+
+def is_trading_day(dates):
+    """Whether each date is an exchange trading day"""
+    return np.is_busday(np.asarray(dates, dtype='datetime64[D]'), busdaycal=TRADING_CALENDAR)
+
+
+def trading_days(start, end):
+    """Every trading day in [start, end]"""
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    return days[is_trading_day(days)]
+
+
+def trading_day_count(start, end):
+    """Number of trading days in [start, end]"""
+    return int(np.busday_count(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1, busdaycal=TRADING_CALENDAR))
+
+
+def weekly_expiry(dates, weekday):
+    """
+    First weekly expiry on or after each date: the next `weekday` (Mon=0), moved back to the
+    previous trading day when that is a holiday.
+    """
+    days = np.asarray(dates, dtype='datetime64[D]')
+    # 1970-01-01 was a Thursday
+    current = (days.astype(np.int64) + 3) % 7
+    nominal = days + ((weekday - current) % 7).astype('timedelta64[D]')
+    expiry = np.busday_offset(nominal, 0, roll='backward', busdaycal=TRADING_CALENDAR)
+    
+    # A holiday can pull this week's expiry before the date itself; the next week's is then due
+    passed = expiry < days
+    if passed.any():
+        expiry = np.where(passed, np.busday_offset(nominal + np.timedelta64(7, 'D'), 0, roll='backward',
+                                                   busdaycal=TRADING_CALENDAR), expiry)
+    return expiry
+
+
+def classify_dates(dates, underlying=None):
+    """
+    FY start, FY month, quarter, trading-day flag and weekly expiry (of `underlying`, default the
+    first in GREEKS) for every date in one vectorized pass (CALENDAR_DTYPE).
+    """
+    underlying = next(iter(GREEKS['underlyings'])) if underlying is None else underlying
+    days = np.asarray(dates, dtype='datetime64[D]')
+    
+    classified = np.empty(days.shape, dtype=CALENDAR_DTYPE)
+    month_index = fy_month_index(days)
+    classified['fy_start'] = financial_year_start(days)
+    classified['fy_month'] = month_index
+    classified['quarter'] = month_index // 3
+    classified['trading_day'] = is_trading_day(days)
+    classified['expiry'] = weekly_expiry(days, GREEKS['underlyings'][underlying]['expiry_weekday'])
+    return classified
+
+
+# Months of the default monthly series
+REPORTING_MONTHS = fy_months(through=REPORTING_THROUGH)
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+Greeks Module - DERIVATIVES ONLY
+Vectorized Black-Scholes Greeks for open index option positions, aggregated per underlying and account
+"""
+
+import re
+from datetime import datetime
+import numpy as np
+from instrumentation import count_calls, timed
+from fy_calendar import weekly_expiry
+from stats import norm_cdf, norm_pdf
+from config import GREEKS
+
+# Underlyings with market inputs in GREEKS, in code order
+UNDERLYINGS = tuple(GREEKS['underlyings'])
+
+# Contract kinds: calls and puts get Black-Scholes Greeks, futures carry delta only
+CONTRACT_KINDS = {'CE': 1, 'PE': -1, 'FUT': 0}
+
+# One open position in an index option or future
+OPTION_POSITION_DTYPE = np.dtype([
+    ('account', np.int32),
+    ('underlying', np.int8),  # code into UNDERLYINGS
+    ('kind', np.int8),  # +1 call, -1 put, 0 future
+    ('strike', np.float64),
+    ('expiry', 'datetime64[D]'),
+    ('quantity', np.int64)  # signed units: long > 0, short < 0
+])
+
+# Position-level exposures, summed per underlying, account and book:
+# delta (underlying units), delta_notional (₹), gamma (delta per index point),
+# gamma_notional (₹ of delta notional per 1% move), vega (₹ per vol point), theta (₹ per day)
+EXPOSURE_FIELDS = ('delta', 'delta_notional', 'gamma', 'gamma_notional', 'vega', 'theta')
+
+# e.g. "NIFTY 25000 CE", "SENSEX 14OCT25 82000 PE", "NIFTY28OCT25FUT"
+_SYMBOL_PATTERN = re.compile(
+    r'^\s*(?P<underlying>[A-Z]+?)\s*(?P<expiry>\d{2}[A-Z]{3}\d{2})?\s*'
+    r'(?:(?P<strike>\d+(?:\.\d+)?)\s*(?P<kind>CE|PE)|(?P<future>FUT))\s*$'
+)
+
+_SECONDS_PER_YEAR = 365 * 86400
+
+
+def black_scholes(spot, strike, years, volatility, rate, kind):
+    """
+    Per-unit price, delta, gamma, vega (per vol point) and theta (per calendar day) for arrays
+    of European options; kind is +1 call, -1 put, 0 future. Expired options keep their intrinsic
+    value and delta, futures a delta of 1; both have no gamma, vega or theta.
+    """
+    spot, strike, years, volatility, kind = np.broadcast_arrays(
+        np.asarray(spot, dtype=np.float64), np.asarray(strike, dtype=np.float64),
+        np.asarray(years, dtype=np.float64), np.asarray(volatility, dtype=np.float64), np.asarray(kind, dtype=np.float64))
+    live = (years > 0) & (kind != 0)
+    
+    # Placeholders where an option is expired or a future, so the logs and divisions stay finite
+    t = np.where(live, years, 1.0)
+    k = np.where(live, strike, spot)
+    sqrt_t = np.sqrt(t)
+    vol_sqrt_t = volatility * sqrt_t
+    d1 = (np.log(spot / k) + (rate + 0.5 * volatility * volatility) * t) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    
+    # Calls and puts in one pass: N(kind * d) covers both sides
+    pdf = norm_pdf(d1)
+    discounted = k * np.exp(-rate * t)
+    cdf_d1 = norm_cdf(kind * d1)
+    cdf_d2 = norm_cdf(kind * d2)
+    
+    intrinsic = np.maximum(kind * (spot - strike), 0)
+    expired_delta = np.where(kind == 0, 1.0, np.where(intrinsic > 0, kind, 0))
+    return {
+        'price': np.where(live, kind * (spot * cdf_d1 - discounted * cdf_d2), np.where(kind == 0, spot, intrinsic)),
+        'delta': np.where(live, kind * cdf_d1, expired_delta),
+        'gamma': np.where(live, pdf / (spot * vol_sqrt_t), 0),
+        'vega': np.where(live, spot * pdf * sqrt_t / 100, 0),
+        'theta': np.where(live, (-spot * pdf * volatility / (2 * sqrt_t) - kind * rate * discounted * cdf_d2) / 365, 0)
+    }
+
+
+def _expiry_close():
+    hours, minutes = GREEKS['expiry_time'].split(':')
+    return np.timedelta64(int(hours) * 60 + int(minutes), 'm')
+
+
+def parse_contract_symbols(names, valuation_time):
+    """
+    (underlying codes, kinds, strikes, expiries) for contract names. Names without an
+    expiry get the underlying's next weekly expiry that has not closed at valuation_time.
+    """
+    uniques, inverse = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+    underlying = np.empty(len(uniques), dtype=np.int8)
+    kind = np.empty(len(uniques), dtype=np.int8)
+    strike = np.zeros(len(uniques))
+    expiry = np.empty(len(uniques), dtype='datetime64[D]')
+    
+    close = _expiry_close()
+    valuation_time = np.datetime64(valuation_time, 's')
+    for i, name in enumerate(uniques.tolist()):
+        match = _SYMBOL_PATTERN.match(str(name).upper())
+        if match is None:
+            raise ValueError(f"Unrecognised contract name {name!r}; expected e.g. 'NIFTY 25000 CE' or 'NIFTY 28OCT25 FUT'")
+        if match['underlying'] not in UNDERLYINGS:
+            raise ValueError(f"No market inputs for {match['underlying']!r} in GREEKS; expected one of {UNDERLYINGS}")
+        
+        underlying[i] = UNDERLYINGS.index(match['underlying'])
+        kind[i] = CONTRACT_KINDS['FUT' if match['future'] else match['kind']]
+        strike[i] = float(match['strike']) if match['strike'] else 0.0
+        if match['expiry']:
+            expiry[i] = np.datetime64(datetime.strptime(match['expiry'].title(), '%d%b%y').date())
+        else:
+            weekday = GREEKS['underlyings'][match['underlying']]['expiry_weekday']
+            expiry[i] = weekly_expiry(valuation_time.astype('datetime64[D]'), weekday)
+            if valuation_time >= expiry[i] + close:
+                expiry[i] = weekly_expiry(expiry[i] + np.timedelta64(1, 'D'), weekday)
+    
+    return underlying[inverse], kind[inverse], strike[inverse], expiry[inverse]
+
+
+class PortfolioGreeks:
+    """Delta, gamma, vega and theta of open option positions, per position, underlying and account"""
+    
+    def __init__(self, positions, accounts=None, spot=None, volatility=None, rate=None, valuation_time=None):
+        self.positions = np.asarray(positions, dtype=OPTION_POSITION_DTYPE)
+        self.accounts = list(accounts) if accounts is not None else []
+        self.valuation_time = np.datetime64(valuation_time if valuation_time is not None else datetime.now(), 's')
+        self.rate = GREEKS['rate'] if rate is None else rate
+        
+        # Market inputs per underlying code: config defaults, overridden by {underlying: value}
+        inputs = GREEKS['underlyings']
+        spot = spot or {}
+        volatility = volatility or {}
+        self.spot = np.array([spot.get(name, inputs[name]['spot']) for name in UNDERLYINGS])
+        self.volatility = np.array([volatility.get(name, inputs[name]['volatility']) for name in UNDERLYINGS])
+        self._greeks = None
+    
+    @classmethod
+    def from_open_positions(cls, open_positions, account=None, **kwargs):
+        """Build from {contract name: signed quantity}, e.g. TradeAnalytics.open_positions()"""
+        return cls.from_accounts({account: open_positions}, **kwargs)
+    
+    @classmethod
+    def from_accounts(cls, open_positions_by_account, **kwargs):
+        """Build from {account: {contract name: signed quantity}}"""
+        accounts, names, quantities, account_codes = [], [], [], []
+        for code, (account, open_positions) in enumerate(open_positions_by_account.items()):
+            accounts.append(account)
+            for name, quantity in open_positions.items():
+                if quantity != 0:
+                    names.append(name)
+                    quantities.append(quantity)
+                    account_codes.append(code)
+        
+        greeks = cls(np.empty(0, dtype=OPTION_POSITION_DTYPE), accounts, **kwargs)
+        positions = np.empty(len(names), dtype=OPTION_POSITION_DTYPE)
+        if len(names):
+            underlying, kind, strike, expiry = parse_contract_symbols(names, greeks.valuation_time)
+            positions['account'] = account_codes
+            positions['underlying'] = underlying
+            positions['kind'] = kind
+            positions['strike'] = strike
+            positions['expiry'] = expiry
+            positions['quantity'] = quantities
+        greeks.positions = positions
+        return greeks
+    
+    def _account_name(self, code):
+        return self.accounts[code] if code < len(self.accounts) else code
+    
+    def years_to_expiry(self):
+        """Time from the valuation time to each position's expiry close, in years (<= 0 once expired)"""
+        expiry_close = self.positions['expiry'] + _expiry_close()
+        return (expiry_close - self.valuation_time).astype('timedelta64[s]').astype(np.float64) / _SECONDS_PER_YEAR
+    
+    @count_calls
+    @timed
+    def calculate_greeks(self):
+        """Per-position EXPOSURE_FIELDS (unit Greeks scaled by signed quantity), computed once"""
+        if self._greeks is None:
+            positions = self.positions
+            spot = self.spot[positions['underlying']]
+            unit = black_scholes(spot, positions['strike'], self.years_to_expiry(),
+                                 self.volatility[positions['underlying']], self.rate, positions['kind'])
+            quantity = positions['quantity'].astype(np.float64)
+            
+            self._greeks = {
+                'delta': unit['delta'] * quantity,
+                'delta_notional': unit['delta'] * quantity * spot,
+                'gamma': unit['gamma'] * quantity,
+                'gamma_notional': unit['gamma'] * quantity * spot * spot / 100,
+                'vega': unit['vega'] * quantity,
+                'theta': unit['theta'] * quantity
+            }
+        return self._greeks
+    
+    @staticmethod
+    def _aggregate(codes, n_groups, greeks):
+        """Per-group position counts and EXPOSURE_FIELDS sums via one bincount each"""
+        counts = np.bincount(codes, minlength=n_groups)
+        sums = {field: np.bincount(codes, weights=greeks[field], minlength=n_groups) for field in EXPOSURE_FIELDS}
+        return counts, sums
+    
+    @count_calls
+    @timed
+    def calculate_risk(self):
+        """Book, per-underlying and per-account exposures of the open positions"""
+        greeks = self.calculate_greeks()
+        positions = self.positions
+        
+        risk = {
+            'valuation_time': str(self.valuation_time),
+            'positions': len(positions),
+            'total': {field: float(greeks[field].sum()) for field in EXPOSURE_FIELDS},
+            'by_underlying': {},
+            'by_account': {}
+        }
+        
+        counts, sums = self._aggregate(positions['underlying'].astype(np.intp), len(UNDERLYINGS), greeks)
+        for code in np.flatnonzero(counts).tolist():
+            risk['by_underlying'][UNDERLYINGS[code]] = {
+                'positions': int(counts[code]),
+                'spot': float(self.spot[code]),
+                'volatility': float(self.volatility[code]),
+                **{field: float(sums[field][code]) for field in EXPOSURE_FIELDS}
+            }
+        
+        counts, sums = self._aggregate(positions['account'], len(self.accounts), greeks)
+        for code in np.flatnonzero(counts).tolist():
+            risk['by_account'][self._account_name(code)] = {
+                'positions': int(counts[code]),
+                **{field: float(sums[field][code]) for field in EXPOSURE_FIELDS}
+            }
+        return risk
+
+
+def exposure_metrics(risk):
+    """Book-level exposure keys merged into the dashboard metrics dict"""
+    total = risk['total']
+    return {
+        'open_option_positions': risk['positions'],
+        'net_delta_notional': total['delta_notional'],
+        'net_gamma_notional': total['gamma_notional'],
+        'net_vega': total['vega'],
+        'net_theta': total['theta']
+    }
\ No newline at end of file
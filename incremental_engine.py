@@ -0,0 +1,207 @@
+"""
+Incremental Engine Module - DERIVATIVES ONLY
+O(1) per-period updates of running P&L state with persisted checkpoints
+"""
+
+import copy
+import json
+import math
+import os
+from config import PNL_STATE_CHECKPOINT
+from instrumentation import json_default
+
+# Fields persisted in a checkpoint, in a stable order
+_STATE_FIELDS = (
+    'periods', 'total_pnl', 'traded_count', 'profitable_count', 'loss_count',
+    'gross_profit', 'gross_loss', 'mean', 'm2',
+    'running_peak', 'running_peak_label', 'current_drawdown',
+    'max_drawdown', 'drawdown_peak_label', 'drawdown_trough_label',
+    'drawdown_trough_period', 'cumulative_at_trough',
+    'current_streak', 'max_streak',
+    'best_pnl', 'best_label', 'worst_pnl', 'worst_label',
+    'quarters', 'styles'
+)
+
+
+class IncrementalPnLState:
+    """Running cumulative, drawdown, streak and Welford volatility state for a P&L series"""
+    
+    def __init__(self):
+        self.periods = 0
+        self.total_pnl = 0
+        self.traded_count = 0
+        self.profitable_count = 0
+        self.loss_count = 0
+        self.gross_profit = 0
+        self.gross_loss = 0
+        
+        # Welford running mean / sum of squared deviations over traded periods
+        self.mean = 0.0
+        self.m2 = 0.0
+        
+        self.running_peak = None
+        self.running_peak_label = None
+        self.current_drawdown = 0
+        self.max_drawdown = 0
+        self.drawdown_peak_label = None
+        self.drawdown_trough_label = None
+        self.drawdown_trough_period = None
+        self.cumulative_at_trough = 0
+        
+        self.current_streak = 0
+        self.max_streak = 0
+        
+        self.best_pnl = None
+        self.best_label = None
+        self.worst_pnl = None
+        self.worst_label = None
+        
+        # {quarter: total_pnl} and {style: [total_pnl, periods, profitable_periods]}
+        self.quarters = {}
+        self.styles = {}
+    
+    def append(self, pnl, label, quarter=None, style='Normal'):
+        """Fold one period (day, month or trade) into the running state in O(1)"""
+        self.periods += 1
+        self.total_pnl += pnl
+        cumulative = self.total_pnl
+        
+        # Drawdown from the running peak; ties keep the earliest peak/trough like np.argmax/argmin
+        if self.running_peak is None or cumulative > self.running_peak:
+            self.running_peak = cumulative
+            self.running_peak_label = label
+        self.current_drawdown = cumulative - self.running_peak
+        if self.drawdown_trough_period is None or self.current_drawdown < self.max_drawdown:
+            self.max_drawdown = self.current_drawdown
+            self.drawdown_peak_label = self.running_peak_label
+            self.drawdown_trough_label = label
+            self.drawdown_trough_period = self.periods
+            self.cumulative_at_trough = cumulative
+        
+        if quarter is not None:
+            self.quarters[quarter] = self.quarters.get(quarter, 0) + pnl
+        style_totals = self.styles.setdefault(style, [0, 0, 0])
+        style_totals[0] += pnl
+        style_totals[1] += 1
+        style_totals[2] += pnl > 0
+        
+        if pnl == 0:
+            return
+        
+        # Traded-period statistics
+        self.traded_count += 1
+        if pnl > 0:
+            self.profitable_count += 1
+            self.gross_profit += pnl
+            self.current_streak += 1
+            self.max_streak = max(self.max_streak, self.current_streak)
+        else:
+            self.loss_count += 1
+            self.gross_loss -= pnl
+            self.current_streak = 0
+        
+        delta = pnl - self.mean
+        self.mean += delta / self.traded_count
+        self.m2 += delta * (pnl - self.mean)
+        
+        if self.best_pnl is None or pnl > self.best_pnl:
+            self.best_pnl, self.best_label = pnl, label
+        if self.worst_pnl is None or pnl < self.worst_pnl:
+            self.worst_pnl, self.worst_label = pnl, label
+    
+    def metrics(self):
+        """Current metrics, keyed like TradingAnalytics.calculate_all_metrics()"""
+        metrics = {}
+        traded = self.traded_count
+        
+        metrics['total_pnl'] = self.total_pnl
+        metrics['derivative_total'] = self.total_pnl
+        metrics['total_months_traded'] = traded
+        metrics['profitable_months'] = self.profitable_count
+        metrics['loss_months'] = self.loss_count
+        metrics['win_rate'] = (self.profitable_count / traded * 100) if traded > 0 else 0
+        
+        metrics['avg_profit'] = self.gross_profit / self.profitable_count if self.profitable_count > 0 else 0
+        metrics['avg_loss'] = -self.gross_loss / self.loss_count if self.loss_count > 0 else 0
+        
+        metrics['gross_profit'] = self.gross_profit
+        metrics['gross_loss'] = self.gross_loss
+        metrics['profit_factor'] = self.gross_profit / self.gross_loss if self.gross_loss > 0 else 0
+        
+        metrics['volatility'] = math.sqrt(self.m2 / traded) if traded > 0 else 0
+        metrics['avg_monthly_return'] = (self.gross_profit - self.gross_loss) / traded if traded > 0 else 0
+        metrics['sharpe_ratio'] = metrics['avg_monthly_return'] / metrics['volatility'] if metrics['volatility'] > 0 else 0
+        
+        metrics['q1_pnl'] = self.quarters.get('Q1', 0)
+        metrics['q2_pnl'] = self.quarters.get('Q2', 0)
+        metrics['q3_pnl'] = self.quarters.get('Q3', 0)
+        if metrics['q1_pnl'] != 0:
+            metrics['q1_to_q2_improvement'] = ((metrics['q2_pnl'] - metrics['q1_pnl']) / abs(metrics['q1_pnl']) * 100)
+        else:
+            metrics['q1_to_q2_improvement'] = 0
+        
+        systematic = self.styles.get('Systematic', [0, 0, 0])
+        learning = self.styles.get('Learning', [0, 0, 0])
+        metrics['systematic_pnl'] = systematic[0]
+        metrics['systematic_win_rate'] = (systematic[2] / systematic[1] * 100) if systematic[1] > 0 else 0
+        metrics['systematic_months'] = systematic[1]
+        metrics['systematic_profitable_months'] = systematic[2]
+        metrics['learning_pnl'] = learning[0]
+        metrics['learning_win_rate'] = (learning[2] / learning[1] * 100) if learning[1] > 0 else 0
+        metrics['learning_months'] = learning[1]
+        metrics['consistency_score'] = metrics['systematic_win_rate']
+        
+        metrics['best_month'] = self.best_label
+        metrics['best_month_pnl'] = self.best_pnl if self.best_pnl is not None else 0
+        metrics['worst_month'] = self.worst_label
+        metrics['worst_month_pnl'] = self.worst_pnl if self.worst_pnl is not None else 0
+        
+        metrics['max_drawdown'] = self.max_drawdown
+        metrics['drawdown_peak_month'] = self.drawdown_peak_label
+        metrics['drawdown_trough_month'] = self.drawdown_trough_label
+        metrics['recovery_amount'] = self.total_pnl - self.cumulative_at_trough if self.drawdown_trough_period != self.periods else 0
+        
+        metrics['max_consecutive_profits'] = self.max_streak
+        metrics['risk_adjusted_return'] = metrics['total_pnl'] / metrics['volatility'] if metrics['volatility'] > 0 else 0
+        
+        return metrics
+    
+    def copy(self):
+        """Independent copy, e.g. to append a provisional period without touching this state"""
+        return copy.deepcopy(self)
+    
+    @classmethod
+    def from_frame(cls, df):
+        """Replay a monthly frame (as built by TradingDataProcessor) once to seed the state"""
+        state = cls()
+        for month, pnl, quarter, style in zip(df['Month'], df['Total_PnL'].tolist(), df['Quarter'], df['Trading_Style']):
+            state.append(pnl, month, quarter if isinstance(quarter, str) else None, style)
+        return state
+    
+    def save(self, path=None):
+        """Persist a checkpoint atomically so a restart resumes without replaying history"""
+        path = path or PNL_STATE_CHECKPOINT
+        payload = {field: getattr(self, field) for field in _STATE_FIELDS}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=2, default=json_default)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Never leave a partial checkpoint behind; the previous one (if any) stays intact
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    @classmethod
+    def load(cls, path=None):
+        """Restore a checkpoint written by save()"""
+        path = path or PNL_STATE_CHECKPOINT
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        
+        state = cls()
+        for field in _STATE_FIELDS:
+            setattr(state, field, payload[field])
+        return state
\ No newline at end of file
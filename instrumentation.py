@@ -0,0 +1,191 @@
+"""
+Instrumentation Module - DERIVATIVES ONLY
+Count, time and optionally profile the expensive pipeline functions per report
+"""
+
+import contextlib
+import cProfile
+import functools
+import inspect
+import io
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+
+# Calls per function qualname since the last reset
+CALL_COUNTS = Counter()
+
+# {stage name: {'calls', 'seconds', 'max_seconds', 'peak_bytes'}} since the last reset
+STAGE_TIMINGS = {}
+
+# [allocated at stage entry, highest peak seen] for every open stage while tracemalloc traces
+_ALLOCATION_STACK = []
+
+
+def count_calls(func):
+    """Decorator: record every call of func in CALL_COUNTS"""
+    name = func.__qualname__
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        CALL_COUNTS[name] += 1
+        return func(*args, **kwargs)
+    
+    return wrapper
+
+
+def reset_call_counts():
+    """Start a fresh count, e.g. at the beginning of a report run"""
+    CALL_COUNTS.clear()
+
+
+def get_call_counts():
+    """Snapshot of the call counts, sorted by function name"""
+    return dict(sorted(CALL_COUNTS.items()))
+
+
+def json_default(value):
+    """json.dump fallback for NumPy scalars in metrics, checkpoints and API payloads"""
+    if not hasattr(value, 'item'):
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return value.item()
+
+
+def _record_stage(name, seconds, peak_bytes=None):
+    entry = STAGE_TIMINGS.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'peak_bytes': None})
+    entry['calls'] += 1
+    entry['seconds'] += seconds
+    entry['max_seconds'] = max(entry['max_seconds'], seconds)
+    if peak_bytes is not None:
+        entry['peak_bytes'] = max(entry['peak_bytes'] or 0, peak_bytes)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Context manager: time a block, and its peak allocation while tracemalloc is tracing"""
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # Nested stages share tracemalloc's single peak counter, so hand the
+        # enclosing stage the peak reached so far before resetting it
+        current, peak = tracemalloc.get_traced_memory()
+        if _ALLOCATION_STACK:
+            _ALLOCATION_STACK[-1][1] = max(_ALLOCATION_STACK[-1][1], peak)
+        tracemalloc.reset_peak()
+        _ALLOCATION_STACK.append([current, current])
+    
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        peak_bytes = None
+        if tracing:
+            base, seen = _ALLOCATION_STACK.pop()
+            if tracemalloc.is_tracing():
+                peak = max(seen, tracemalloc.get_traced_memory()[1])
+                peak_bytes = peak - base
+                if _ALLOCATION_STACK:
+                    _ALLOCATION_STACK[-1][1] = max(_ALLOCATION_STACK[-1][1], peak)
+        _record_stage(name, elapsed, peak_bytes)
+
+
+def timed(func):
+    """Decorator: record every call of func as a stage named by its qualname"""
+    name = func.__qualname__
+    
+    if inspect.isgeneratorfunction(func):
+        # Time the whole iteration, not just the creation of the generator
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            with stage(name):
+                yield from func(*args, **kwargs)
+        
+        return generator_wrapper
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage(name):
+            return func(*args, **kwargs)
+    
+    return wrapper
+
+
+def reset_stage_timings():
+    """Start fresh timings, e.g. at the beginning of a report run"""
+    STAGE_TIMINGS.clear()
+
+
+def get_stage_timings():
+    """Snapshot of the stage timings, in the order stages first ran"""
+    return {name: dict(entry) for name, entry in STAGE_TIMINGS.items()}
+
+
+def merge_stage_timings(timings):
+    """Fold timings recorded elsewhere (e.g. in a pool worker) into this process's registry"""
+    for name, other in timings.items():
+        entry = STAGE_TIMINGS.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'peak_bytes': None})
+        entry['calls'] += other['calls']
+        entry['seconds'] += other['seconds']
+        entry['max_seconds'] = max(entry['max_seconds'], other['max_seconds'])
+        if other['peak_bytes'] is not None:
+            entry['peak_bytes'] = max(entry['peak_bytes'] or 0, other['peak_bytes'])
+
+
+def format_stage_timings(timings=None):
+    """Fixed-width table of stage timings (and peak allocations when traced)"""
+    timings = get_stage_timings() if timings is None else timings
+    lines = [f"{'Stage':<52}{'Calls':>7}{'Total (ms)':>13}{'Max (ms)':>11}{'Peak (KB)':>12}"]
+    for name, entry in timings.items():
+        peak = f"{entry['peak_bytes'] / 1024:,.1f}" if entry['peak_bytes'] is not None else '-'
+        lines.append(f"{name:<52}{entry['calls']:>7}{entry['seconds'] * 1000:>13.2f}"
+                     f"{entry['max_seconds'] * 1000:>11.2f}{peak:>12}")
+    return "\n".join(lines)
+
+
+class ProfileSession:
+    """cProfile + tracemalloc capture around a whole run, written out as a text report"""
+    
+    def __init__(self, top=30):
+        self.top = top
+        self.profiler = cProfile.Profile()
+        self.snapshot = None
+        self.peak_bytes = 0
+    
+    def __enter__(self):
+        tracemalloc.start()
+        self.profiler.enable()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.disable()
+        self.snapshot = tracemalloc.take_snapshot()
+        self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return False
+    
+    def write_report(self, path):
+        """Write stage timings, top cumulative-time functions and top allocation sites to path"""
+        stats_stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stats_stream).sort_stats('cumulative').print_stats(self.top)
+        
+        allocations = self.snapshot.statistics('lineno')[:self.top] if self.snapshot is not None else []
+        
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("PIPELINE PROFILE - DERIVATIVES DASHBOARD\n")
+            f.write("=" * 95 + "\n\n")
+            f.write("Stage timings\n")
+            f.write("-" * 95 + "\n")
+            f.write(format_stage_timings() + "\n\n")
+            f.write(f"Peak traced memory: {self.peak_bytes / (1024 * 1024):,.2f} MB\n\n")
+            f.write(f"Top {len(allocations)} allocation sites (live at end of run)\n")
+            f.write("-" * 95 + "\n")
+            for statistic in allocations:
+                f.write(f"{statistic}\n")
+            f.write(f"\nTop {self.top} functions by cumulative time\n")
+            f.write("-" * 95 + "\n")
+            f.write(stats_stream.getvalue())
+        
+        # Raw profile for pstats/snakeviz next to the text report
+        self.profiler.dump_stats(f"{path.rsplit('.', 1)[0]}.prof")
+        return path
\ No newline at end of file
@@ -1,127 +1,222 @@
-"""
-Main Execution Script - DERIVATIVES ONLY
-Kotak Neo Derivatives Trading Performance Dashboard Generator
-Clean, Systematic Trading Story
-"""
-
-import sys
-import os
-from datetime import datetime
-from visualizer import TradingVisualizer
-from report_generator import ReportGenerator
-from analytics import TradingAnalytics
-from config import OUTPUT_DIR
-from trading_data import TRADING_METADATA
-
-def print_header():
-    """Print dashboard header"""
-    print("=" * 80)
-    print("      DERIVATIVES TRADING PERFORMANCE DASHBOARD GENERATOR")
-    print(f"           FY {TRADING_METADATA['financial_year']} | {TRADING_METADATA['company']} Interview")
-    print(f"                    {TRADING_METADATA['platform']} Only")
-    print("=" * 80)
-    print()
-
-def print_metrics_summary():
-    """Print key metrics summary to console"""
-    print("\n" * 80)
-    print("KEY METRICS SUMMARY - DERIVATIVES TRADING")
-    print("=" * 80)
-    
-    analytics = TradingAnalytics()
-    metrics = analytics.calculate_all_metrics()
-    
-    print(f"\n📊 Overall Performance ({TRADING_METADATA['platform']}):")
-    print(f"   Net P&L: ₹{metrics['total_pnl']:,.2f}")
-    print(f"   Win Rate: {metrics['win_rate']:.1f}%")
-    print(f"   Profit Factor: {metrics['profit_factor']:.2f}")
-    print(f"   Total Turnover: ₹{TRADING_METADATA['total_turnover']:,.2f}")
-    
-    print(f"\n✅ Q2 Systematic Trading (Jul-Sep):")
-    print(f"   Total P&L: ₹{metrics['systematic_pnl']:,.2f}")
-    print(f"   Win Rate: {metrics['systematic_win_rate']:.1f}%")
-    print(f"   Consecutive Profitable Months: {metrics['systematic_profitable_months']}")
-    
-    print(f"\n📚 Q1 Learning Phase (Apr-Jun):")
-    print(f"   Total P&L: ₹{metrics['learning_pnl']:,.2f}")
-    print(f"   Win Rate: {metrics['learning_win_rate']:.1f}%")
-    print(f"   Purpose: Understanding markets, developing strategy")
-    
-    print(f"\n📈 Improvement:")
-    print(f"   Q1 P&L: ₹{metrics['q1_pnl']:,.2f}")
-    print(f"   Q2 P&L: ₹{metrics['q2_pnl']:,.2f}")
-    print(f"   Improvement: +{metrics['q1_to_q2_improvement']:.1f}%")
-    
-    print(f"\n🎯 Best/Worst:")
-    print(f"   Best Month: {metrics['best_month']} (₹{metrics['best_month_pnl']:,.2f})")
-    print(f"   Worst Month: {metrics['worst_month']} (₹{metrics['worst_month_pnl']:,.2f})")
-    
-    print(f"\n🛡️ Risk Metrics:")
-    print(f"   Max Drawdown: ₹{metrics['max_drawdown']:,.2f}")
-    print(f"   Volatility: ₹{metrics['volatility']:,.2f}")
-    print(f"   Sharpe Ratio: {metrics['sharpe_ratio']:.3f}")
-    
-    print("\n" + "=" * 80)
-
-def main():
-    """Main execution function"""
-    try:
-        print_header()
-        
-        print("🚀 Starting derivatives trading dashboard generation...")
-        print(f"📁 Output directory: {os.path.abspath(OUTPUT_DIR)}")
-        print(f"📊 Platform: {TRADING_METADATA['platform']}")
-        print(f"💼 Client: {TRADING_METADATA['client_name']} ({TRADING_METADATA['client_code']})")
-        print(f"📅 Financial Year: {TRADING_METADATA['financial_year']}\n")
-        
-        # Step 1: Generate visualizations
-        print("Step 1/3: Generating visualizations...")
-        print("-" * 80)
-        visualizer = TradingVisualizer()
-        visualizer.generate_all_visualizations()
-        
-        # Step 2: Generate report
-        print("\nStep 2/3: Generating HTML report...")
-        print("-" * 80)
-        report_gen = ReportGenerator()
-        report_file = report_gen.generate_full_report()
-        
-        # Step 3: Print summary
-        print("\nStep 3/3: Summary...")
-        print("-" * 80)
-        print_metrics_summary()
-        
-        # Final output
-        print("\n" + "=" * 80)
-        print("✅ DASHBOARD GENERATION COMPLETE!")
-        print("=" * 80)
-        print(f"\n📄 Report: {os.path.abspath(report_file)}")
-        print(f"📊 Charts: {os.path.abspath(os.path.join(OUTPUT_DIR, 'charts'))}")
-        print("\n💡 Next Steps:")
-        print("   1. Open the HTML report in your browser")
-        print("   2. Review all visualizations and metrics")
-        print("   3. Practice your interview narrative:")
-        print(f"      - Q1 learning phase: Initial losses while developing strategy")
-        print(f"      - Q2 systematic trading: {TRADING_METADATA['total_turnover']/1000:.0f}K turnover, disciplined execution")
-        print(f"      - Result: 3 consecutive profitable months, 100% win rate")
-        print("\n🎯 For Tomorrow's {TRADING_METADATA['company']} Interview:")
-        print("   • Focus on Q2 systematic success (100% win rate)")
-        print("   • Highlight data-driven approach (369% improvement)")
-        print("   • Emphasize discipline and consistency")
-        print("   • Show learning agility (Q1 → Q2 transformation)")
-        print(f"\n🔥 Clean Story: Learning → Systematic → Profitable")
-        print(f"🔥 No distractions, just pure derivatives trading evolution!")
-        print(f"\n🎤 Your Key Line:")
-        print(f'   "Q2 systematic derivatives trading: 3 consecutive wins, 100% win rate,')
-        print(f'    369% improvement from Q1. Data-driven, disciplined, profitable."')
-        print("\n" + "=" * 80 + "\n")
-        
-    except Exception as e:
-        print(f"\n❌ Error occurred: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
-
-if __name__ == "__main__":
+"""
+Main Execution Script - DERIVATIVES ONLY
+Kotak Neo Derivatives Trading Performance Dashboard Generator
+Clean, Systematic Trading Story
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import os
+from datetime import datetime
+from run_context import DashboardContext
+from instrumentation import (get_call_counts, reset_call_counts, stage, reset_stage_timings,
+                             format_stage_timings, ProfileSession, json_default)
+from config import OUTPUT_DIR, ensure_output_dirs
+from trading_data import TRADING_METADATA
+
+def print_header():
+    """Print dashboard header"""
+    print("=" * 80)
+    print("      DERIVATIVES TRADING PERFORMANCE DASHBOARD GENERATOR")
+    print(f"           FY {TRADING_METADATA['financial_year']} | {TRADING_METADATA['company']} Interview")
+    print(f"                    {TRADING_METADATA['platform']} Only")
+    print("=" * 80)
+    print()
+
+def print_metrics_summary(context=None):
+    """Print key metrics summary to console"""
+    print("\n" * 80)
+    print("KEY METRICS SUMMARY - DERIVATIVES TRADING")
+    print("=" * 80)
+    
+    context = context if context is not None else DashboardContext()
+    metrics = context.metrics
+    
+    print(f"\n📊 Overall Performance ({TRADING_METADATA['platform']}):")
+    print(f"   Net P&L: ₹{metrics['total_pnl']:,.2f}")
+    print(f"   Win Rate: {metrics['win_rate']:.1f}%")
+    print(f"   Profit Factor: {metrics['profit_factor']:.2f}")
+    print(f"   Total Turnover: ₹{TRADING_METADATA['total_turnover']:,.2f}")
+    
+    print(f"\n✅ Q2 Systematic Trading (Jul-Sep):")
+    print(f"   Total P&L: ₹{metrics['systematic_pnl']:,.2f}")
+    print(f"   Win Rate: {metrics['systematic_win_rate']:.1f}%")
+    print(f"   Consecutive Profitable Months: {metrics['systematic_profitable_months']}")
+    
+    print(f"\n📚 Q1 Learning Phase (Apr-Jun):")
+    print(f"   Total P&L: ₹{metrics['learning_pnl']:,.2f}")
+    print(f"   Win Rate: {metrics['learning_win_rate']:.1f}%")
+    print(f"   Purpose: Understanding markets, developing strategy")
+    
+    print(f"\n📈 Improvement:")
+    print(f"   Q1 P&L: ₹{metrics['q1_pnl']:,.2f}")
+    print(f"   Q2 P&L: ₹{metrics['q2_pnl']:,.2f}")
+    print(f"   Improvement: +{metrics['q1_to_q2_improvement']:.1f}%")
+    
+    print(f"\n🎯 Best/Worst:")
+    print(f"   Best Month: {metrics['best_month']} (₹{metrics['best_month_pnl']:,.2f})")
+    print(f"   Worst Month: {metrics['worst_month']} (₹{metrics['worst_month_pnl']:,.2f})")
+    
+    print(f"\n🛡️ Risk Metrics:")
+    print(f"   Max Drawdown: ₹{metrics['max_drawdown']:,.2f}")
+    print(f"   Volatility: ₹{metrics['volatility']:,.2f}")
+    print(f"   Sharpe Ratio: {metrics['sharpe_ratio']:.3f}")
+    
+    print("\n" + "=" * 80)
+
+def print_call_counts():
+    """Print how many times each instrumented pipeline function ran"""
+    print("\n🔎 Pipeline call counts (this run):")
+    for name, count in get_call_counts().items():
+        print(f"   {name}: {count}")
+
+def print_stage_timings():
+    """Print wall time (and traced peak allocation) per instrumented stage"""
+    print("\n⏱️ Stage timings (this run):")
+    for line in format_stage_timings().splitlines():
+        print(f"   {line}")
+
+def print_metrics_json(context):
+    """Dump the metrics as JSON, with NumPy scalars converted to plain numbers"""
+    print(json.dumps(context.metrics, indent=2, default=json_default))
+
+def run_metrics_only(as_json=False):
+    """Metrics without charts or report: pandas, matplotlib and seaborn are never imported"""
+    context = DashboardContext()
+    if as_json:
+        print_metrics_json(context)
+    else:
+        print_header()
+        print_metrics_summary(context)
+
+def run_batch_reports(roster_path, workers=None):
+    """Render every account in a roster across a process pool; exit status 1 if any failed"""
+    from batch_reports import load_roster, run_batch, print_batch_summary
+    print_header()
+    accounts = load_roster(roster_path)
+    print(f"🗂️ Rendering {len(accounts)} accounts from {roster_path}\n")
+    summary = run_batch(accounts, workers=workers)
+    print_batch_summary(summary)
+    return 1 if summary['failed'] else 0
+
+def run_live_server(port=None, chart_format=None):
+    """Serve the dashboard over HTTP with metrics pushed to open pages as fills arrive"""
+    from dashboard_server import run_server
+    print_header()
+    run_server(port=port, chart_format=chart_format)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the derivatives trading performance dashboard')
+    parser.add_argument('--profile', action='store_true',
+                        help='capture cProfile + tracemalloc and write profile_report.txt next to the HTML report')
+    parser.add_argument('--metrics-only', action='store_true',
+                        help='print the key metrics summary only (no charts, no report, nothing written)')
+    parser.add_argument('--json', action='store_true',
+                        help='with --metrics-only, print the metrics as JSON instead of the summary')
+    parser.add_argument('--chart-format', metavar='FORMAT',
+                        help="'png' chart files or 'svg' charts inlined into the report (default CHART_FORMAT)")
+    parser.add_argument('--batch', metavar='ROSTER',
+                        help='render metrics, charts and a report for every account in a roster JSON file')
+    parser.add_argument('--workers', type=int,
+                        help='with --batch, number of account worker processes (default BATCH_WORKERS)')
+    parser.add_argument('--serve', action='store_true',
+                        help='run the live dashboard server (JSON metrics, pushed updates, appended fills)')
+    parser.add_argument('--port', type=int,
+                        help="with --serve, port to listen on (default DASHBOARD_SERVER['port'])")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    if args.metrics_only or args.json:
+        run_metrics_only(args.json)
+        return
+    if args.batch:
+        sys.exit(run_batch_reports(args.batch, args.workers))
+    if args.serve:
+        run_live_server(args.port, args.chart_format)
+        return
+    
+    # Plotting and report stacks are only needed for the full dashboard
+    from visualizer import TradingVisualizer
+    from report_generator import ReportGenerator
+    
+    try:
+        reset_call_counts()
+        reset_stage_timings()
+        profiler = ProfileSession() if args.profile else contextlib.nullcontext()
+        print_header()
+        
+        print("🚀 Starting derivatives trading dashboard generation...")
+        print(f"📁 Output directory: {os.path.abspath(OUTPUT_DIR)}")
+        print(f"📊 Platform: {TRADING_METADATA['platform']}")
+        print(f"💼 Client: {TRADING_METADATA['client_name']} ({TRADING_METADATA['client_code']})")
+        print(f"📅 Financial Year: {TRADING_METADATA['financial_year']}\n")
+        
+        ensure_output_dirs()
+        with profiler:
+            # Shared context: frame, metrics and insights are computed once for every consumer
+            context = DashboardContext()
+            
+            # Step 1: Generate visualizations
+            print("Step 1/3: Generating visualizations...")
+            print("-" * 80)
+            with stage('Step 1/3: visualizations'):
+                visualizer = TradingVisualizer(context=context, chart_format=args.chart_format)
+                visualizer.generate_all_visualizations()
+            
+            # Step 2: Generate report
+            print("\nStep 2/3: Generating HTML report...")
+            print("-" * 80)
+            with stage('Step 2/3: HTML report'):
+                report_gen = ReportGenerator(context=context, chart_format=args.chart_format)
+                report_file = report_gen.generate_full_report()
+            
+            # Step 3: Print summary
+            print("\nStep 3/3: Summary...")
+            print("-" * 80)
+            with stage('Step 3/3: summary'):
+                print_metrics_summary(context)
+        
+        print_call_counts()
+        print_stage_timings()
+        if args.profile:
+            profile_file = profiler.write_report(os.path.join(os.path.dirname(report_file), 'profile_report.txt'))
+            print(f"\n🧪 Profile report: {os.path.abspath(profile_file)}")
+        
+        # Final output
+        print("\n" + "=" * 80)
+        print("✅ DASHBOARD GENERATION COMPLETE!")
+        print("=" * 80)
+        print(f"\n📄 Report: {os.path.abspath(report_file)}")
+        print(f"📊 Charts: {os.path.abspath(os.path.join(OUTPUT_DIR, 'charts'))}")
+        print("\n💡 Next Steps:")
+        print("   1. Open the HTML report in your browser")
+        print("   2. Review all visualizations and metrics")
+        print("   3. Practice your interview narrative:")
+        print(f"      - Q1 learning phase: Initial losses while developing strategy")
+        print(f"      - Q2 systematic trading: {TRADING_METADATA['total_turnover']/1000:.0f}K turnover, disciplined execution")
+        print(f"      - Result: 3 consecutive profitable months, 100% win rate")
+        print("\n🎯 For Tomorrow's {TRADING_METADATA['company']} Interview:")
+        print("   • Focus on Q2 systematic success (100% win rate)")
+        print("   • Highlight data-driven approach (369% improvement)")
+        print("   • Emphasize discipline and consistency")
+        print("   • Show learning agility (Q1 → Q2 transformation)")
+        print(f"\n🔥 Clean Story: Learning → Systematic → Profitable")
+        print(f"🔥 No distractions, just pure derivatives trading evolution!")
+        print(f"\n🎤 Your Key Line:")
+        print(f'   "Q2 systematic derivatives trading: 3 consecutive wins, 100% win rate,')
+        print(f'    369% improvement from Q1. Data-driven, disciplined, profitable."')
+        print("\n" + "=" * 80 + "\n")
+        
+    except Exception as e:
+        print(f"\n❌ Error occurred: {str(e)}")
+        print(f"Error type: {type(e).__name__}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
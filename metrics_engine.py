@@ -0,0 +1,186 @@
+"""
+Metrics Engine Module - DERIVATIVES ONLY
+Vectorized NumPy kernels behind TradingAnalytics performance metrics
+"""
+
+import numpy as np
+
+
+def _like_input(value, pnl):
+    """Cast a float accumulator back to the P&L dtype so integer P&L stays integer"""
+    return value.astype(pnl.dtype) if np.issubdtype(pnl.dtype, np.integer) else value
+
+
+def max_consecutive_positive(values):
+    """Longest run of strictly positive values"""
+    if len(values) == 0:
+        return 0
+    
+    # Run lengths are the gaps between non-positive entries
+    breaks = np.flatnonzero(values <= 0)
+    edges = np.concatenate(([-1], breaks, [len(values)]))
+    return int(np.max(np.diff(edges)) - 1)
+
+
+def drawdown_profile(cumulative):
+    """Max drawdown with peak/trough positions and recovery for a cumulative P&L series"""
+    running_max = np.maximum.accumulate(cumulative)
+    drawdown = cumulative - running_max
+    trough_idx = int(np.argmin(drawdown))
+    peak_idx = int(np.argmax(cumulative[:trough_idx + 1])) if trough_idx > 0 else 0
+    
+    return {
+        'max_drawdown': drawdown[trough_idx],
+        'peak_index': peak_idx,
+        'trough_index': trough_idx,
+        'recovery': cumulative[-1] - cumulative[trough_idx] if trough_idx < len(cumulative) - 1 else 0
+    }
+
+
+def pnl_metrics(pnl):
+    """
+    Compute every scalar P&L statistic from one contiguous array.
+    Zero entries count as periods without trading, matching TradingAnalytics.
+    """
+    pnl = np.ascontiguousarray(pnl)
+    metrics = {}
+    
+    # Bucket each period as loss (0), flat (1) or profit (2) once and reduce per bucket
+    bucket = (pnl > 0).view(np.int8) - (pnl < 0).view(np.int8) + np.int8(1)
+    counts = np.bincount(bucket, minlength=3)
+    sums = _like_input(np.bincount(bucket, weights=pnl, minlength=3), pnl)
+    losses, profits = int(counts[0]), int(counts[2])
+    traded_count = losses + profits
+    
+    metrics['total_pnl'] = pnl.sum()
+    metrics['derivative_total'] = metrics['total_pnl']
+    metrics['total_months_traded'] = traded_count
+    metrics['profitable_months'] = profits
+    metrics['loss_months'] = losses
+    metrics['win_rate'] = (profits / traded_count * 100) if traded_count > 0 else 0
+    
+    metrics['avg_profit'] = sums[2] / profits if profits > 0 else 0
+    metrics['avg_loss'] = sums[0] / losses if losses > 0 else 0
+    
+    gross_profit = sums[2]
+    gross_loss = abs(sums[0])
+    metrics['gross_profit'] = gross_profit
+    metrics['gross_loss'] = gross_loss
+    metrics['profit_factor'] = gross_profit / gross_loss if gross_loss > 0 else 0
+    
+    # Daily and per-trade series rarely contain flat periods, so skip the gather when possible
+    has_flat = counts[1] > 0
+    traded_idx = np.flatnonzero(bucket != 1) if has_flat else None
+    traded = pnl[traded_idx] if has_flat else pnl
+    metrics['volatility'] = np.std(traded) if traded_count > 0 else 0
+    metrics['avg_monthly_return'] = (sums[0] + sums[2]) / traded_count if traded_count > 0 else 0
+    metrics['sharpe_ratio'] = metrics['avg_monthly_return'] / metrics['volatility'] if metrics['volatility'] > 0 else 0
+    
+    # Positions into the original array, for the caller to map onto period labels
+    if traded_count > 0:
+        best, worst = int(np.argmax(traded)), int(np.argmin(traded))
+        metrics['best_index'] = int(traded_idx[best]) if has_flat else best
+        metrics['worst_index'] = int(traded_idx[worst]) if has_flat else worst
+    else:
+        metrics['best_index'] = metrics['worst_index'] = None
+    
+    if len(pnl) > 0:
+        drawdown = drawdown_profile(np.cumsum(pnl))
+    else:
+        drawdown = {'max_drawdown': 0, 'peak_index': None, 'trough_index': None, 'recovery': 0}
+    metrics['max_drawdown'] = drawdown['max_drawdown']
+    metrics['drawdown_peak_index'] = drawdown['peak_index']
+    metrics['drawdown_trough_index'] = drawdown['trough_index']
+    metrics['recovery_amount'] = drawdown['recovery']
+    
+    metrics['max_consecutive_profits'] = max_consecutive_positive(traded)
+    metrics['risk_adjusted_return'] = metrics['total_pnl'] / metrics['volatility'] if metrics['volatility'] > 0 else 0
+    
+    return metrics
+
+
+def factorize(labels):
+    """
+    Integer codes in order of first appearance plus the distinct labels,
+    like pd.factorize; None/NaN labels get code -1.
+    """
+    codes = np.empty(len(labels), dtype=np.intp)
+    uniques = []
+    positions = {}
+    for i, label in enumerate(labels):
+        if label is None or label != label:
+            codes[i] = -1
+            continue
+        code = positions.get(label)
+        if code is None:
+            code = positions[label] = len(uniques)
+            uniques.append(label)
+        codes[i] = code
+    return codes, uniques
+
+
+def group_pnl(pnl, codes, n_groups):
+    """
+    Per-group totals, period counts and profitable-period counts.
+    Negative codes mark unclassified periods and are ignored.
+    """
+    pnl = np.ascontiguousarray(pnl)
+    codes = np.asarray(codes)
+    keep = codes >= 0
+    if not keep.all():
+        pnl, codes = pnl[keep], codes[keep]
+    
+    totals = _like_input(np.bincount(codes, weights=pnl, minlength=n_groups), pnl)
+    counts = np.bincount(codes, minlength=n_groups)
+    profitable = np.bincount(codes, weights=pnl > 0, minlength=n_groups).astype(np.int64)
+    return totals, counts, profitable
+
+def batch_pnl_metrics(pnl_matrix):
+    """
+    Core metrics for many accounts at once from an (accounts x periods) P&L matrix.
+    Every statistic is a reduction along axis 1, so there is no per-account loop.
+    """
+    pnl = np.atleast_2d(np.asarray(pnl_matrix, dtype=np.float64))
+    wins = pnl > 0
+    losses = pnl < 0
+    traded = wins | losses
+    
+    profitable = wins.sum(axis=1)
+    loss_count = losses.sum(axis=1)
+    traded_count = profitable + loss_count
+    has_trades = traded_count > 0
+    safe_count = np.where(has_trades, traded_count, 1)
+    
+    gross_profit = np.where(wins, pnl, 0).sum(axis=1)
+    gross_loss = -np.where(losses, pnl, 0).sum(axis=1)
+    total = pnl.sum(axis=1)
+    
+    mean = np.where(has_trades, total / safe_count, 0)
+    deviation = np.where(traded, pnl - mean[:, None], 0)
+    volatility = np.sqrt((deviation * deviation).sum(axis=1) / safe_count)
+    safe_vol = np.where(volatility > 0, volatility, 1)
+    safe_loss = np.where(gross_loss > 0, gross_loss, 1)
+    
+    cumulative = np.cumsum(pnl, axis=1)
+    drawdown = cumulative - np.maximum.accumulate(cumulative, axis=1)
+    
+    # Streak of wins since the last loss; flat periods neither extend nor break it
+    win_count = np.cumsum(wins, axis=1)
+    last_reset = np.maximum.accumulate(np.where(losses, win_count, 0), axis=1)
+    streak = (win_count - last_reset).max(axis=1) if pnl.shape[1] > 0 else np.zeros(len(pnl), dtype=np.int64)
+    
+    return {
+        'total_pnl': total,
+        'total_months_traded': traded_count,
+        'profitable_months': profitable,
+        'loss_months': loss_count,
+        'win_rate': np.where(has_trades, profitable / safe_count * 100, 0),
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+        'profit_factor': np.where(gross_loss > 0, gross_profit / safe_loss, 0),
+        'avg_monthly_return': mean,
+        'volatility': volatility,
+        'sharpe_ratio': np.where(volatility > 0, mean / safe_vol, 0),
+        'max_drawdown': drawdown.min(axis=1) if pnl.shape[1] > 0 else np.zeros(len(pnl)),
+        'max_consecutive_profits': streak
+    }
\ No newline at end of file
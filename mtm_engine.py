@@ -0,0 +1,362 @@
+"""
+MTM Engine Module - DERIVATIVES ONLY
+Intraday mark-to-market of open option positions from a replayable tick feed
+"""
+
+import json
+import os
+import numpy as np
+from config import TICK_FILE_COLUMNS, MTM_ENGINE
+from metrics_engine import drawdown_profile
+from trade_ingestion import FILL_DTYPE
+
+# One traded-price update. Symbols are interned as integer codes into PositionBook.symbols
+TICK_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ms]'),
+    ('symbol', np.int32),
+    ('price', np.float64)
+])
+
+# Book-wide mark-to-market after a tick or fill
+MTM_POINT_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ms]'),
+    ('mtm', np.float64)
+])
+
+
+class MTMSeries:
+    """Growable, array-backed (timestamp, mtm) series"""
+    
+    def __init__(self, capacity=4096):
+        self._data = np.empty(capacity, dtype=MTM_POINT_DTYPE)
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def points(self):
+        """View of the recorded points (no copy)"""
+        return self._data[:self._size]
+    
+    def _reserve(self, required):
+        if required > len(self._data):
+            grown = np.empty(max(required, 2 * len(self._data)), dtype=MTM_POINT_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+    
+    def append(self, timestamp, mtm):
+        """Record one point"""
+        self._reserve(self._size + 1)
+        self._data[self._size] = (timestamp, mtm)
+        self._size += 1
+    
+    def extend(self, timestamps, mtm):
+        """Record a batch of points"""
+        required = self._size + len(mtm)
+        self._reserve(required)
+        self._data['timestamp'][self._size:required] = timestamps
+        self._data['mtm'][self._size:required] = mtm
+        self._size = required
+
+
+class PositionBook:
+    """
+    Open positions per contract, marked to market on every tick.
+    
+    Book MTM = realized P&L (average-cost, net of charges) + sum of position * (last - average price).
+    A tick moves it by position * (price - previous price) of its contract only, so the scalar
+    path is O(1) per tick; between fills positions are constant, so apply_ticks() marks whole
+    batches with one sort and one cumulative sum.
+    """
+    
+    def __init__(self, capacity=64, record=None):
+        self.symbols = []
+        self._symbol_codes = {}
+        self.position = np.zeros(capacity, dtype=np.int64)
+        self.avg_price = np.zeros(capacity)
+        self.last_price = np.zeros(capacity)
+        
+        self.mtm = 0.0
+        self.realized = 0.0
+        self.charges = 0.0
+        self.ticks = 0
+        self.fills = 0
+        
+        # Running peak and max drawdown of the MTM series, with calculate_drawdown()'s tie rules
+        self.peak = None
+        self.peak_time = None
+        self.max_drawdown = 0.0
+        self.drawdown_peak_time = None
+        self.drawdown_trough_time = None
+        
+        record = MTM_ENGINE['record_series'] if record is None else record
+        self.series = MTMSeries() if record else None
+    
+    def intern_symbols(self, names):
+        """Map contract names to stable integer codes, growing the per-contract arrays"""
+        uniques, inverse = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+        codes = np.empty(len(uniques), dtype=np.int32)
+        for i, name in enumerate(uniques):
+            code = self._symbol_codes.get(name)
+            if code is None:
+                code = len(self.symbols)
+                self._symbol_codes[name] = code
+                self.symbols.append(name)
+            codes[i] = code
+        
+        if len(self.symbols) > len(self.position):
+            capacity = max(len(self.symbols), 2 * len(self.position))
+            for field in ('position', 'avg_price', 'last_price'):
+                current = getattr(self, field)
+                grown = np.zeros(capacity, dtype=current.dtype)
+                grown[:len(current)] = current
+                setattr(self, field, grown)
+        return codes[inverse]
+    
+    def _code(self, symbol):
+        code = self._symbol_codes.get(symbol)
+        return int(self.intern_symbols([symbol])[0]) if code is None else code
+    
+    def _track(self, timestamp):
+        """Fold the current MTM into the running peak/drawdown (and the recorded series)"""
+        mtm = self.mtm
+        if self.peak is None or mtm > self.peak:
+            self.peak, self.peak_time = mtm, timestamp
+        if self.drawdown_trough_time is None or mtm - self.peak < self.max_drawdown:
+            self.max_drawdown = mtm - self.peak
+            self.drawdown_peak_time = self.peak_time
+            self.drawdown_trough_time = timestamp
+        if self.series is not None:
+            self.series.append(timestamp, mtm)
+    
+    def apply_tick(self, symbol, price, timestamp):
+        """Mark one contract to a new traded price in O(1)"""
+        code = self._code(symbol) if isinstance(symbol, str) else symbol
+        self.mtm += self.position[code] * (price - self.last_price[code])
+        self.last_price[code] = price
+        self.ticks += 1
+        self._track(np.datetime64(timestamp, 'ms'))
+    
+    def apply_fill(self, symbol, side, quantity, price, timestamp, charges=0.0):
+        """Book one fill (side +1 buy / -1 sell): the contract is marked to the fill price, then traded"""
+        code = self._code(symbol) if isinstance(symbol, str) else symbol
+        self.mtm += self.position[code] * (price - self.last_price[code])
+        self.last_price[code] = price
+        
+        # Average-cost accounting: adding keeps a blended entry, reducing realizes against it
+        position = int(self.position[code])
+        if position == 0 or (position > 0) == (side > 0):
+            held = abs(position)
+            self.avg_price[code] = (self.avg_price[code] * held + price * quantity) / (held + quantity)
+        else:
+            closed = min(abs(position), quantity)
+            self.realized += closed * (price - self.avg_price[code]) * (1 if position > 0 else -1)
+            if quantity > abs(position):
+                self.avg_price[code] = price  # Flipped: the remainder opens at the fill price
+            elif quantity == abs(position):
+                self.avg_price[code] = 0.0
+        self.position[code] = position + side * quantity
+        
+        self.realized -= charges
+        self.charges += charges
+        self.mtm -= charges
+        self.fills += 1
+        self._track(np.datetime64(timestamp, 'ms'))
+    
+    def apply_ticks(self, ticks):
+        """
+        Mark a chronological TICK_DTYPE batch with no fills inside it.
+        Returns the book MTM after every tick.
+        """
+        n = len(ticks)
+        if n == 0:
+            return np.empty(0)
+        symbols = ticks['symbol']
+        prices = ticks['price']
+        
+        # Group ticks by contract (a radix sort for small symbol tables) to find each tick's previous price
+        keys = symbols.astype(np.int16) if len(self.symbols) <= np.iinfo(np.int16).max else symbols
+        order = np.argsort(keys, kind='stable')
+        grouped_symbols = symbols[order]
+        grouped_prices = prices[order]
+        starts = np.empty(n, dtype=bool)
+        starts[0] = True
+        np.not_equal(grouped_symbols[1:], grouped_symbols[:-1], out=starts[1:])
+        
+        previous = np.empty(n)
+        previous[1:] = grouped_prices[:-1]
+        previous[starts] = self.last_price[grouped_symbols[starts]]
+        
+        delta = np.empty(n)
+        delta[order] = self.position[grouped_symbols] * (grouped_prices - previous)
+        mtm = self.mtm + np.cumsum(delta)
+        
+        ends = np.empty(n, dtype=bool)
+        ends[-1] = True
+        ends[:-1] = starts[1:]
+        self.last_price[grouped_symbols[ends]] = grouped_prices[ends]
+        self.mtm = float(mtm[-1])
+        self.ticks += n
+        
+        self._track_batch(ticks['timestamp'], mtm)
+        if self.series is not None:
+            self.series.extend(ticks['timestamp'], mtm)
+        return mtm
+    
+    def _track_batch(self, timestamps, mtm):
+        """_track() for a whole batch via the shared drawdown kernel, seeded with the running peak"""
+        seeded = self.peak is not None
+        profile = drawdown_profile(np.r_[self.peak, mtm] if seeded else mtm)
+        offset = 1 if seeded else 0
+        
+        if self.drawdown_trough_time is None or profile['max_drawdown'] < self.max_drawdown:
+            self.max_drawdown = float(profile['max_drawdown'])
+            self.drawdown_trough_time = timestamps[profile['trough_index'] - offset]
+            if seeded and profile['peak_index'] == 0:
+                self.drawdown_peak_time = self.peak_time
+            else:
+                self.drawdown_peak_time = timestamps[profile['peak_index'] - offset]
+        
+        top = int(np.argmax(mtm))
+        if not seeded or mtm[top] > self.peak:
+            self.peak, self.peak_time = float(mtm[top]), timestamps[top]
+    
+    @property
+    def unrealized(self):
+        """Open-position P&L at the last traded prices"""
+        held = len(self.symbols)
+        return float(np.dot(self.position[:held], self.last_price[:held] - self.avg_price[:held]))
+    
+    def open_positions(self):
+        """Non-flat contracts with quantity, average and last price, and unrealized P&L"""
+        positions = []
+        for code in np.flatnonzero(self.position[:len(self.symbols)]).tolist():
+            quantity = int(self.position[code])
+            positions.append({
+                'symbol': self.symbols[code],
+                'quantity': quantity,
+                'avg_price': float(self.avg_price[code]),
+                'last_price': float(self.last_price[code]),
+                'unrealized': quantity * float(self.last_price[code] - self.avg_price[code])
+            })
+        return positions
+    
+    def snapshot(self):
+        """Current MTM split into realized/unrealized, with the running drawdown"""
+        return {
+            'mtm': self.mtm,
+            'realized': self.realized,
+            'unrealized': self.unrealized,
+            'charges': self.charges,
+            'open_positions': len(self.open_positions()),
+            'ticks': self.ticks,
+            'fills': self.fills,
+            'max_drawdown': self.max_drawdown,
+            'drawdown_peak_time': self.drawdown_peak_time,
+            'drawdown_trough_time': self.drawdown_trough_time
+        }
+    
+    def cumulative_series(self):
+        """(timestamps, cumulative MTM P&L) recorded so far - the series calculate_drawdown() works on"""
+        points = self.series.points
+        return points['timestamp'], points['mtm']
+    
+    def calculate_drawdown(self):
+        """TradingDataProcessor.calculate_drawdown() over the recorded intraday MTM series"""
+        timestamps, cumulative = self.cumulative_series()
+        if len(cumulative) == 0:
+            return {'max_drawdown': 0, 'peak_time': None, 'trough_time': None, 'recovery': 0}
+        profile = drawdown_profile(cumulative)
+        return {
+            'max_drawdown': profile['max_drawdown'],
+            'peak_time': timestamps[profile['peak_index']],
+            'trough_time': timestamps[profile['trough_index']],
+            'recovery': profile['recovery']
+        }
+    
+    def daily_pnl(self):
+        """(dates, P&L) from each day's closing MTM, ready for PnLStore.write_daily_pnl"""
+        timestamps, cumulative = self.cumulative_series()
+        days = timestamps.astype('datetime64[D]')
+        closes = np.flatnonzero(np.r_[days[1:] != days[:-1], True]) if len(days) else np.array([], dtype=np.intp)
+        return days[closes], np.diff(np.r_[0.0, cumulative[closes]])
+
+
+def _parse_tick_chunk(chunk, book):
+    """Parse one raw tick file chunk into a TICK_DTYPE array"""
+    import pandas as pd
+    cols = TICK_FILE_COLUMNS
+    ticks = np.empty(len(chunk), dtype=TICK_DTYPE)
+    ticks['timestamp'] = pd.to_datetime(chunk[cols['timestamp']]).values.astype('datetime64[ms]')
+    ticks['symbol'] = book.intern_symbols(chunk[cols['symbol']].values)
+    ticks['price'] = chunk[cols['price']].values
+    return ticks
+
+
+def iter_tick_file(path, book, chunksize=None):
+    """
+    Yield chronological TICK_DTYPE chunks from a recorded feed, symbols interned into `book`.
+    A CSV (TICK_FILE_COLUMNS) is streamed chunksize rows at a time; a binary feed written by
+    write_tick_file() is memory-mapped and sliced without parsing.
+    """
+    chunksize = chunksize or MTM_ENGINE['tick_chunk_size']
+    if path.endswith('.npy'):
+        ticks = np.load(path, mmap_mode='r')
+        with open(f"{path[:-len('.npy')]}.symbols.json", encoding='utf-8') as f:
+            remap = book.intern_symbols(json.load(f))
+        for start in range(0, len(ticks), chunksize):
+            chunk = np.array(ticks[start:start + chunksize])
+            chunk['symbol'] = remap[chunk['symbol']]
+            yield chunk
+        return
+    
+    import pandas as pd
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield _parse_tick_chunk(chunk, book)
+
+
+def write_tick_file(path, ticks, symbols):
+    """Save ticks (codes into `symbols`) as a memory-mappable .npy feed plus its symbol table"""
+    base = path[:-len('.npy')] if path.endswith('.npy') else path
+    os.makedirs(os.path.dirname(base) or '.', exist_ok=True)
+    np.save(f"{base}.npy", np.asarray(ticks, dtype=TICK_DTYPE))
+    with open(f"{base}.symbols.json", 'w', encoding='utf-8') as f:
+        json.dump(list(symbols), f)
+    return f"{base}.npy"
+
+
+def replay(book, tick_chunks, fills=None, fill_symbols=None):
+    """
+    Apply fills (FILL_DTYPE, codes into fill_symbols) and chronological tick chunks in time order.
+    Positions only change at fills, so the ticks between two fills are marked as one batch;
+    a fill goes before ticks with the same timestamp.
+    """
+    fills = np.empty(0, dtype=FILL_DTYPE) if fills is None else np.asarray(fills, dtype=FILL_DTYPE)
+    fills = fills[np.argsort(fills['timestamp'], kind='stable')]
+    codes = book.intern_symbols(fill_symbols)[fills['symbol']] if len(fills) else np.empty(0, dtype=np.int32)
+    fill_times = fills['timestamp'].astype('datetime64[ms]')
+    
+    def apply_fills(first, last):
+        for i in range(first, last):
+            fill = fills[i]
+            book.apply_fill(int(codes[i]), int(fill['side']), int(fill['quantity']), float(fill['price']),
+                            fill_times[i], float(fill['charges']))
+    
+    applied = 0
+    for ticks in tick_chunks:
+        if len(ticks) == 0:
+            continue
+        times = ticks['timestamp']
+        due = int(np.searchsorted(fill_times, times[-1], 'right'))
+        cuts = np.searchsorted(times, fill_times[applied:due], 'left').tolist()
+        start = 0
+        for i, cut in enumerate(cuts, applied):
+            book.apply_ticks(ticks[start:cut])
+            apply_fills(i, i + 1)
+            start = cut
+        book.apply_ticks(ticks[start:])
+        applied = due
+    
+    apply_fills(applied, len(fills))
+    return book
\ No newline at end of file
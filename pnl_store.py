@@ -0,0 +1,241 @@
+"""
+P&L Store Module - DERIVATIVES ONLY
+Columnar on-disk history of fills and daily P&L, memory-mapped for zero-copy reads
+"""
+
+import json
+import os
+import numpy as np
+from config import PNL_STORE_DIR
+from fy_calendar import FY_MONTHS, financial_year_start, financial_year_label, parse_financial_year, fy_month_index
+from trade_ingestion import FILL_DTYPE, paise_to_rupees, realized_pnl_paise, _to_paise
+
+# Daily realized P&L, kept in exact paise like the ingestion aggregates
+DAILY_DTYPE = np.dtype([
+    ('date', 'datetime64[D]'),
+    ('pnl_paise', np.int64)
+])
+
+
+def _atomic_save(path, array):
+    """Write an .npy file via a temporary file so readers never see a partial partition"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _atomic_save_json(path, value):
+    """JSON counterpart of _atomic_save"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+def _fy_bounds(start, end):
+    """FY start years overlapping [start, end]; None leaves a side open"""
+    low = int(financial_year_start(np.datetime64(start, 'D'))) if start is not None else None
+    high = int(financial_year_start(np.datetime64(end, 'D'))) if end is not None else None
+    return low, high
+
+
+class PnLStore:
+    """
+    Partitioned (client code / financial year) store of .npy columns.
+    A partition's daily P&L comes either from its fills (write_fills) or from a series stored
+    directly (write_daily_pnl), never both: the two writers reject each other's partitions.
+    """
+    
+    def __init__(self, root=None):
+        self.root = root or PNL_STORE_DIR
+    
+    def _partition_dir(self, client_code, fy_start):
+        return os.path.join(self.root, f"client={client_code}", f"fy={financial_year_label(fy_start)}")
+    
+    def partitions(self, client_codes=None, start=None, end=None):
+        """(client_code, fy_start) pairs that can hold data for the given predicates"""
+        if not os.path.isdir(self.root):
+            return []
+        
+        low, high = _fy_bounds(start, end)
+        wanted = set(client_codes) if client_codes is not None else None
+        found = []
+        for client_dir in sorted(os.listdir(self.root)):
+            if not client_dir.startswith('client='):
+                continue
+            client_code = client_dir[len('client='):]
+            if wanted is not None and client_code not in wanted:
+                continue
+            for fy_dir in sorted(os.listdir(os.path.join(self.root, client_dir))):
+                if not fy_dir.startswith('fy='):
+                    continue
+                fy_start = int(fy_dir[len('fy='):][:4])
+                if (low is None or fy_start >= low) and (high is None or fy_start <= high):
+                    found.append((client_code, fy_start))
+        return found
+    
+    def write_fills(self, client_code, fills, symbols):
+        """Merge fills (FILL_DTYPE, codes into symbols) into the client's FY partitions"""
+        fills = np.asarray(fills, dtype=FILL_DTYPE)
+        fy_starts = financial_year_start(fills['timestamp'])
+        self._check_exclusive(client_code, fy_starts, writing_fills=True)
+        
+        for fy_start in np.unique(fy_starts).tolist():
+            part = fills[fy_starts == fy_start]
+            part_dir = self._partition_dir(client_code, fy_start)
+            os.makedirs(part_dir, exist_ok=True)
+            
+            existing, table = self._load_fills(part_dir, mmap=False)
+            
+            # Re-code incoming symbols against the partition's own symbol table
+            codes = {name: i for i, name in enumerate(table)}
+            remap = np.empty(len(symbols), dtype=np.int32)
+            for i, name in enumerate(symbols):
+                if name not in codes:
+                    codes[name] = len(table)
+                    table.append(name)
+                remap[i] = codes[name]
+            part = part.copy()
+            part['symbol'] = remap[part['symbol']]
+            
+            merged = np.concatenate([existing, part]) if len(existing) else part
+            merged = merged[np.argsort(merged['timestamp'], kind='stable')]
+            
+            # The table only grows, so saving it first keeps the old fills decodable
+            _atomic_save_json(os.path.join(part_dir, 'symbols.json'), table)
+            _atomic_save(os.path.join(part_dir, 'fills.npy'), merged)
+        
+        if len(fills):
+            self._rebuild_daily(client_code, int(fy_starts.min()))
+    
+    def write_daily_pnl(self, client_code, dates, pnl):
+        """Store a daily P&L series directly (rupees), replacing overlapping days"""
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        paise = _to_paise(pnl)
+        fy_starts = financial_year_start(dates)
+        self._check_exclusive(client_code, fy_starts, writing_fills=False)
+        
+        for fy_start in np.unique(fy_starts).tolist():
+            mask = fy_starts == fy_start
+            part_dir = self._partition_dir(client_code, fy_start)
+            os.makedirs(part_dir, exist_ok=True)
+            
+            incoming = np.empty(int(mask.sum()), dtype=DAILY_DTYPE)
+            incoming['date'] = dates[mask]
+            incoming['pnl_paise'] = paise[mask]
+            
+            existing = self._load_daily(part_dir, mmap=False)
+            if len(existing):
+                existing = existing[~np.isin(existing['date'], incoming['date'])]
+                incoming = np.concatenate([existing, incoming])
+            self._write_daily(part_dir, incoming)
+    
+    def _check_exclusive(self, client_code, fy_starts, writing_fills):
+        """Refuse partitions populated by the other writer before anything is written"""
+        for fy_start in np.unique(fy_starts).tolist():
+            part_dir = self._partition_dir(client_code, fy_start)
+            has_fills = os.path.exists(os.path.join(part_dir, 'fills.npy'))
+            if writing_fills and not has_fills and os.path.exists(os.path.join(part_dir, 'daily.npy')):
+                raise ValueError(f"Partition {part_dir} holds a daily P&L series from write_daily_pnl; cannot add fills")
+            if not writing_fills and has_fills:
+                raise ValueError(f"Partition {part_dir} holds fills and derives its daily P&L from them; "
+                                 "cannot store a daily series directly")
+    
+    def _write_daily(self, part_dir, daily):
+        daily = daily[np.argsort(daily['date'], kind='stable')]
+        _atomic_save(os.path.join(part_dir, 'daily.npy'), daily)
+    
+    def _rebuild_daily(self, client_code, first_fy):
+        """
+        Recompute daily realized P&L for the client's partitions from first_fy on.
+        History is replayed from the first partition so positions opened in one FY close into the next.
+        """
+        fills, _ = self.read_fills(client_code)
+        realized = realized_pnl_paise(fills)
+        fy_starts = financial_year_start(fills['timestamp'])
+        
+        for fy_start in np.unique(fy_starts[fy_starts >= first_fy]).tolist():
+            mask = fy_starts == fy_start
+            daily = self._daily_from_fills(fills[mask], realized[mask])
+            self._write_daily(self._partition_dir(client_code, fy_start), daily)
+    
+    @staticmethod
+    def _daily_from_fills(fills, realized):
+        """Aggregate per-fill realized P&L (paise) into one row per trading day"""
+        days = fills['timestamp'].astype('datetime64[D]')
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(days) else np.array([], dtype=np.intp)
+        
+        daily = np.empty(len(starts), dtype=DAILY_DTYPE)
+        daily['date'] = days[starts]
+        daily['pnl_paise'] = np.add.reduceat(realized, starts) if len(starts) else 0
+        return daily
+    
+    def _load_fills(self, part_dir, mmap=True):
+        path = os.path.join(part_dir, 'fills.npy')
+        if not os.path.exists(path):
+            return np.empty(0, dtype=FILL_DTYPE), []
+        with open(os.path.join(part_dir, 'symbols.json'), encoding='utf-8') as f:
+            symbols = json.load(f)
+        return np.load(path, mmap_mode='r' if mmap else None), symbols
+    
+    def _load_daily(self, part_dir, mmap=True):
+        path = os.path.join(part_dir, 'daily.npy')
+        if not os.path.exists(path):
+            return np.empty(0, dtype=DAILY_DTYPE)
+        return np.load(path, mmap_mode='r' if mmap else None)
+    
+    @staticmethod
+    def _slice(column, start, end, unit):
+        """Row range of a sorted time column inside [start, end] via binary search"""
+        lo = np.searchsorted(column, np.datetime64(start, unit), 'left') if start is not None else 0
+        hi = np.searchsorted(column, np.datetime64(end, 'D') + np.timedelta64(1, 'D'), 'left') if end is not None else len(column)
+        return slice(lo, hi)
+    
+    def iter_fills(self, client_codes=None, start=None, end=None):
+        """Yield (client_code, fy_start, fills, symbols) per partition; fills are memory-mapped views"""
+        for client_code, fy_start in self.partitions(client_codes, start, end):
+            fills, symbols = self._load_fills(self._partition_dir(client_code, fy_start))
+            yield client_code, fy_start, fills[self._slice(fills['timestamp'], start, end, 's')], symbols
+    
+    def iter_daily_pnl(self, client_codes=None, start=None, end=None):
+        """Yield (client_code, fy_start, daily) per partition; daily rows are memory-mapped views"""
+        for client_code, fy_start in self.partitions(client_codes, start, end):
+            daily = self._load_daily(self._partition_dir(client_code, fy_start))
+            yield client_code, fy_start, daily[self._slice(daily['date'], start, end, 'D')]
+    
+    def read_fills(self, client_code, start=None, end=None):
+        """All fills for one client in date order, with a single merged symbol table"""
+        chunks, table, codes = [], [], {}
+        for _, _, fills, symbols in self.iter_fills([client_code], start, end):
+            remap = np.empty(len(symbols), dtype=np.int32)
+            for i, name in enumerate(symbols):
+                if name not in codes:
+                    codes[name] = len(table)
+                    table.append(name)
+                remap[i] = codes[name]
+            chunk = np.array(fills)
+            chunk['symbol'] = remap[chunk['symbol']]
+            chunks.append(chunk)
+        
+        fills = np.concatenate(chunks) if chunks else np.empty(0, dtype=FILL_DTYPE)
+        return fills, table
+    
+    def read_daily_pnl(self, client_code, start=None, end=None):
+        """(dates, pnl in rupees) for one client across every matching partition"""
+        parts = [daily for _, _, daily in self.iter_daily_pnl([client_code], start, end)]
+        daily = np.concatenate(parts) if parts else np.empty(0, dtype=DAILY_DTYPE)
+        return daily['date'], daily['pnl_paise'] / 100
+    
+    def monthly_pnl(self, client_code, financial_year):
+        """Monthly P&L for one FY, shaped like trading_data.kotak_derivative"""
+        fy_start = parse_financial_year(financial_year)
+        daily = self._load_daily(self._partition_dir(client_code, fy_start))
+        if len(daily) == 0:
+            return {}
+        
+        # FY month index 0..11 from April, then one bincount per partition
+        month_index = fy_month_index(daily['date'])
+        totals = np.bincount(month_index, weights=daily['pnl_paise'], minlength=12)
+        last = int(month_index.max())
+        return {FY_MONTHS[i]: paise_to_rupees(round(totals[i])) for i in range(last + 1)}
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Resampling Module - DERIVATIVES ONLY
+Bootstrap confidence intervals and randomization p-values for the headline performance metrics
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from instrumentation import count_calls, timed
+from config import RESAMPLING
+
+# Statistics resampled for every P&L series, in report order
+RESAMPLED_STATISTICS = ('sharpe_ratio', 'win_rate', 'profit_factor')
+
+# Trading styles compared by the style tests: first minus second
+STYLE_COMPARISON = ('Systematic', 'Learning')
+
+# Quarters compared by the quarter tests (the q1_to_q2_improvement claim): first minus second
+QUARTER_COMPARISON = ('Q2', 'Q1')
+
+# Independent random stream per resampling scheme
+_SCHEMES = ('bootstrap', 'sign_flip', 'style_bootstrap', 'style_permutation', 'quarter_bootstrap', 'quarter_permutation')
+
+# Relative slack when counting null draws that tie the observed statistic
+_TIE_TOLERANCE = 1e-9
+
+
+def series_statistics(samples):
+    """
+    Sharpe ratio, win rate (%) and profit factor of every row of a (resamples x periods) matrix.
+    Rows hold traded periods only; a row without losses has an unbounded profit factor.
+    """
+    periods = samples.shape[1]
+    total = samples.sum(axis=1)
+    mean = total / periods
+    volatility = samples.std(axis=1)
+    
+    # Gross profit and loss from one plain and one absolute sum instead of two masked passes
+    absolute = np.abs(samples).sum(axis=1)
+    gross_profit = (absolute + total) / 2
+    gross_loss = (absolute - total) / 2
+    safe_vol = np.where(volatility > 0, volatility, 1)
+    safe_loss = np.where(gross_loss > 0, gross_loss, 1)
+    
+    return {
+        'sharpe_ratio': np.where(volatility > 0, mean / safe_vol, 0),
+        'win_rate': np.count_nonzero(samples > 0, axis=1) / periods * 100,
+        'profit_factor': np.where(gross_loss > 0, gross_profit / safe_loss, np.inf)
+    }
+
+
+def style_differences(mean_a, mean_b, win_rate_a, win_rate_b):
+    """Per-period mean P&L and win-rate (percentage points) differences, group (style or quarter) A minus B"""
+    return {'mean_pnl': mean_a - mean_b, 'win_rate': win_rate_a - win_rate_b}
+
+
+def membership_differences(pnl, members):
+    """style_differences() for every row of a boolean (resamples x periods) group-A membership matrix"""
+    members = members.astype(np.float64)
+    count_a = members.sum(axis=1)
+    count_b = members.shape[1] - count_a
+    
+    # Group sums as matrix-vector products; style B is everything outside style A
+    sum_a = members @ pnl
+    wins_a = members @ (pnl > 0).astype(np.float64)
+    return style_differences(sum_a / count_a, (pnl.sum() - sum_a) / count_b,
+                             wins_a / count_a * 100, (np.count_nonzero(pnl > 0) - wins_a) / count_b * 100)
+
+
+def _resample_chunk(scheme, data, seed, size):
+    """Statistics of `size` draws of one resampling scheme from its own random stream"""
+    rng = np.random.default_rng(seed)
+    
+    if scheme == 'bootstrap':
+        # Periods drawn with replacement
+        pnl, = data
+        return series_statistics(pnl[rng.integers(0, len(pnl), (size, len(pnl)))])
+    
+    if scheme == 'sign_flip':
+        # Null of no edge: P&L symmetric around zero, so each period's sign is a coin flip
+        pnl, = data
+        signs = rng.integers(0, 2, (size, len(pnl)), dtype=np.int8) * 2 - 1
+        return series_statistics(pnl * signs)
+    
+    if scheme in ('style_bootstrap', 'quarter_bootstrap'):
+        # Each group's periods drawn with replacement, independently
+        pnl_a, pnl_b = data
+        sample_a = pnl_a[rng.integers(0, len(pnl_a), (size, len(pnl_a)))]
+        sample_b = pnl_b[rng.integers(0, len(pnl_b), (size, len(pnl_b)))]
+        return style_differences(sample_a.mean(axis=1), sample_b.mean(axis=1),
+                                 (sample_a > 0).mean(axis=1) * 100, (sample_b > 0).mean(axis=1) * 100)
+    
+    if scheme in ('style_permutation', 'quarter_permutation'):
+        # Null of no group effect: style or quarter labels shuffled across the periods
+        pnl, in_a = data
+        members = rng.permuted(np.broadcast_to(in_a, (size, len(in_a))), axis=1)
+        return membership_differences(pnl, members)
+    
+    raise ValueError(f"Unknown resampling scheme {scheme!r}")
+
+
+def resample(scheme, data, resamples=None, seed=None, workers=None, chunk_size=None):
+    """
+    Statistics of `resamples` draws, generated chunk_size at a time to bound memory.
+    Every chunk has its own SeedSequence child, so the draws are identical however
+    many worker processes the chunks are spread over.
+    """
+    resamples = RESAMPLING['resamples'] if resamples is None else resamples
+    seed = RESAMPLING['seed'] if seed is None else seed
+    workers = RESAMPLING['workers'] if workers is None else workers
+    chunk_size = RESAMPLING['chunk_size'] if chunk_size is None else chunk_size
+    
+    full, rest = divmod(resamples, chunk_size)
+    sizes = [chunk_size] * full + ([rest] if rest else [])
+    seeds = np.random.SeedSequence([seed, _SCHEMES.index(scheme)]).spawn(len(sizes))
+    
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_resample_chunk, [scheme] * len(sizes), [data] * len(sizes), seeds, sizes))
+    else:
+        chunks = [_resample_chunk(scheme, data, child, size) for child, size in zip(seeds, sizes)]
+    
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def confidence_interval(draws, confidence):
+    """Percentile interval of bootstrap draws (nearest rank, so unbounded draws stay exact)"""
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(draws, [tail, 1 - tail], method='nearest')
+    return float(low), float(high)
+
+
+def p_value(null_draws, observed):
+    """One-sided randomization p-value P(null >= observed), counting the observed arrangement once"""
+    slack = _TIE_TOLERANCE * max(1.0, abs(observed)) if np.isfinite(observed) else 0
+    return (1 + np.count_nonzero(null_draws >= observed - slack)) / (len(null_draws) + 1)
+
+
+class ResamplingAnalytics:
+    """How far the point metrics of one P&L series (monthly, daily or per trade) could be noise"""
+    
+    def __init__(self, pnl, styles=None, resamples=None, seed=None, workers=None, confidence=None, quarters=None):
+        self.pnl = np.asarray(pnl, dtype=np.float64)
+        self.styles = np.asarray(styles, dtype=object) if styles is not None else None
+        self.quarters = np.asarray(quarters, dtype=object) if quarters is not None else None
+        self.resamples = RESAMPLING['resamples'] if resamples is None else resamples
+        self.seed = RESAMPLING['seed'] if seed is None else seed
+        self.workers = RESAMPLING['workers'] if workers is None else workers
+        self.confidence = RESAMPLING['confidence'] if confidence is None else confidence
+    
+    @classmethod
+    def from_processor(cls, processor, **kwargs):
+        """Monthly P&L, trading styles and quarters of a TradingDataProcessor"""
+        columns = processor.monthly_columns()
+        return cls(columns['Total_PnL'], columns['Trading_Style'], quarters=columns['Quarter'], **kwargs)
+    
+    def _resample(self, scheme, data):
+        return resample(scheme, data, self.resamples, self.seed, self.workers)
+    
+    def _summarize(self, observed, bootstrap, null):
+        """Point estimate, bootstrap interval and randomization p-value of one statistic"""
+        low, high = confidence_interval(bootstrap, self.confidence)
+        return {'estimate': float(observed), 'ci_low': low, 'ci_high': high, 'p_value': p_value(null, observed)}
+    
+    def _group_difference(self, labels, comparison, kind):
+        """
+        Bootstrap intervals and permutation p-values of the group A minus group B differences;
+        every period of each group counts, flat ones included (as in the style and quarter totals)
+        """
+        in_a = labels == comparison[0]
+        in_b = labels == comparison[1]
+        if not (in_a.any() and in_b.any()):
+            return {}
+        
+        pnl = self.pnl[in_a | in_b]
+        members = in_a[in_a | in_b]
+        observed = membership_differences(pnl, members[np.newaxis, :])
+        bootstrap = self._resample(f'{kind}_bootstrap', (self.pnl[in_a], self.pnl[in_b]))
+        null = self._resample(f'{kind}_permutation', (pnl, members))
+        return {name: self._summarize(observed[name][0], bootstrap[name], null[name]) for name in observed}
+    
+    @count_calls
+    @timed
+    def calculate_significance(self):
+        """
+        Bootstrap intervals and sign-flip p-values for Sharpe, win rate and profit factor over
+        traded periods, plus bootstrap/permutation tests of the Systematic minus Learning and the
+        Q2 minus Q1 differences.
+        """
+        traded = self.pnl[self.pnl != 0]
+        results = {
+            'resamples': self.resamples,
+            'confidence': self.confidence,
+            'traded_periods': len(traded),
+            'statistics': {},
+            'style_difference': {},
+            'quarter_difference': {}
+        }
+        
+        if len(traded) >= 2:
+            observed = series_statistics(traded[np.newaxis, :])
+            bootstrap = self._resample('bootstrap', (traded,))
+            null = self._resample('sign_flip', (traded,))
+            for name in RESAMPLED_STATISTICS:
+                results['statistics'][name] = self._summarize(observed[name][0], bootstrap[name], null[name])
+        
+        if self.styles is not None:
+            results['style_difference'] = self._group_difference(self.styles, STYLE_COMPARISON, 'style')
+        if self.quarters is not None:
+            results['quarter_difference'] = self._group_difference(self.quarters, QUARTER_COMPARISON, 'quarter')
+        
+        return results
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Rolling Analytics Module - DERIVATIVES ONLY
+O(n) sliding-window Sharpe, volatility, win rate and drawdown over P&L series
+"""
+
+import numpy as np
+import pandas as pd
+from config import ROLLING_WINDOWS
+
+
+def rolling_sum(values, window):
+    """Trailing-window sums via one cumulative sum; the first window-1 entries are NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        out[window - 1:] = csum[window:] - csum[:-window]
+    return out
+
+
+def _sliding_extreme(values, window, accumulate):
+    """
+    Trailing-window max/min with the van Herk/Gil-Werman block scheme:
+    prefix and suffix scans inside blocks of `window`, so O(n) with no Python loop.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+    
+    blocks = -(-n // window)
+    fill = -np.inf if accumulate is np.maximum else np.inf
+    padded = np.full(blocks * window, fill)
+    padded[:n] = values
+    grid = padded.reshape(blocks, window)
+    
+    prefix = accumulate.accumulate(grid, axis=1).ravel()
+    suffix = accumulate.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    
+    # Window [i - window + 1, i] = suffix of one block joined to the prefix of the next
+    ends = np.arange(window - 1, n)
+    out[window - 1:] = accumulate(suffix[ends - window + 1], prefix[ends])
+    return out
+
+
+def rolling_max(values, window):
+    """Trailing-window maximum in O(n)"""
+    return _sliding_extreme(values, window, np.maximum)
+
+
+def rolling_min(values, window):
+    """Trailing-window minimum in O(n)"""
+    return _sliding_extreme(values, window, np.minimum)
+
+
+def rolling_max_drawdown(cumulative, window):
+    """
+    Deepest drawdown inside each trailing window of a cumulative P&L series: the running peak
+    starts at the level before the window (0 before the series), so drops from earlier peaks
+    are not counted. The window's (peak, trough, drawdown) summary is associative, so it uses
+    the same block scheme as rolling_max and stays O(n); the first window-1 entries are NaN.
+    """
+    cumulative = np.asarray(cumulative, dtype=np.float64)
+    n = len(cumulative)
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+    
+    # Window i spans levels[i - window + 1 : i + 2], the pre-window level included
+    levels = np.concatenate(([0.0], cumulative))
+    span = window + 1
+    blocks = -(-len(levels) // span)
+    padded = np.full(blocks * span, levels[-1])
+    padded[:len(levels)] = levels
+    grid = padded.reshape(blocks, span)
+    
+    # Block prefixes: peak, trough and drawdown from the block start
+    prefix_max = np.maximum.accumulate(grid, axis=1)
+    prefix_min = np.minimum.accumulate(grid, axis=1).ravel()
+    prefix_drawdown = np.minimum.accumulate(grid - prefix_max, axis=1).ravel()
+    
+    # Block suffixes: peak, and the deepest drop from any peak to a later trough before the block end
+    suffix_max = np.maximum.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    suffix_min = np.minimum.accumulate(grid[:, ::-1], axis=1)[:, ::-1]
+    suffix_drawdown = np.minimum.accumulate((suffix_min - grid)[:, ::-1], axis=1)[:, ::-1].ravel()
+    
+    # A window is a block suffix joined to the next block's prefix (or exactly one block)
+    starts = np.arange(n - window + 1)
+    ends = starts + window
+    joined = np.minimum(np.minimum(suffix_drawdown[starts], prefix_drawdown[ends]),
+                        prefix_min[ends] - suffix_max[starts])
+    out[window - 1:] = np.where(starts % span == 0, suffix_drawdown[starts], joined)
+    return out
+
+
+def rolling_pnl_metrics(pnl, window):
+    """
+    Rolling versions of the TradingAnalytics scalars for one window length.
+    Like the whole-period metrics, mean/volatility/Sharpe/win rate use traded
+    (non-zero) periods only; drawdowns are measured within the window, from the
+    running peak seeded with the level before it.
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    traded = pnl != 0
+    
+    # Shift by the traded mean so the sum-of-squares variance does not cancel catastrophically
+    shift = pnl[traded].mean() if traded.any() else 0.0
+    centered = np.where(traded, pnl - shift, 0.0)
+    
+    count = rolling_sum(traded, window)
+    wins = rolling_sum(pnl > 0, window)
+    safe_count = np.where(count > 0, count, np.nan)
+    centered_mean = rolling_sum(centered, window) / safe_count
+    variance = np.maximum(rolling_sum(centered * centered, window) / safe_count - centered_mean ** 2, 0.0)
+    
+    mean = centered_mean + shift
+    volatility = np.sqrt(variance)
+    sharpe = np.where(volatility > 0, mean / np.where(volatility > 0, volatility, 1.0), 0.0)
+    sharpe[np.isnan(mean)] = np.nan
+    
+    # Current drawdown from the window's peak, the pre-window level included; before a full
+    # window exists that is the running peak from the start (level 0)
+    cumulative = np.cumsum(pnl)
+    levels = np.concatenate(([0.0], cumulative))
+    peak = rolling_max(levels, window + 1)[1:]
+    head = min(window - 1, len(cumulative))
+    peak[:head] = np.maximum.accumulate(levels)[1:head + 1]
+    drawdown = cumulative - peak
+    
+    return {
+        'rolling_pnl': rolling_sum(pnl, window),
+        'rolling_mean': mean,
+        'rolling_volatility': volatility,
+        'rolling_sharpe': sharpe,
+        'rolling_win_rate': wins / safe_count * 100,
+        'rolling_drawdown': drawdown,
+        'rolling_max_drawdown': rolling_max_drawdown(cumulative, window)
+    }
+
+
+class RollingAnalytics:
+    """Rolling-window risk metrics on the processor's monthly (or any daily) frame"""
+    
+    def __init__(self, df, pnl_column='Total_PnL', label_column='Month'):
+        self.df = df
+        self.pnl = df[pnl_column].values
+        self.labels = df[label_column].values
+    
+    def calculate(self, windows=None):
+        """One column per metric and window, e.g. rolling_sharpe_20"""
+        windows = ROLLING_WINDOWS if windows is None else windows
+        columns = {}
+        for window in windows:
+            for name, values in rolling_pnl_metrics(self.pnl, window).items():
+                columns[f"{name}_{window}"] = values
+        return pd.DataFrame(columns, index=pd.Index(self.labels, name='Period'))
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Run Context Module - DERIVATIVES ONLY
+Shared per-run state so the frame, metrics and insights are computed once
+"""
+
+from data_processor import TradingDataProcessor
+from analytics import TradingAnalytics
+import trading_data
+
+
+class DashboardContext:
+    """Single source of processed data handed to every dashboard consumer"""
+    
+    def __init__(self, monthly_pnl=None, months=None, processor=None, open_positions=None, account=None, metadata=None):
+        self.processor = processor if processor is not None else TradingDataProcessor(monthly_pnl, months)
+        self.analytics = TradingAnalytics(processor=self.processor)
+        self.open_positions = trading_data.open_positions if open_positions is None else open_positions
+        # Report metadata (FY, client, platform, ...): TRADING_METADATA with this run's overrides
+        self.metadata = dict(trading_data.TRADING_METADATA, **(metadata or {}))
+        self.account = account or self.metadata['client_code']
+        self._metrics = None
+        self._insights = None
+        self._significance = None
+        self._greeks = None
+        self._tail_risk = None
+    
+    @property
+    def df(self):
+        """Monthly frame shared by all consumers (treat as read-only)"""
+        return self.analytics.df
+    
+    @property
+    def metrics(self):
+        """calculate_all_metrics() plus the open-position exposures and tail risk, computed on first use"""
+        if self._metrics is None:
+            from greeks import exposure_metrics
+            from tail_risk import tail_metrics
+            self._metrics = self.analytics.calculate_all_metrics()
+            self._metrics.update(exposure_metrics(self.greeks))
+            self._metrics.update(tail_metrics(self.tail_risk))
+        return self._metrics
+    
+    @property
+    def insights(self):
+        """get_learning_insights() built from the shared metrics"""
+        if self._insights is None:
+            self._insights = self.analytics.get_learning_insights(self.metrics)
+        return self._insights
+    
+    @property
+    def significance(self):
+        """Bootstrap/randomization tests of the headline metrics, computed on first use"""
+        if self._significance is None:
+            from resampling import ResamplingAnalytics
+            self._significance = ResamplingAnalytics.from_processor(self.processor).calculate_significance()
+        return self._significance
+    
+    @property
+    def tail_risk(self):
+        """Historical, parametric and filtered-historical VaR/Expected Shortfall, computed on first use"""
+        if self._tail_risk is None:
+            from tail_risk import TailRiskAnalytics
+            self._tail_risk = TailRiskAnalytics.from_processor(self.processor).calculate_tail_risk()
+        return self._tail_risk
+    
+    @property
+    def greeks(self):
+        """Black-Scholes Greeks of the open positions per underlying and account, computed on first use"""
+        if self._greeks is None:
+            from greeks import PortfolioGreeks
+            self._greeks = PortfolioGreeks.from_open_positions(self.open_positions, self.account).calculate_risk()
+        return self._greeks
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Stats Module - DERIVATIVES ONLY
+Vectorized standard normal CDF, density and quantile shared by the Greeks and tail risk, without SciPy
+"""
+
+import numpy as np
+
+# Abramowitz & Stegun 7.1.26 rational approximation of erf (absolute error < 1.5e-7)
+_ERF_P = 0.3275911
+_ERF_COEFFICIENTS = (1.061405429, -1.453152027, 1.421413741, -0.284496736, 0.254829592)
+
+# Acklam's rational approximation to the normal quantile (relative error < 1.2e-9)
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01, 1.0)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549671010115819e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00, 1.0)
+_PPF_LOW = 0.02425
+
+
+def erf(x):
+    """Vectorized error function (A&S 7.1.26)"""
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    t = 1.0 / (1.0 + _ERF_P * z)
+    poly = np.zeros_like(t)
+    for coefficient in _ERF_COEFFICIENTS:
+        poly = (poly + coefficient) * t  # Horner's scheme, constant term zero
+    return np.copysign(1.0 - poly * np.exp(-z * z), x)
+
+
+def norm_cdf(x):
+    """Standard normal CDF"""
+    return 0.5 * (1.0 + erf(np.asarray(x) / np.sqrt(2.0)))
+
+
+def norm_pdf(x):
+    """Standard normal density"""
+    return np.exp(-0.5 * np.square(x)) / np.sqrt(2.0 * np.pi)
+
+
+def _polynomial(coefficients, x):
+    """Horner's scheme, highest power first"""
+    result = np.zeros_like(x)
+    for coefficient in coefficients:
+        result = result * x + coefficient
+    return result
+
+
+def norm_ppf(p):
+    """Vectorized standard normal quantile for 0 < p < 1"""
+    p = np.asarray(p, dtype=np.float64)
+    tail = np.minimum(p, 1 - p)
+    
+    # Central region: rational function of (p - 0.5)^2
+    q = p - 0.5
+    r = q * q
+    central = q * _polynomial(_PPF_A, r) / _polynomial(_PPF_B, r)
+    
+    # Tails: rational function of sqrt(-2 log p), mirrored for the upper tail
+    s = np.sqrt(-2 * np.log(np.where(tail > 0, tail, 1.0)))
+    lower = _polynomial(_PPF_C, s) / _polynomial(_PPF_D, s)
+    return np.where(tail < _PPF_LOW, np.where(p < 0.5, lower, -lower), central)
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+Tail Risk Module - DERIVATIVES ONLY
+Historical, parametric and filtered-historical Value at Risk and Expected Shortfall of P&L series
+"""
+
+import numpy as np
+from instrumentation import count_calls, timed
+from stats import norm_pdf, norm_ppf
+from config import TAIL_RISK
+
+# VaR methods in report order, with the prefix of their flat metric keys
+TAIL_METHODS = {
+    'historical': '',
+    'parametric': 'parametric_',
+    'filtered_historical': 'filtered_'
+}
+
+# Slack so that e.g. 0.95 * 100 periods ranks the 95th loss, not the 96th
+_RANK_TOLERANCE = 1e-9
+
+# The EWMA runs in blocks whose decay factors stay within exp(+-_EWMA_LOG_RANGE)
+_EWMA_LOG_RANGE = 300.0
+_EWMA_MAX_BLOCK = 4096
+
+
+def level_suffix(confidence):
+    """Metric key suffix of a confidence level, e.g. 0.95 -> '95', 0.975 -> '97.5'"""
+    return f"{confidence * 100:g}"
+
+
+def _var_rank(counts, confidence):
+    """1-based ascending rank of the VaR loss among `counts` traded periods"""
+    rank = np.ceil(counts * confidence - _RANK_TOLERANCE).astype(np.intp)
+    return np.clip(rank, 1, np.maximum(counts, 1))
+
+
+def traded_moments(pnl):
+    """Traded-period counts, means and (population) volatilities of every row, as in batch_pnl_metrics"""
+    traded = pnl != 0
+    counts = np.count_nonzero(traded, axis=1)
+    safe_count = np.where(counts > 0, counts, 1)
+    mean = pnl.sum(axis=1) / safe_count
+    deviation = np.where(traded, pnl - mean[:, None], 0)
+    return counts, mean, np.sqrt((deviation * deviation).sum(axis=1) / safe_count)
+
+
+def historical_tail(pnl, confidence_levels):
+    """
+    Historical VaR and Expected Shortfall (losses, positive when the tail loses money) of every row
+    of a (rows x periods) P&L matrix over its traded periods. One np.partition places every level's
+    order statistic, so there is no full sort; rows without trades get 0.
+    """
+    pnl = np.atleast_2d(np.asarray(pnl, dtype=np.float64))
+    rows, periods = pnl.shape
+    traded = pnl != 0
+    counts = np.count_nonzero(traded, axis=1)
+    
+    # Flat periods become -inf losses, so they partition below every traded loss
+    losses = np.where(traded, -pnl, -np.inf)
+    positions = {confidence: np.minimum(periods - counts + _var_rank(counts, confidence) - 1, max(periods - 1, 0))
+                 for confidence in confidence_levels}
+    
+    if periods == 0:
+        return {confidence: {'var': np.zeros(rows), 'expected_shortfall': np.zeros(rows)} for confidence in confidence_levels}
+    
+    results = {}
+    ordered = np.partition(losses, np.unique(np.concatenate(list(positions.values()))), axis=1)
+    for confidence, position in positions.items():
+        var = np.where(counts > 0, ordered[np.arange(rows), position], 0.0)
+        
+        # Losses beyond VaR plus VaR itself for the rest of the tail, so ties at VaR are counted once each
+        beyond = losses > var[:, None]
+        tail = periods - position
+        tail_sum = np.where(beyond, losses, 0).sum(axis=1) + (tail - np.count_nonzero(beyond, axis=1)) * var
+        results[confidence] = {'var': var, 'expected_shortfall': np.where(counts > 0, tail_sum / tail, 0.0)}
+    return results
+
+
+def parametric_tail(pnl, confidence_levels):
+    """Gaussian VaR and Expected Shortfall of every row from its traded-period mean and volatility"""
+    pnl = np.atleast_2d(np.asarray(pnl, dtype=np.float64))
+    counts, mean, volatility = traded_moments(pnl)
+    
+    results = {}
+    for confidence in confidence_levels:
+        z = norm_ppf(confidence)
+        results[confidence] = {
+            'var': np.where(counts > 0, z * volatility - mean, 0.0),
+            'expected_shortfall': np.where(counts > 0, volatility * norm_pdf(z) / (1 - confidence) - mean, 0.0)
+        }
+    return results
+
+
+def ewma_variance(pnl, decay, seed):
+    """
+    RiskMetrics variance forecasts of every row, (rows x periods+1): column t forecasts period t from
+    the periods before it and the last column forecasts the next one. Flat periods leave the forecast
+    unchanged. The recursion v[t+1] = decay v[t] + (1 - decay) r[t]^2 is solved in closed form per block,
+    so the only Python loop is over blocks.
+    """
+    if not 0 < decay < 1:
+        raise ValueError(f"EWMA decay must lie strictly between 0 and 1, got {decay}")
+    pnl = np.atleast_2d(np.asarray(pnl, dtype=np.float64))
+    rows, periods = pnl.shape
+    log_factor = np.where(pnl != 0, np.log(decay), 0.0)
+    shock = (1 - decay) * pnl * pnl
+    
+    variance = np.empty((rows, periods + 1))
+    variance[:, 0] = seed
+    block = max(1, min(_EWMA_MAX_BLOCK, int(_EWMA_LOG_RANGE / -np.log(decay))))
+    for start in range(0, periods, block):
+        stop = min(start + block, periods)
+        # v[start + j] = P_j (v[start] + sum_{i<j} shock_i / P_{i+1}), P_j the product of the first j factors
+        factor = np.exp(np.cumsum(log_factor[:, start:stop], axis=1))
+        variance[:, start + 1:stop + 1] = factor * (variance[:, start:start + 1] + np.cumsum(shock[:, start:stop] / factor, axis=1))
+    return variance
+
+
+def filtered_tail(pnl, confidence_levels, decay):
+    """
+    Filtered historical simulation: traded P&L standardized by its EWMA volatility, rescaled to the
+    next period's forecast, then historical VaR/ES of those scenarios. Returns the forecasts too.
+    """
+    pnl = np.atleast_2d(np.asarray(pnl, dtype=np.float64))
+    _, _, volatility = traded_moments(pnl)
+    sigma = np.sqrt(ewma_variance(pnl, decay, volatility * volatility))
+    history, forecast = sigma[:, :-1], sigma[:, -1]
+    
+    # Flat periods (and any without a volatility estimate yet) stay flat scenarios
+    standardized = np.where(history > 0, pnl / np.where(history > 0, history, 1.0), 0.0)
+    return historical_tail(standardized * forecast[:, None], confidence_levels), forecast
+
+
+def batch_tail_risk(pnl_matrix, confidence_levels=None, decay=None):
+    """
+    VaR and Expected Shortfall for every row of an (accounts x periods) P&L matrix,
+    {method: {confidence: {'var': array, 'expected_shortfall': array}}}, plus the EWMA forecasts.
+    """
+    confidence_levels = TAIL_RISK['confidence_levels'] if confidence_levels is None else confidence_levels
+    decay = TAIL_RISK['ewma_decay'] if decay is None else decay
+    pnl = np.atleast_2d(np.asarray(pnl_matrix, dtype=np.float64))
+    
+    filtered, forecast = filtered_tail(pnl, confidence_levels, decay)
+    methods = {
+        'historical': historical_tail(pnl, confidence_levels),
+        'parametric': parametric_tail(pnl, confidence_levels),
+        'filtered_historical': filtered
+    }
+    return methods, forecast
+
+
+def tail_columns(methods):
+    """Flat metric keys, e.g. value_at_risk_95 / parametric_expected_shortfall_99, of batch_tail_risk() methods"""
+    columns = {}
+    for method, prefix in TAIL_METHODS.items():
+        for confidence, result in methods[method].items():
+            suffix = level_suffix(confidence)
+            columns[f"{prefix}value_at_risk_{suffix}"] = result['var']
+            columns[f"{prefix}expected_shortfall_{suffix}"] = result['expected_shortfall']
+    return columns
+
+
+def rolling_tail_risk(pnl, window, confidence_levels=None, chunk_elements=None):
+    """
+    Historical and parametric VaR/ES over the trailing `window` traded periods, as of every period:
+    flat periods carry the previous value and the first full window is preceded by NaN.
+    Historical figures partition each window (O(window) per period, chunk_elements at a time);
+    parametric ones come from running sums in O(n).
+    """
+    from rolling_analytics import rolling_sum
+    confidence_levels = TAIL_RISK['confidence_levels'] if confidence_levels is None else confidence_levels
+    chunk_elements = TAIL_RISK['rolling_chunk_elements'] if chunk_elements is None else chunk_elements
+    pnl = np.asarray(pnl, dtype=np.float64)
+    traded = pnl[pnl != 0]
+    complete = len(traded) - window + 1
+    
+    series = {}
+    for confidence in confidence_levels:
+        suffix = level_suffix(confidence)
+        for name in ('historical_var', 'historical_es', 'parametric_var', 'parametric_es'):
+            series[f"rolling_{name}_{suffix}"] = np.full(max(complete, 0), np.nan)
+    
+    if complete > 0:
+        windows = np.lib.stride_tricks.sliding_window_view(-traded, window)
+        positions = {confidence: int(_var_rank(np.array(window), confidence)) - 1 for confidence in confidence_levels}
+        kth = sorted(set(positions.values()))
+        step = max(1, chunk_elements // window)
+        for start in range(0, complete, step):
+            ordered = np.partition(windows[start:start + step], kth, axis=1)
+            for confidence, position in positions.items():
+                suffix = level_suffix(confidence)
+                series[f"rolling_historical_var_{suffix}"][start:start + step] = ordered[:, position]
+                series[f"rolling_historical_es_{suffix}"][start:start + step] = ordered[:, position:].mean(axis=1)
+        
+        # Shift by the traded mean so the sum-of-squares variance does not cancel catastrophically
+        shift = traded.mean()
+        centered = traded - shift
+        centered_mean = rolling_sum(centered, window)[window - 1:] / window
+        volatility = np.sqrt(np.maximum(rolling_sum(centered * centered, window)[window - 1:] / window - centered_mean ** 2, 0.0))
+        mean = centered_mean + shift
+        for confidence in confidence_levels:
+            suffix = level_suffix(confidence)
+            z = norm_ppf(confidence)
+            series[f"rolling_parametric_var_{suffix}"] = z * volatility - mean
+            series[f"rolling_parametric_es_{suffix}"] = volatility * norm_pdf(z) / (1 - confidence) - mean
+    
+    # Index of the latest complete window at or before each period
+    as_of = np.cumsum(pnl != 0) - window
+    valid = as_of >= 0
+    aligned = {}
+    for name, values in series.items():
+        aligned[name] = np.full(len(pnl), np.nan)
+        aligned[name][valid] = values[as_of[valid]]
+    return aligned
+
+
+def tail_metrics(risk):
+    """Flat tail-risk keys merged into the dashboard metrics dict"""
+    return {**tail_columns(risk['methods']), 'ewma_volatility': risk['ewma_volatility']}
+
+
+class TailRiskAnalytics:
+    """Value at Risk and Expected Shortfall of one P&L series (monthly, daily or per trade)"""
+    
+    def __init__(self, pnl, confidence_levels=None, decay=None):
+        self.pnl = np.asarray(pnl, dtype=np.float64)
+        self.confidence_levels = tuple(TAIL_RISK['confidence_levels'] if confidence_levels is None else confidence_levels)
+        self.decay = TAIL_RISK['ewma_decay'] if decay is None else decay
+        if not all(0 < confidence < 1 for confidence in self.confidence_levels):
+            raise ValueError(f"Confidence levels must lie strictly between 0 and 1, got {self.confidence_levels}")
+    
+    @classmethod
+    def from_processor(cls, processor, **kwargs):
+        """Monthly P&L of a TradingDataProcessor"""
+        return cls(processor.monthly_columns()['Total_PnL'], **kwargs)
+    
+    @classmethod
+    def from_trades(cls, trade_analytics, **kwargs):
+        """Per-trade P&L of a TradeAnalytics' FIFO round trips"""
+        return cls(trade_analytics.trades['pnl'], **kwargs)
+    
+    @count_calls
+    @timed
+    def calculate_tail_risk(self):
+        """
+        Historical, parametric and filtered-historical VaR/Expected Shortfall at every confidence level.
+        Like volatility, only traded (non-zero) periods count; losses are positive.
+        """
+        methods, forecast = batch_tail_risk(self.pnl, self.confidence_levels, self.decay)
+        traded = self.pnl[self.pnl != 0]
+        return {
+            'confidence_levels': list(self.confidence_levels),
+            'decay': self.decay,
+            'traded_periods': len(traded),
+            'mean': float(traded.mean()) if len(traded) else 0.0,
+            'volatility': float(traded.std()) if len(traded) else 0.0,
+            'worst_loss': float(-traded.min()) if len(traded) else 0.0,
+            'ewma_volatility': float(forecast[0]),
+            'methods': {method: {confidence: {name: float(values[0]) for name, values in result.items()}
+                                 for confidence, result in levels.items()}
+                        for method, levels in methods.items()}
+        }
+    
+    @count_calls
+    @timed
+    def calculate_rolling(self, window=None):
+        """Rolling historical and parametric VaR/ES per period, e.g. rolling_historical_var_95"""
+        window = TAIL_RISK['rolling_window'] if window is None else window
+        return rolling_tail_risk(self.pnl, window, self.confidence_levels)
\ No newline at end of file
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from rolling_analytics import rolling_pnl_metrics
+
+
+def brute_force_max_drawdown(pnl, window):
+    """Running-peak drawdown recomputed for every window, seeded with the pre-window level"""
+    levels = np.concatenate(([0.0], np.cumsum(pnl)))
+    out = np.full(len(pnl), np.nan)
+    for i in range(window - 1, len(pnl)):
+        segment = levels[i - window + 1:i + 2]
+        out[i] = (segment - np.maximum.accumulate(segment)).min()
+    return out
+
+
+def test_max_drawdown_ignores_peaks_before_the_window():
+    result = rolling_pnl_metrics([100, -50, -50, 10, 10, 10, 10], 3)['rolling_max_drawdown']
+    np.testing.assert_array_equal(result, [np.nan, np.nan, -100, -100, -50, 0, 0])
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 5, 20, 60])
+def test_max_drawdown_matches_brute_force(window):
+    rng = np.random.default_rng(window)
+    for n in (1, window - 1, window, window + 1, 3 * window + 2, 250):
+        if n < 1:
+            continue
+        pnl = np.round(rng.normal(0, 1000, n))
+        pnl[rng.random(n) < 0.2] = 0
+        result = rolling_pnl_metrics(pnl, window)['rolling_max_drawdown']
+        np.testing.assert_allclose(result, brute_force_max_drawdown(pnl, window), equal_nan=True)
\ No newline at end of file
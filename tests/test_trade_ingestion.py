@@ -0,0 +1,49 @@
+import pytest
+from config import CONTRACT_NOTE_COLUMNS
+from trade_ingestion import aggregate_monthly_pnl, load_contract_note
+
+COLUMNS = CONTRACT_NOTE_COLUMNS
+ROWS = [
+    ['10-04-2025', '09:20:00', 'NIFTY 25000 CE', 'B', '100', '500.00', '0.00'],
+    ['10-04-2025', '15:10:00', 'NIFTY 25000 CE', 'S', '100', '510.00', '0.00'],
+    ['12-05-2025', '09:20:00', 'NIFTY 25000 PE', 'B', '100', '400.00', '0.00']
+]
+
+
+def write_note(path, rows):
+    header = [COLUMNS[key] for key in ('trade_date', 'trade_time', 'symbol', 'side', 'quantity', 'price', 'charges')]
+    path.write_text('\n'.join(','.join(row) for row in [header] + rows) + '\n')
+    return path
+
+
+def test_complete_note_loads(tmp_path):
+    assert len(load_contract_note(write_note(tmp_path / 'note.csv', ROWS))) == 3
+
+
+@pytest.mark.parametrize('key, position', [('trade_date', 0), ('trade_time', 1), ('symbol', 2), ('side', 3),
+                                           ('quantity', 4), ('price', 5), ('charges', 6)])
+@pytest.mark.parametrize('blank', ['', '   '])
+@pytest.mark.parametrize('chunksize', [1, 1000])
+def test_blank_cell_is_rejected(tmp_path, key, position, blank, chunksize):
+    rows = [list(row) for row in ROWS]
+    rows[1][position] = blank
+    with pytest.raises(ValueError, match=f"{COLUMNS[key]}.*row 2"):
+        load_contract_note(write_note(tmp_path / 'note.csv', rows), chunksize=chunksize)
+
+@pytest.mark.parametrize('key, position, value', [('quantity', 4, 'abc'), ('quantity', 4, '10.5'),
+                                                  ('price', 5, '5OO.00'), ('charges', 6, '1.2.3')])
+@pytest.mark.parametrize('chunksize', [1, 1000])
+def test_non_numeric_cell_is_rejected(tmp_path, key, position, value, chunksize):
+    rows = [list(row) for row in ROWS]
+    rows[1][position] = value
+    with pytest.raises(ValueError, match=f"{COLUMNS[key]}.*{value}.*row 2"):
+        load_contract_note(write_note(tmp_path / 'note.csv', rows), chunksize=chunksize)
+
+
+@pytest.mark.parametrize('chunksize', [1, 1000])
+def test_position_spanning_month_end_is_booked_when_closed(tmp_path, chunksize):
+    rows = [
+        ['28-04-2025', '15:10:00', 'NIFTY 25000 CE', 'B', '100', '500.00', '0.00'],
+        ['02-05-2025', '09:20:00', 'NIFTY 25000 CE', 'S', '100', '510.00', '0.00']
+    ]
+    assert aggregate_monthly_pnl(write_note(tmp_path / 'note.csv', rows), chunksize=chunksize) == {'Apr': 0, 'May': 1000}
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""
+Trade Analytics Module - DERIVATIVES ONLY
+FIFO round-trip matching of fills and per-trade win rate, expectancy, MAE/MFE and holding times
+"""
+
+import numpy as np
+from config import HOLDING_TIME_BUCKETS
+from instrumentation import count_calls, timed
+from trade_ingestion import FILL_DTYPE, load_contract_note, _to_paise
+
+# One FIFO-matched round trip: an opening lot (or part of one) closed by a later fill
+TRADE_DTYPE = np.dtype([
+    ('symbol', np.int32),
+    ('direction', np.int8),  # +1 long, -1 short
+    ('quantity', np.int64),
+    ('entry_time', 'datetime64[s]'),
+    ('exit_time', 'datetime64[s]'),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('charges', np.float64),
+    ('pnl', np.float64),  # net of the lot's share of both fills' charges
+    ('mae', np.float64),  # maximum adverse excursion (<= 0)
+    ('mfe', np.float64)  # maximum favourable excursion (>= 0)
+])
+
+# Block length for range max/min queries over the fill price path
+_RANGE_BLOCK = 1024
+
+
+def _range_extreme(values, starts, ends, accumulate, block=_RANGE_BLOCK):
+    """
+    accumulate-reduction of values[starts[i]:ends[i] + 1] for many inclusive ranges.
+    Ranges spanning blocks combine an in-block suffix scan, a sparse table over
+    whole blocks and an in-block prefix scan (O(1) each); ranges inside one block
+    are reduced directly, so the cost is O(n + queries * min(length, block)).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.intp)
+    ends = np.asarray(ends, dtype=np.intp)
+    out = np.empty(len(starts))
+    if len(starts) == 0:
+        return out
+    
+    n = len(values)
+    blocks = -(-n // block)
+    fill = -np.inf if accumulate is np.maximum else np.inf
+    padded = np.full(blocks * block, fill)
+    padded[:n] = values
+    grid = padded.reshape(blocks, block)
+    prefix = accumulate.accumulate(grid, axis=1).ravel()
+    suffix = accumulate.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    
+    # Sparse table: level k holds the extreme of 2**k consecutive blocks
+    table = [accumulate.reduce(grid, axis=1)]
+    while 2 ** len(table) <= blocks:
+        width = 2 ** (len(table) - 1)
+        table.append(accumulate(table[-1][:-width], table[-1][width:]))
+    
+    start_block, end_block = starts // block, ends // block
+    spanning = start_block < end_block
+    out[spanning] = accumulate(suffix[starts[spanning]], prefix[ends[spanning]])
+    
+    inner = end_block - start_block >= 2
+    if inner.any():
+        lo, hi = start_block[inner] + 1, end_block[inner] - 1
+        level = np.floor(np.log2(hi - lo + 1)).astype(np.intp)
+        middle = np.empty(len(lo))
+        for k in np.unique(level).tolist():
+            at = level == k
+            middle[at] = accumulate(table[k][lo[at]], table[k][hi[at] - 2 ** k + 1])
+        out[inner] = accumulate(out[inner], middle)
+    
+    within = ~spanning
+    if within.any():
+        bounds = np.column_stack((starts[within], ends[within] + 1)).ravel()
+        out[within] = accumulate.reduceat(np.append(values, fill), bounds)[::2]
+    return out
+
+
+def match_fifo(fills):
+    """
+    Match fills into FIFO round trips (TRADE_DTYPE), fully vectorized in O(n log n).
+    
+    Fills are ordered by symbol and time; a fill that flips the position is split
+    into a closing and an opening part. Opening and closing quantities then lie on
+    two cumulative "unit" axes per symbol, where FIFO means closing unit u closes
+    opening unit u, so every round trip is one segment between the merged axis
+    breakpoints. Quantity still open at the end stays unmatched.
+    """
+    fills = np.asarray(fills, dtype=FILL_DTYPE)
+    if not (fills['quantity'] > 0).all():
+        fills = fills[fills['quantity'] > 0]
+    n = len(fills)
+    if n == 0:
+        return np.empty(0, dtype=TRADE_DTYPE)
+    
+    # Contract notes are normally chronological already; then a stable sort on the
+    # symbol alone (a radix sort for small symbol tables) yields symbol/time order
+    timestamps = fills['timestamp']
+    if (timestamps[1:] >= timestamps[:-1]).all():
+        keys = fills['symbol']
+        if 0 <= keys.min() and keys.max() <= np.iinfo(np.int16).max:
+            keys = keys.astype(np.int16)
+        order = np.argsort(keys, kind='stable')
+    else:
+        order = np.lexsort((timestamps, fills['symbol']))
+    
+    # Gather plain columns; a structured-array gather is several times slower
+    symbol = fills['symbol'][order]
+    timestamp = timestamps[order]
+    price = fills['price'][order]
+    fill_quantity = fills['quantity'][order]
+    charge_per_unit = fills['charges'][order] / fill_quantity
+    signed = fills['side'][order].astype(np.int64) * fill_quantity
+    
+    # Position before/after each fill, restarting at every symbol
+    symbol_starts = np.flatnonzero(np.r_[True, symbol[1:] != symbol[:-1]])
+    cumulative = np.cumsum(signed)
+    after = cumulative - np.repeat(cumulative[symbol_starts] - signed[symbol_starts], np.diff(np.r_[symbol_starts, n]))
+    before = after - signed
+    
+    # Split position flips into a close of |before| followed by an open of |after|
+    flips = (before != 0) & (after != 0) & (np.sign(before) != np.sign(after))
+    pieces = 1 + flips.astype(np.intp)
+    fill_of = np.repeat(np.arange(n), pieces)
+    is_open = np.repeat(np.abs(after) > np.abs(before), pieces)
+    quantity = np.repeat(fill_quantity, pieces)
+    flip_at = np.cumsum(pieces)[flips] - 2
+    is_open[flip_at], quantity[flip_at] = False, np.abs(before[flips])
+    is_open[flip_at + 1], quantity[flip_at + 1] = True, np.abs(after[flips])
+    direction = np.where(is_open, np.sign(after)[fill_of], np.sign(before)[fill_of])
+    
+    # Cumulative opening/closing units, with closes re-based to each symbol's first open unit
+    opened = np.cumsum(np.where(is_open, quantity, 0))
+    closed = np.cumsum(np.where(is_open, 0, quantity))
+    piece_symbol = symbol[fill_of]
+    piece_starts = np.flatnonzero(np.r_[True, piece_symbol[1:] != piece_symbol[:-1]])
+    first_opened = opened[piece_starts] - np.where(is_open[piece_starts], quantity[piece_starts], 0)
+    first_closed = closed[piece_starts] - np.where(is_open[piece_starts], 0, quantity[piece_starts])
+    closed += np.repeat(first_opened - first_closed, np.diff(np.r_[piece_starts, len(fill_of)]))
+    
+    open_pieces = np.flatnonzero(is_open)
+    close_pieces = np.flatnonzero(~is_open)
+    open_ends = opened[open_pieces]
+    close_ends = closed[close_pieces]
+    close_starts = close_ends - quantity[close_pieces]
+    
+    # Every segment between merged breakpoints is covered by one open and at most one close piece
+    breakpoints = np.union1d(open_ends, close_ends)
+    segment_starts = np.r_[0, breakpoints[:-1]]
+    k = np.searchsorted(close_ends, breakpoints, 'left')
+    matched = k < len(close_ends)
+    matched[matched] = close_starts[k[matched]] <= segment_starts[matched]
+    j = np.searchsorted(open_ends, breakpoints[matched], 'left')
+    entry = fill_of[open_pieces[j]]
+    exit_ = fill_of[close_pieces[k[matched]]]
+    
+    trades = np.empty(len(entry), dtype=TRADE_DTYPE)
+    trades['symbol'] = symbol[entry]
+    trades['direction'] = direction[open_pieces[j]]
+    trades['quantity'] = breakpoints[matched] - segment_starts[matched]
+    trades['entry_time'] = timestamp[entry]
+    trades['exit_time'] = timestamp[exit_]
+    trades['entry_price'] = price[entry]
+    trades['exit_price'] = price[exit_]
+    
+    # Each fill's charges are shared across its lots pro rata to quantity
+    trades['charges'] = trades['quantity'] * (charge_per_unit[entry] + charge_per_unit[exit_])
+    # Price moves in exact paise, as in the ingestion aggregates
+    price_move = (_to_paise(trades['exit_price']) - _to_paise(trades['entry_price'])) * trades['direction']
+    trades['pnl'] = price_move * trades['quantity'] / 100 - trades['charges']
+    
+    # Excursions over the symbol's fill prices between entry and exit (contiguous after sorting)
+    high = _range_extreme(price, entry, exit_, np.maximum)
+    low = _range_extreme(price, entry, exit_, np.minimum)
+    long = trades['direction'] > 0
+    trades['mfe'] = np.where(long, high - trades['entry_price'], trades['entry_price'] - low) * trades['quantity']
+    trades['mae'] = np.where(long, low - trades['entry_price'], trades['entry_price'] - high) * trades['quantity']
+    
+    # Report round trips in exit order
+    return trades[np.argsort(exit_, kind='stable')]
+
+
+def holding_time_distribution(seconds):
+    """Trade counts per HOLDING_TIME_BUCKETS bucket"""
+    edges = [upper for _, upper in HOLDING_TIME_BUCKETS if upper is not None]
+    counts = np.bincount(np.searchsorted(edges, seconds, 'right'), minlength=len(HOLDING_TIME_BUCKETS))
+    return {label: int(count) for (label, _), count in zip(HOLDING_TIME_BUCKETS, counts)}
+
+
+class TradeAnalytics:
+    """Per-trade performance metrics over FIFO-matched round trips"""
+    
+    def __init__(self, fills, symbols=None):
+        self.fills = np.asarray(fills, dtype=FILL_DTYPE)
+        self.symbols = list(symbols) if symbols is not None else []
+        self._trades = None
+    
+    @classmethod
+    def from_contract_note(cls, path):
+        """Build trade analytics from a Kotak Neo contract note CSV"""
+        store = load_contract_note(path)
+        return cls(store.fills, store.symbols)
+    
+    @classmethod
+    def from_store(cls, store, client_code, start=None, end=None):
+        """Build trade analytics from a client's fills in a PnLStore"""
+        fills, symbols = store.read_fills(client_code, start, end)
+        return cls(fills, symbols)
+    
+    @property
+    def trades(self):
+        """FIFO round trips (TRADE_DTYPE), matched on first use"""
+        if self._trades is None:
+            self._trades = match_fifo(self.fills)
+        return self._trades
+    
+    def open_positions(self):
+        """Net quantity still open per symbol after the last fill, {symbol: signed quantity}"""
+        net = np.bincount(self.fills['symbol'], weights=self.fills['side'] * self.fills['quantity'])
+        return {self._symbol_name(code): int(qty) for code, qty in enumerate(net.tolist()) if qty != 0}
+    
+    def _symbol_name(self, code):
+        return self.symbols[code] if code < len(self.symbols) else code
+    
+    @count_calls
+    @timed
+    def calculate_trade_metrics(self):
+        """Trade-level win rate, expectancy, payoff ratio, MAE/MFE and holding-time statistics"""
+        trades = self.trades
+        pnl = trades['pnl']
+        wins, losses = pnl > 0, pnl < 0
+        total = len(trades)
+        metrics = {}
+        
+        metrics['total_trades'] = total
+        metrics['winning_trades'] = int(wins.sum())
+        metrics['losing_trades'] = int(losses.sum())
+        metrics['trade_win_rate'] = (metrics['winning_trades'] / total * 100) if total > 0 else 0
+        metrics['net_trade_pnl'] = float(pnl.sum())
+        
+        metrics['avg_win'] = float(pnl[wins].mean()) if wins.any() else 0
+        metrics['avg_loss'] = float(pnl[losses].mean()) if losses.any() else 0
+        metrics['payoff_ratio'] = metrics['avg_win'] / abs(metrics['avg_loss']) if metrics['avg_loss'] != 0 else 0
+        metrics['expectancy'] = metrics['net_trade_pnl'] / total if total > 0 else 0
+        gross_loss = -pnl[losses].sum()
+        metrics['trade_profit_factor'] = float(pnl[wins].sum() / gross_loss) if gross_loss > 0 else 0
+        
+        metrics['avg_mae'] = float(trades['mae'].mean()) if total > 0 else 0
+        metrics['avg_mfe'] = float(trades['mfe'].mean()) if total > 0 else 0
+        metrics['worst_mae'] = float(trades['mae'].min()) if total > 0 else 0
+        metrics['best_mfe'] = float(trades['mfe'].max()) if total > 0 else 0
+        
+        # Share of the favourable excursion actually banked by winning trades
+        winning_mfe = trades['mfe'][wins].sum()
+        metrics['mfe_capture'] = float(pnl[wins].sum() / winning_mfe * 100) if winning_mfe > 0 else 0
+        
+        holding = (trades['exit_time'] - trades['entry_time']).astype(np.int64)
+        if total > 0:
+            p25, median, p75, p90 = np.percentile(holding, [25, 50, 75, 90])
+            metrics['avg_holding_seconds'] = float(holding.mean())
+            metrics['median_holding_seconds'] = float(median)
+            metrics['holding_p25_seconds'] = float(p25)
+            metrics['holding_p75_seconds'] = float(p75)
+            metrics['holding_p90_seconds'] = float(p90)
+            metrics['max_holding_seconds'] = int(holding.max())
+            metrics['avg_winner_holding_seconds'] = float(holding[wins].mean()) if wins.any() else 0
+            metrics['avg_loser_holding_seconds'] = float(holding[losses].mean()) if losses.any() else 0
+        else:
+            for key in ('avg_holding_seconds', 'median_holding_seconds', 'holding_p25_seconds', 'holding_p75_seconds',
+                        'holding_p90_seconds', 'max_holding_seconds', 'avg_winner_holding_seconds',
+                        'avg_loser_holding_seconds'):
+                metrics[key] = 0
+        metrics['holding_time_distribution'] = holding_time_distribution(holding)
+        
+        return metrics
+    
+    @count_calls
+    @timed
+    def get_symbol_summary(self):
+        """Trades, net P&L and trade win rate per symbol"""
+        trades = self.trades
+        codes = trades['symbol']
+        n = int(codes.max()) + 1 if len(codes) else 0
+        counts = np.bincount(codes, minlength=n)
+        totals = np.bincount(codes, weights=trades['pnl'], minlength=n)
+        wins = np.bincount(codes, weights=trades['pnl'] > 0, minlength=n)
+        
+        summary = {}
+        for code in np.flatnonzero(counts).tolist():
+            summary[self._symbol_name(code)] = {
+                'trades': int(counts[code]),
+                'net_pnl': float(totals[code]),
+                'win_rate': float(wins[code] / counts[code] * 100)
+            }
+        return summary
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""
+Trade Ingestion Module - DERIVATIVES ONLY
+Stream Kotak Neo contract note exports into typed fill arrays and monthly P&L
+"""
+
+import csv
+import numpy as np
+import pandas as pd
+from config import (CONTRACT_NOTE_COLUMNS, CONTRACT_NOTE_DATE_FORMAT, CONTRACT_NOTE_TIME_FORMAT,
+                    INGEST_CHUNK_SIZE)
+from fy_calendar import (FY_MONTHS, FY_MONTH_CODES, financial_year_start, financial_year_label,
+                         parse_financial_year, fy_month_start)
+
+# One executed fill. Symbols are interned as integer codes into FillStore.symbols
+FILL_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[s]'),
+    ('symbol', np.int32),
+    ('side', np.int8),  # +1 buy, -1 sell
+    ('quantity', np.int64),
+    ('price', np.float64),
+    ('charges', np.float64)
+])
+
+
+def _to_paise(values):
+    """Convert rupee amounts to exact integer paise"""
+    return np.rint(np.asarray(values, dtype=np.float64) * 100).astype(np.int64)
+
+
+def realized_pnl_paise(fills, positions=None):
+    """
+    Realized P&L of each fill in paise, booked at average cost like mtm_engine.PositionBook:
+    opening fills realize only their charges, reducing fills realize against the blended entry.
+    Fills must be in time order; `positions` ({symbol: (quantity, avg price in paise)}) carries
+    open positions from one call to the next.
+    """
+    positions = {} if positions is None else positions
+    realized = np.empty(len(fills))
+    rows = zip(fills['symbol'].tolist(), fills['side'].tolist(), fills['quantity'].tolist(),
+               _to_paise(fills['price']).tolist())
+    for i, (symbol, side, quantity, price) in enumerate(rows):
+        position, avg_price = positions.get(symbol, (0, 0.0))
+        pnl = 0.0
+        if position == 0 or (position > 0) == (side > 0):
+            held = abs(position)
+            avg_price = (avg_price * held + price * quantity) / (held + quantity)
+        else:
+            closed = min(abs(position), quantity)
+            pnl = closed * (price - avg_price) * (1 if position > 0 else -1)
+            if quantity > abs(position):
+                avg_price = float(price)  # Flipped: the remainder opens at the fill price
+            elif quantity == abs(position):
+                avg_price = 0.0
+        positions[symbol] = (position + side * quantity, avg_price)
+        realized[i] = pnl
+    
+    return np.rint(realized).astype(np.int64) - _to_paise(fills['charges'])
+
+
+def paise_to_rupees(paise):
+    """Convert paise back to rupees, keeping whole-rupee totals as integers"""
+    paise = int(paise)
+    return paise // 100 if paise % 100 == 0 else paise / 100
+
+
+class FillStore:
+    """Growable, array-backed store of fills with interned symbols"""
+    
+    def __init__(self, capacity=1024):
+        self._data = np.empty(capacity, dtype=FILL_DTYPE)
+        self._size = 0
+        self.symbols = []
+        self._symbol_codes = {}
+    
+    def __len__(self):
+        return self._size
+    
+    @property
+    def fills(self):
+        """View of the stored fills (no copy)"""
+        return self._data[:self._size]
+    
+    def intern_symbols(self, names):
+        """Map symbol names to stable integer codes"""
+        uniques, inverse = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+        codes = np.empty(len(uniques), dtype=np.int32)
+        for i, name in enumerate(uniques):
+            code = self._symbol_codes.get(name)
+            if code is None:
+                code = len(self.symbols)
+                self._symbol_codes[name] = code
+                self.symbols.append(name)
+            codes[i] = code
+        return codes[inverse]
+    
+    def append(self, fills):
+        """Append a FILL_DTYPE array, growing capacity geometrically"""
+        required = self._size + len(fills)
+        if required > len(self._data):
+            capacity = max(required, 2 * len(self._data))
+            grown = np.empty(capacity, dtype=FILL_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        
+        self._data[self._size:required] = fills
+        self._size = required
+
+
+class MonthlyPnLAggregator:
+    """Accumulate realized P&L per calendar month in exact paise"""
+    
+    def __init__(self):
+        self._totals = {}
+        self._positions = {}
+        self._last_timestamp = None
+    
+    def update(self, fills):
+        """Fold a chunk of fills into the running monthly totals; chunks must arrive in time order"""
+        if len(fills) == 0:
+            return
+        
+        fills = fills[np.argsort(fills['timestamp'], kind='stable')]
+        if self._last_timestamp is not None and fills['timestamp'][0] < self._last_timestamp:
+            raise ValueError(f"Contract note fills go back in time from {self._last_timestamp} to {fills['timestamp'][0]}; "
+                             "sort the note by trade time")
+        self._last_timestamp = fills['timestamp'][-1]
+        
+        # Open positions carry across chunks, so a trade closed next month is booked next month
+        realized = realized_pnl_paise(fills, self._positions)
+        months = fills['timestamp'].astype('datetime64[M]').astype(np.int64)
+        
+        keys, inverse = np.unique(months, return_inverse=True)
+        sums = np.rint(np.bincount(inverse, weights=realized, minlength=len(keys))).astype(np.int64)
+        
+        for key, total in zip(keys.tolist(), sums.tolist()):
+            self._totals[key] = self._totals.get(key, 0) + total
+    
+    def financial_years(self):
+        """FY start years present in the aggregated data"""
+        months = np.array(list(self._totals), dtype=np.int64).astype('datetime64[M]')
+        return sorted(set(financial_year_start(months).tolist()))
+    
+    def monthly_pnl(self, financial_year=None):
+        """Monthly P&L dict in FY order, shaped like trading_data.kotak_derivative"""
+        years = self.financial_years()
+        if not years:
+            return {}
+        
+        if financial_year is None:
+            if len(years) > 1:
+                raise ValueError(f"Data spans several financial years {[financial_year_label(y) for y in years]}; pass financial_year")
+            start_year = years[0]
+        else:
+            start_year = parse_financial_year(financial_year)
+        
+        # Month index 0 is April of the FY start year
+        first = int(fy_month_start(start_year, 0).astype(np.int64))
+        offsets = [key - first for key in self._totals if 0 <= key - first < 12]
+        if not offsets:
+            return {}
+        
+        return {FY_MONTHS[i]: paise_to_rupees(self._totals.get(first + i, 0)) for i in range(max(offsets) + 1)}
+
+
+def _parse_column(values, parse):
+    """Apply a scalar-heavy parser to the distinct values of a column only; blank cells are rejected"""
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Index(uniques).astype(str).str.strip()
+    
+    # factorize codes missing cells -1, which would otherwise index the last distinct value
+    blank = np.append(uniques == '', True)[codes]
+    if blank.any():
+        row = values.index[np.argmax(blank)]
+        raise ValueError(f"Blank {values.name!r} value in contract note data row {row + 1}")
+    return parse(uniques)[codes]
+
+
+def _parse_number(values, integer=False):
+    """Numeric column as float64; blank, non-numeric or (for integer columns) fractional cells are rejected"""
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    bad = ~np.isfinite(numbers)
+    if integer:
+        bad |= numbers != np.floor(numbers)
+    if bad.any():
+        i = int(np.argmax(bad))
+        value = values.iloc[i]
+        blank = pd.isna(value) or str(value).strip() == ''
+        problem = f"Blank {values.name!r} value" if blank else f"Invalid {values.name!r} value {value!r}"
+        raise ValueError(f"{problem} in contract note data row {values.index[i] + 1}")
+    return numbers
+
+
+def _parse_chunk(chunk, store):
+    """Parse one raw contract note chunk into a FILL_DTYPE array"""
+    cols = CONTRACT_NOTE_COLUMNS
+    
+    # Dates, times, sides and symbols repeat heavily, so parse each distinct value once
+    timestamp = _parse_column(chunk[cols['trade_date']], lambda u: pd.to_datetime(u, format=CONTRACT_NOTE_DATE_FORMAT).values.astype('datetime64[s]'))
+    if cols.get('trade_time') in chunk.columns:
+        timestamp = timestamp + _parse_column(chunk[cols['trade_time']], lambda u: (pd.to_datetime(u, format=CONTRACT_NOTE_TIME_FORMAT) - pd.Timestamp('1900-01-01')).values.astype('timedelta64[s]'))
+    
+    side = _parse_column(chunk[cols['side']], lambda u: u.str[0].str.upper().values)
+    if not np.isin(side, ['B', 'S']).all():
+        bad = chunk[cols['side']].values[~np.isin(side, ['B', 'S'])][0]
+        raise ValueError(f"Unrecognised Buy/Sell value in contract note: {bad!r}")
+    
+    fills = np.empty(len(chunk), dtype=FILL_DTYPE)
+    fills['timestamp'] = timestamp
+    fills['symbol'] = _parse_column(chunk[cols['symbol']], lambda u: store.intern_symbols(u.values))
+    fills['side'] = np.where(side == 'B', 1, -1)
+    fills['quantity'] = _parse_number(chunk[cols['quantity']], integer=True)
+    fills['price'] = _parse_number(chunk[cols['price']])
+    fills['charges'] = _parse_number(chunk[cols['charges']]) if cols.get('charges') in chunk.columns else 0.0
+    return fills
+
+
+def iter_contract_note(path, store=None, chunksize=INGEST_CHUNK_SIZE):
+    """Yield FILL_DTYPE chunks from a contract note CSV without loading it whole"""
+    store = store if store is not None else FillStore()
+    reader = pd.read_csv(path, chunksize=chunksize, thousands=',', dtype={CONTRACT_NOTE_COLUMNS['trade_date']: str})
+    for chunk in reader:
+        yield _parse_chunk(chunk, store)
+
+
+def load_contract_note(path, chunksize=INGEST_CHUNK_SIZE):
+    """Parse a whole contract note into a FillStore"""
+    store = FillStore()
+    for fills in iter_contract_note(path, store, chunksize):
+        store.append(fills)
+    return store
+
+
+def aggregate_monthly_pnl(path, financial_year=None, chunksize=INGEST_CHUNK_SIZE):
+    """Stream a contract note straight into monthly P&L (memory bounded by chunksize)"""
+    aggregator = MonthlyPnLAggregator()
+    for fills in iter_contract_note(path, chunksize=chunksize):
+        aggregator.update(fills)
+    return aggregator.monthly_pnl(financial_year)
+
+
+def write_sample_contract_note(path, monthly_pnl, financial_year='2025-26', symbol='NIFTY 25000 CE', quantity=100):
+    """Write a round-trip-per-month contract note that reproduces monthly_pnl exactly"""
+    cols = CONTRACT_NOTE_COLUMNS
+    start_year = parse_financial_year(financial_year)
+    entry_price = 500.0
+    
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([cols['trade_date'], cols['trade_time'], cols['symbol'], cols['side'],
+                         cols['quantity'], cols['price'], cols['charges']])
+        for month, pnl in monthly_pnl.items():
+            if pnl == 0:
+                continue
+            tenth = fy_month_start(start_year, FY_MONTH_CODES[month]).astype('datetime64[D]') + 9
+            date = tenth.astype(object).strftime(CONTRACT_NOTE_DATE_FORMAT)
+            exit_price = entry_price + pnl / quantity
+            writer.writerow([date, '09:20:00', symbol, 'B', quantity, f"{entry_price:.2f}", '0.00'])
+            writer.writerow([date, '15:10:00', symbol, 'S', quantity, f"{exit_price:.2f}", '0.00'])
\ No newline at end of file
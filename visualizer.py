@@ -1,295 +1,607 @@
-"""
-Visualization Module - DERIVATIVES ONLY
-Create clean, professional visualizations for derivatives trading
-"""
-
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-import seaborn as sns
-import numpy as np
-import pandas as pd
-from data_processor import TradingDataProcessor
-from analytics import TradingAnalytics
-from config import COLORS, CHART_STYLE, CHARTS_DIR
-import os
-
-plt.style.use('dark_background')
-sns.set_palette("husl")
-
-class TradingVisualizer:
-    """Create professional trading visualizations"""
-    
-    def __init__(self):
-        self.processor = TradingDataProcessor()
-        self.analytics = TradingAnalytics()
-        self.df = self.processor.create_monthly_dataframe()
-        self.colors = COLORS
-        self.style = CHART_STYLE
-        
-    def _apply_style(self, ax, title):
-        """Apply consistent styling"""
-        ax.set_title(title, fontsize=self.style['title_size'], fontweight='bold', pad=20, color=self.style['text_color'])
-        ax.set_facecolor(self.style['background_color'])
-        ax.tick_params(colors=self.style['text_color'], labelsize=self.style['font_size'])
-        ax.spines['bottom'].set_color(self.style['grid_color'])
-        ax.spines['left'].set_color(self.style['grid_color'])
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.grid(True, alpha=self.style['grid_alpha'], color=self.style['grid_color'], linestyle='--')
-        
-        for label in ax.get_xticklabels() + ax.get_yticklabels():
-            label.set_color(self.style['text_color'])
-    
-    def create_monthly_pnl_chart(self):
-        """Monthly P&L bar chart"""
-        fig, ax = plt.subplots(figsize=self.style['figure_size'], dpi=self.style['dpi'])
-        fig.patch.set_facecolor(self.style['background_color'])
-        
-        months = self.df['Month']
-        pnl = self.df['Derivative_PnL']
-        
-        colors_list = [self.colors['profit'] if p > 0 else self.colors['loss'] if p < 0 else self.colors['neutral'] for p in pnl]
-        
-        bars = ax.bar(months, pnl, color=colors_list, edgecolor='white', linewidth=1.5, width=0.7)
-        
-        # Add value labels
-        for bar, value in zip(bars, pnl):
-            if value != 0:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + (abs(height) * 0.05), 
-                       f'₹{value:,.0f}', ha='center', va='bottom' if value > 0 else 'top', 
-                       fontsize=10, fontweight='bold', color=self.style['text_color'])
-        
-        ax.axhline(y=0, color=self.style['grid_color'], linestyle='-', linewidth=2)
-        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax.set_ylabel('P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        
-        self._apply_style(ax, 'Monthly Derivatives Performance - Kotak Neo')
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(CHARTS_DIR, 'monthly_pnl.png'), facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
-        plt.close()
-        
-    def create_cumulative_pnl_chart(self):
-        """Cumulative P&L line chart"""
-        fig, ax = plt.subplots(figsize=self.style['figure_size'], dpi=self.style['dpi'])
-        fig.patch.set_facecolor(self.style['background_color'])
-        
-        months = self.df['Month']
-        cumulative = self.df['Cumulative_PnL']
-        
-        ax.plot(months, cumulative, marker='o', linewidth=3, markersize=12, color=self.colors['profit'], label='Cumulative P&L')
-        ax.fill_between(months, cumulative, alpha=0.3, color=self.colors['profit'])
-        
-        ax.axhline(y=0, color=self.colors['loss'], linestyle='--', linewidth=2, label='Break-even')
-        
-        # Annotate key points
-        for i, (month, value) in enumerate(zip(months, cumulative)):
-            if i % 2 == 0:  # Annotate every other month to avoid clutter
-                ax.annotate(f'₹{value:,.0f}', (month, value), textcoords="offset points", 
-                           xytext=(0,15), ha='center', fontsize=9, color=self.style['text_color'])
-        
-        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax.set_ylabel('Cumulative P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax.legend(fontsize=self.style['legend_size'], framealpha=0.9, facecolor=self.style['background_color'], edgecolor=self.colors['profit'])
-        
-        self._apply_style(ax, 'Trading Journey: Cumulative P&L Evolution')
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(CHARTS_DIR, 'cumulative_pnl.png'), facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
-        plt.close()
-    
-    def create_quarterly_comparison_chart(self):
-        """Quarterly comparison"""
-        quarterly = self.processor.get_quarterly_summary()
-        
-        fig, ax = plt.subplots(figsize=(12, 7), dpi=self.style['dpi'])
-        fig.patch.set_facecolor(self.style['background_color'])
-        
-        quarters = quarterly.index
-        pnl = quarterly['Total_PnL']
-        colors_list = [self.colors['loss'] if p < 0 else self.colors['profit'] for p in pnl]
-        
-        bars = ax.bar(quarters, pnl, color=colors_list, edgecolor='white', linewidth=2, width=0.6)
-        
-        for bar, value in zip(bars, pnl):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + (abs(height) * 0.05), 
-                   f'₹{value:,.0f}', ha='center', va='bottom' if value > 0 else 'top', 
-                   fontsize=13, fontweight='bold', color=self.style['text_color'])
-        
-        ax.axhline(y=0, color=self.style['grid_color'], linestyle='-', linewidth=2)
-        ax.set_xlabel('Quarter', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax.set_ylabel('Total P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        
-        self._apply_style(ax, 'Quarterly Performance: Q1 Learning → Q2 Systematic')
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(CHARTS_DIR, 'quarterly_comparison.png'), facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
-        plt.close()
-    
-    def create_learning_vs_systematic_chart(self):
-        """Learning phase vs systematic trading comparison"""
-        style_summary = self.processor.get_trading_style_summary()
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7), dpi=self.style['dpi'])
-        fig.patch.set_facecolor(self.style['background_color'])
-        
-        # P&L Comparison
-        styles = ['Q1\nLearning Phase', 'Q2\nSystematic Trading']
-        pnls = [style_summary['Learning']['total_pnl'], style_summary['Systematic']['total_pnl']]
-        colors_comp = [self.colors['learning'], self.colors['systematic']]
-        
-        bars1 = ax1.bar(styles, pnls, color=colors_comp, edgecolor='white', linewidth=2, width=0.6)
-        
-        for bar, value in zip(bars1, pnls):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height + (abs(height) * 0.05), 
-                    f'₹{value:,.0f}', ha='center', va='bottom' if value > 0 else 'top', 
-                    fontsize=13, fontweight='bold', color=self.style['text_color'])
-        
-        ax1.axhline(y=0, color=self.style['grid_color'], linestyle='-', linewidth=2)
-        ax1.set_ylabel('Total P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        self._apply_style(ax1, 'P&L Comparison')
-        
-        # Win Rate Comparison
-        win_rates = [style_summary['Learning']['win_rate'], style_summary['Systematic']['win_rate']]
-        bars2 = ax2.bar(styles, win_rates, color=colors_comp, edgecolor='white', linewidth=2, width=0.6)
-        
-        for bar, value in zip(bars2, win_rates):
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., height + 5, f'{value:.0f}%', 
-                    ha='center', va='bottom', fontsize=13, fontweight='bold', color=self.style['text_color'])
-        
-        ax2.set_ylabel('Win Rate (%)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax2.set_ylim(0, 110)
-        self._apply_style(ax2, 'Win Rate Comparison')
-        
-        fig.suptitle('Learning Phase vs Systematic Trading Evolution', fontsize=16, fontweight='bold', color=self.style['text_color'], y=0.98)
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(CHARTS_DIR, 'learning_vs_systematic.png'), facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
-        plt.close()
-    
-    def create_consistency_heatmap(self):
-        """Monthly consistency heatmap"""
-        fig, ax = plt.subplots(figsize=(14, 6), dpi=self.style['dpi'])
-        fig.patch.set_facecolor(self.style['background_color'])
-        
-        months = self.df['Month'].values
-        pnl = self.df['Derivative_PnL'].values
-        
-        data_matrix = pnl.reshape(1, -1)
-        
-        cmap = sns.diverging_palette(10, 130, as_cmap=True)
-        sns.heatmap(data_matrix, annot=True, fmt='.0f', cmap=cmap, center=0, 
-                   xticklabels=months, yticklabels=['P&L'], 
-                   cbar_kws={'label': 'P&L (₹)'}, linewidths=2, linecolor='white', 
-                   ax=ax, annot_kws={'fontsize': 11, 'fontweight': 'bold'})
-        
-        ax.set_title('Monthly Performance Heatmap', fontsize=self.style['title_size'], fontweight='bold', pad=20, color=self.style['text_color'])
-        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax.tick_params(colors=self.style['text_color'])
-        
-        cbar = ax.collections[0].colorbar
-        cbar.ax.tick_params(labelsize=self.style['font_size'], colors=self.style['text_color'])
-        cbar.set_label('P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'])
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(CHARTS_DIR, 'consistency_heatmap.png'), facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
-        plt.close()
-    
-    def create_win_loss_distribution(self):
-        """Win/loss distribution"""
-        traded_months = self.df[self.df['Total_PnL'] != 0]
-        
-        wins = len(traded_months[traded_months['Total_PnL'] > 0])
-        losses = len(traded_months[traded_months['Total_PnL'] < 0])
-        
-        fig, ax = plt.subplots(figsize=(10, 8), dpi=self.style['dpi'])
-        fig.patch.set_facecolor(self.style['background_color'])
-        
-        labels = ['Profitable Months', 'Loss Months']
-        sizes = [wins, losses]
-        colors_list = [self.colors['profit'], self.colors['loss']]
-        explode = (0.1, 0)
-        
-        wedges, texts, autotexts = ax.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%', 
-                                          startangle=90, colors=colors_list, textprops={'color': 'white', 'fontsize': 12})
-        
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-            autotext.set_fontsize(14)
-        
-        for text in texts:
-            text.set_fontsize(13)
-            text.set_fontweight('bold')
-        
-        ax.set_title('Win/Loss Month Distribution', fontsize=self.style['title_size'], fontweight='bold', pad=20, color=self.style['text_color'])
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(CHARTS_DIR, 'win_loss_distribution.png'), facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
-        plt.close()
-    
-    def create_drawdown_recovery_chart(self):
-        """Drawdown and recovery"""
-        fig, ax = plt.subplots(figsize=self.style['figure_size'], dpi=self.style['dpi'])
-        fig.patch.set_facecolor(self.style['background_color'])
-        
-        months = self.df['Month']
-        cumulative = self.df['Cumulative_PnL']
-        
-        running_max = np.maximum.accumulate(cumulative)
-        drawdown = cumulative - running_max
-        
-        ax.fill_between(months, 0, drawdown, color=self.colors['loss'], alpha=0.4, label='Drawdown')
-        ax.plot(months, drawdown, color=self.colors['loss'], linewidth=2, marker='o', markersize=8)
-        
-        ax.axhline(y=0, color=self.colors['profit'], linestyle='--', linewidth=2)
-        
-        min_dd_idx = np.argmin(drawdown)
-        ax.annotate(f'Max DD: ₹{drawdown.iloc[min_dd_idx]:,.0f}', 
-                   xy=(months.iloc[min_dd_idx], drawdown.iloc[min_dd_idx]), 
-                   xytext=(10, -30), textcoords='offset points', fontsize=11, fontweight='bold', 
-                   color=self.colors['loss'], 
-                   bbox=dict(boxstyle='round,pad=0.5', facecolor=self.style['background_color'], 
-                            edgecolor=self.colors['loss'], linewidth=2),
-                   arrowprops=dict(arrowstyle='->', color=self.colors['loss'], lw=2))
-        
-        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax.set_ylabel('Drawdown (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
-        ax.legend(fontsize=self.style['legend_size'], framealpha=0.9, facecolor=self.style['background_color'], edgecolor=self.colors['loss'])
-        
-        self._apply_style(ax, 'Drawdown Analysis & Recovery Path')
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(CHARTS_DIR, 'drawdown_recovery.png'), facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
-        plt.close()
-    
-    def generate_all_visualizations(self):
-        """Generate all visualizations"""
-        print("Generating visualizations...")
-        
-        self.create_monthly_pnl_chart()
-        print("✓ Monthly P&L chart created")
-        
-        self.create_cumulative_pnl_chart()
-        print("✓ Cumulative P&L chart created")
-        
-        self.create_quarterly_comparison_chart()
-        print("✓ Quarterly comparison chart created")
-        
-        self.create_learning_vs_systematic_chart()
-        print("✓ Learning vs Systematic chart created")
-        
-        self.create_consistency_heatmap()
-        print("✓ Consistency heatmap created")
-        
-        self.create_win_loss_distribution()
-        print("✓ Win/Loss distribution chart created")
-        
-        self.create_drawdown_recovery_chart()
-        print("✓ Drawdown recovery chart created")
-        
-        print(f"\n✅ All visualizations saved to: {CHARTS_DIR}")
\ No newline at end of file
+"""
+Visualization Module - DERIVATIVES ONLY
+Create clean, professional visualizations for derivatives trading
+"""
+
+import inspect
+import matplotlib
+import matplotlib.style
+from matplotlib.figure import Figure, SubplotParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.layout_engine import TightLayoutEngine
+import seaborn as sns
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from run_context import DashboardContext
+from chart_cache import ChartCache
+from instrumentation import timed, reset_stage_timings, get_stage_timings, merge_stage_timings
+from rolling_analytics import RollingAnalytics
+from tail_risk import TAIL_METHODS, level_suffix
+from stats import norm_pdf
+from config import (COLORS, CHART_STYLE, CHARTS_DIR, RENDER_WORKERS, CHART_CACHE, ROLLING_CHART_WINDOW,
+                    CHART_FORMAT, FIGURE_TEMPLATES, TAIL_RISK)
+import os
+
+# Global plotting style is applied on first use, not as an import side effect
+_plotting_configured = False
+
+
+def _configure_plotting():
+    """Apply the dashboard's matplotlib style and seaborn palette once per process"""
+    global _plotting_configured
+    if not _plotting_configured:
+        matplotlib.style.use('dark_background')
+        sns.set_palette("husl")
+        _plotting_configured = True
+
+
+# Chart methods in render order, with their output files and progress messages
+CHART_TASKS = [
+    ('create_monthly_pnl_chart', 'monthly_pnl.png', 'Monthly P&L chart'),
+    ('create_cumulative_pnl_chart', 'cumulative_pnl.png', 'Cumulative P&L chart'),
+    ('create_quarterly_comparison_chart', 'quarterly_comparison.png', 'Quarterly comparison chart'),
+    ('create_learning_vs_systematic_chart', 'learning_vs_systematic.png', 'Learning vs Systematic chart'),
+    ('create_consistency_heatmap', 'consistency_heatmap.png', 'Consistency heatmap'),
+    ('create_win_loss_distribution', 'win_loss_distribution.png', 'Win/Loss distribution chart'),
+    ('create_drawdown_recovery_chart', 'drawdown_recovery.png', 'Drawdown recovery chart'),
+    ('create_rolling_metrics_chart', 'rolling_metrics.png', 'Rolling metrics chart'),
+    ('create_tail_risk_chart', 'tail_risk.png', 'Tail risk chart')
+]
+
+# Output formats: raster files referenced by the report, or vector charts inlined into it
+CHART_FORMATS = ('png', 'svg')
+
+# Helpers shared by every chart; their source is part of each chart's cache key
+_SHARED_RENDER_HELPERS = ('_apply_style', '_new_figure', '_save_figure', 'chart_filename', '_template', '_rescale')
+
+# Styled figures reused across renders in this process, keyed by chart, categories and style (LRU order)
+_figure_templates = {}
+
+# Visualizer shared by every chart rendered in a pool worker process
+_worker_visualizer = None
+
+
+def _init_render_worker(visualizer):
+    """Process pool initializer: receive the visualizer once per worker"""
+    global _worker_visualizer
+    _configure_plotting()
+    _worker_visualizer = visualizer
+
+
+def _render_chart(method_name):
+    """Render one chart inside a pool worker; its stage timings travel back with the result"""
+    reset_stage_timings()
+    getattr(_worker_visualizer, method_name)()
+    return method_name, get_stage_timings()
+
+
+class TradingVisualizer:
+    """Create professional trading visualizations"""
+    
+    def __init__(self, charts_dir=None, context=None, chart_format=None):
+        _configure_plotting()
+        self.context = context if context is not None else DashboardContext()
+        self.processor = self.context.processor
+        self.analytics = self.context.analytics
+        self.df = self.context.df
+        self.colors = COLORS
+        self.style = CHART_STYLE
+        self.charts_dir = charts_dir or CHARTS_DIR
+        self.chart_format = chart_format or CHART_FORMAT
+        if self.chart_format not in CHART_FORMATS:
+            raise ValueError(f"Unknown chart format {self.chart_format!r}; expected one of {CHART_FORMATS}")
+    
+    def chart_filename(self, filename):
+        """CHART_TASKS file name with the extension of this visualizer's chart format"""
+        return f"{os.path.splitext(filename)[0]}.{self.chart_format}"
+    
+    def _new_figure(self, figsize, ncols=1):
+        """Create a standalone Agg figure, independent of pyplot's global state"""
+        fig = Figure(figsize=figsize, dpi=self.style['dpi'])
+        FigureCanvasAgg(fig)
+        fig.patch.set_facecolor(self.style['background_color'])
+        return fig, fig.subplots(1, ncols)
+    
+    def _save_figure(self, fig, filename):
+        """Lay out and write a figure into the charts directory"""
+        # Same as fig.tight_layout(), minus the engine swap that warns when a pooled figure is laid out again
+        TightLayoutEngine().execute(fig)
+        path = os.path.join(self.charts_dir, self.chart_filename(filename))
+        if self.chart_format == 'svg':
+            # Text stays <text> rather than glyph paths, and a fixed salt makes clip-path ids (and so
+            # the file) reproducible. No bbox_inches='tight': tight_layout already fits the axes,
+            # so the second layout pass is skipped
+            with matplotlib.rc_context({'svg.fonttype': 'none', 'svg.hashsalt': 'dashboard'}):
+                fig.savefig(path, format='svg', facecolor=self.style['background_color'], metadata={'Date': None})
+        else:
+            fig.savefig(path, facecolor=self.style['background_color'], dpi=150, bbox_inches='tight')
+    
+    def _chart_cache_key(self, method_name, filename):
+        """Cache key covering the chart's input data, styling and rendering code"""
+        cls = type(self)
+        names = (method_name, f"_build_{method_name[len('create_'):]}") + _SHARED_RENDER_HELPERS
+        code = [inspect.getsource(getattr(cls, name)) for name in names if hasattr(cls, name)]
+        data = pd.util.hash_pandas_object(self.df, index=True).values.tobytes()
+        return ChartCache.make_key(method_name, filename, data, list(self.df.columns),
+                                   sorted(self.style.items()), sorted(self.colors.items()),
+                                   ROLLING_CHART_WINDOW, sorted(TAIL_RISK.items()),
+                                   matplotlib.__version__, sns.__version__, *code)
+    
+    def _apply_style(self, ax, title):
+        """Apply consistent styling"""
+        ax.set_title(title, fontsize=self.style['title_size'], fontweight='bold', pad=20, color=self.style['text_color'])
+        ax.set_facecolor(self.style['background_color'])
+        ax.tick_params(colors=self.style['text_color'], labelsize=self.style['font_size'])
+        ax.spines['bottom'].set_color(self.style['grid_color'])
+        ax.spines['left'].set_color(self.style['grid_color'])
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.grid(True, alpha=self.style['grid_alpha'], color=self.style['grid_color'], linestyle='--')
+        
+        for label in ax.get_xticklabels() + ax.get_yticklabels():
+            label.set_color(self.style['text_color'])
+    
+    def _template(self, chart, key, figsize, build, ncols=1):
+        """
+        Styled figure for `chart` from the process-wide template pool. `build(fig, axes, key)` styles
+        a new figure and returns the data artists that every render of the chart then updates.
+        """
+        pool_key = (chart, key, figsize, ncols, tuple(sorted(self.style.items())), tuple(sorted(self.colors.items())))
+        template = _figure_templates.pop(pool_key, None) if FIGURE_TEMPLATES['enabled'] else None
+        if template is None:
+            fig, axes = self._new_figure(figsize, ncols)
+            template = (fig, axes, build(fig, axes, key))
+        else:
+            # Lay out from a new figure's subplot parameters so reused renders are reproducible
+            defaults = SubplotParams()
+            template[0].subplots_adjust(left=defaults.left, right=defaults.right, bottom=defaults.bottom,
+                                        top=defaults.top, wspace=defaults.wspace, hspace=defaults.hspace)
+        
+        if FIGURE_TEMPLATES['enabled']:
+            # Re-inserted last, so the first entry is always the least recently used
+            _figure_templates[pool_key] = template
+            while len(_figure_templates) > FIGURE_TEMPLATES['max_templates']:
+                del _figure_templates[next(iter(_figure_templates))]
+        return template
+    
+    @staticmethod
+    def _rescale(ax, fills=()):
+        """Refit the data limits after artist data changed; relim() does not cover fill_between collections"""
+        ax.relim()
+        for fill in fills:
+            ax.update_datalim(np.concatenate([path.vertices for path in fill.get_paths()]))
+        ax.autoscale_view()
+    
+    def _build_monthly_pnl_chart(self, fig, ax, months):
+        """Styled monthly axes with one bar and one value label per month"""
+        bars = ax.bar(months, np.zeros(len(months)), color=self.colors['neutral'], edgecolor='white', linewidth=1.5, width=0.7)
+        labels = [ax.text(bar.get_x() + bar.get_width()/2., 0, '', ha='center',
+                          fontsize=10, fontweight='bold', color=self.style['text_color']) for bar in bars]
+        
+        ax.axhline(y=0, color=self.style['grid_color'], linestyle='-', linewidth=2)
+        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.set_ylabel('P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        
+        self._apply_style(ax, 'Monthly Derivatives Performance - Kotak Neo')
+        return {'bars': bars, 'labels': labels}
+    
+    @timed
+    def create_monthly_pnl_chart(self):
+        """Monthly P&L bar chart"""
+        months = tuple(self.df['Month'])
+        pnl = self.df['Derivative_PnL']
+        
+        fig, ax, artists = self._template('monthly_pnl', months, self.style['figure_size'], self._build_monthly_pnl_chart)
+        
+        for bar, label, value in zip(artists['bars'], artists['labels'], pnl):
+            bar.set_height(value)
+            bar.set_facecolor(self.colors['profit'] if value > 0 else self.colors['loss'] if value < 0 else self.colors['neutral'])
+            
+            # Value labels on traded months only
+            label.set_visible(value != 0)
+            label.set_y(value + (abs(value) * 0.05))
+            label.set_text(f'₹{value:,.0f}')
+            label.set_verticalalignment('bottom' if value > 0 else 'top')
+        
+        self._rescale(ax)
+        self._save_figure(fig, 'monthly_pnl.png')
+    
+    def _build_cumulative_pnl_chart(self, fig, ax, months):
+        """Styled cumulative axes with the P&L line and a label on every other month"""
+        line, = ax.plot(months, np.zeros(len(months)), marker='o', linewidth=3, markersize=12, color=self.colors['profit'], label='Cumulative P&L')
+        
+        ax.axhline(y=0, color=self.colors['loss'], linestyle='--', linewidth=2, label='Break-even')
+        
+        # Annotate every other month to avoid clutter
+        annotations = [ax.annotate('', (month, 0), textcoords="offset points",
+                                   xytext=(0,15), ha='center', fontsize=9, color=self.style['text_color'])
+                       for month in months[::2]]
+        
+        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.set_ylabel('Cumulative P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.legend(fontsize=self.style['legend_size'], framealpha=0.9, facecolor=self.style['background_color'], edgecolor=self.colors['profit'])
+        
+        self._apply_style(ax, 'Trading Journey: Cumulative P&L Evolution')
+        return {'line': line, 'annotations': annotations, 'fill': None}
+    
+    @timed
+    def create_cumulative_pnl_chart(self):
+        """Cumulative P&L line chart"""
+        months = tuple(self.df['Month'])
+        cumulative = self.df['Cumulative_PnL'].values
+        
+        fig, ax, artists = self._template('cumulative_pnl', months, self.style['figure_size'], self._build_cumulative_pnl_chart)
+        
+        artists['line'].set_ydata(cumulative)
+        
+        # fill_between has no data setter, so its collection is replaced
+        if artists['fill'] is not None:
+            artists['fill'].remove()
+        artists['fill'] = ax.fill_between(months, cumulative, alpha=0.3, color=self.colors['profit'])
+        
+        for annotation, month, value in zip(artists['annotations'], months[::2], cumulative[::2]):
+            annotation.xy = (month, value)
+            annotation.set_text(f'₹{value:,.0f}')
+        
+        self._rescale(ax, [artists['fill']])
+        self._save_figure(fig, 'cumulative_pnl.png')
+    
+    def _build_quarterly_comparison_chart(self, fig, ax, quarters):
+        """Styled quarterly axes with one bar and one value label per quarter"""
+        bars = ax.bar(quarters, np.zeros(len(quarters)), color=self.colors['profit'], edgecolor='white', linewidth=2, width=0.6)
+        labels = [ax.text(bar.get_x() + bar.get_width()/2., 0, '', ha='center',
+                          fontsize=13, fontweight='bold', color=self.style['text_color']) for bar in bars]
+        
+        ax.axhline(y=0, color=self.style['grid_color'], linestyle='-', linewidth=2)
+        ax.set_xlabel('Quarter', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.set_ylabel('Total P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        
+        self._apply_style(ax, 'Quarterly Performance: Q1 Learning → Q2 Systematic')
+        return {'bars': bars, 'labels': labels}
+    
+    @timed
+    def create_quarterly_comparison_chart(self):
+        """Quarterly comparison"""
+        quarterly = self.processor.get_quarterly_summary()
+        
+        quarters = tuple(quarterly.index)
+        pnl = quarterly['Total_PnL']
+        
+        fig, ax, artists = self._template('quarterly_comparison', quarters, (12, 7), self._build_quarterly_comparison_chart)
+        
+        for bar, label, value in zip(artists['bars'], artists['labels'], pnl):
+            bar.set_height(value)
+            bar.set_facecolor(self.colors['loss'] if value < 0 else self.colors['profit'])
+            label.set_y(value + (abs(value) * 0.05))
+            label.set_text(f'₹{value:,.0f}')
+            label.set_verticalalignment('bottom' if value > 0 else 'top')
+        
+        self._rescale(ax)
+        self._save_figure(fig, 'quarterly_comparison.png')
+    
+    def _build_learning_vs_systematic_chart(self, fig, axes, key):
+        """Styled side-by-side P&L and win-rate axes for the two trading styles"""
+        ax1, ax2 = axes
+        styles = ['Q1\nLearning Phase', 'Q2\nSystematic Trading']
+        colors_comp = [self.colors['learning'], self.colors['systematic']]
+        
+        # P&L Comparison
+        bars1 = ax1.bar(styles, [0, 0], color=colors_comp, edgecolor='white', linewidth=2, width=0.6)
+        labels1 = [ax1.text(bar.get_x() + bar.get_width()/2., 0, '', ha='center',
+                            fontsize=13, fontweight='bold', color=self.style['text_color']) for bar in bars1]
+        
+        ax1.axhline(y=0, color=self.style['grid_color'], linestyle='-', linewidth=2)
+        ax1.set_ylabel('Total P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        self._apply_style(ax1, 'P&L Comparison')
+        
+        # Win Rate Comparison
+        bars2 = ax2.bar(styles, [0, 0], color=colors_comp, edgecolor='white', linewidth=2, width=0.6)
+        labels2 = [ax2.text(bar.get_x() + bar.get_width()/2., 0, '',
+                            ha='center', va='bottom', fontsize=13, fontweight='bold', color=self.style['text_color']) for bar in bars2]
+        
+        ax2.set_ylabel('Win Rate (%)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax2.set_ylim(0, 110)
+        self._apply_style(ax2, 'Win Rate Comparison')
+        
+        fig.suptitle('Learning Phase vs Systematic Trading Evolution', fontsize=16, fontweight='bold', color=self.style['text_color'], y=0.98)
+        return {'bars1': bars1, 'labels1': labels1, 'bars2': bars2, 'labels2': labels2}
+    
+    @timed
+    def create_learning_vs_systematic_chart(self):
+        """Learning phase vs systematic trading comparison"""
+        style_summary = self.processor.get_trading_style_summary()
+        
+        fig, (ax1, ax2), artists = self._template('learning_vs_systematic', None, (16, 7), self._build_learning_vs_systematic_chart, ncols=2)
+        
+        pnls = [style_summary['Learning']['total_pnl'], style_summary['Systematic']['total_pnl']]
+        for bar, label, value in zip(artists['bars1'], artists['labels1'], pnls):
+            bar.set_height(value)
+            label.set_y(value + (abs(value) * 0.05))
+            label.set_text(f'₹{value:,.0f}')
+            label.set_verticalalignment('bottom' if value > 0 else 'top')
+        
+        win_rates = [style_summary['Learning']['win_rate'], style_summary['Systematic']['win_rate']]
+        for bar, label, value in zip(artists['bars2'], artists['labels2'], win_rates):
+            bar.set_height(value)
+            label.set_y(value + 5)
+            label.set_text(f'{value:.0f}%')
+        
+        self._rescale(ax1)
+        self._save_figure(fig, 'learning_vs_systematic.png')
+    
+    @timed
+    def create_consistency_heatmap(self):
+        """Monthly consistency heatmap"""
+        fig, ax, artists = self._template('consistency_heatmap', None, (14, 6), lambda fig, ax, key: {})
+        
+        # seaborn owns the mesh, annotations and colorbar, so the previous render's are cleared and redrawn
+        if 'colorbar' in artists:
+            artists['colorbar'].remove()
+            ax.clear()
+        
+        months = self.df['Month'].values
+        pnl = self.df['Derivative_PnL'].values
+        
+        data_matrix = pnl.reshape(1, -1)
+        
+        cmap = sns.diverging_palette(10, 130, as_cmap=True)
+        sns.heatmap(data_matrix, annot=True, fmt='.0f', cmap=cmap, center=0,
+                   xticklabels=months, yticklabels=['P&L'],
+                   cbar_kws={'label': 'P&L (₹)'}, linewidths=2, linecolor='white',
+                   ax=ax, annot_kws={'fontsize': 11, 'fontweight': 'bold'})
+        
+        ax.set_title('Monthly Performance Heatmap', fontsize=self.style['title_size'], fontweight='bold', pad=20, color=self.style['text_color'])
+        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.tick_params(colors=self.style['text_color'])
+        
+        cbar = ax.collections[0].colorbar
+        cbar.ax.tick_params(labelsize=self.style['font_size'], colors=self.style['text_color'])
+        cbar.set_label('P&L (₹)', fontsize=self.style['label_size'], color=self.style['text_color'])
+        artists['colorbar'] = cbar
+        
+        self._save_figure(fig, 'consistency_heatmap.png')
+    
+    def _build_win_loss_distribution(self, fig, ax, key):
+        """Titled axes for the win/loss pie"""
+        ax.set_title('Win/Loss Month Distribution', fontsize=self.style['title_size'], fontweight='bold', pad=20, color=self.style['text_color'])
+        return {}
+    
+    @timed
+    def create_win_loss_distribution(self):
+        """Win/loss distribution"""
+        traded_months = self.df[self.df['Total_PnL'] != 0]
+        
+        wins = len(traded_months[traded_months['Total_PnL'] > 0])
+        losses = len(traded_months[traded_months['Total_PnL'] < 0])
+        
+        fig, ax, _ = self._template('win_loss_distribution', None, (10, 8), self._build_win_loss_distribution)
+        
+        # Wedge geometry depends on every size, so the previous render's pie is replaced
+        for artist in ax.patches + ax.texts:
+            artist.remove()
+        
+        labels = ['Profitable Months', 'Loss Months']
+        sizes = [wins, losses]
+        colors_list = [self.colors['profit'], self.colors['loss']]
+        explode = (0.1, 0)
+        
+        wedges, texts, autotexts = ax.pie(sizes, explode=explode, labels=labels, autopct='%1.1f%%',
+                                          startangle=90, colors=colors_list, textprops={'color': 'white', 'fontsize': 12})
+        
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+            autotext.set_fontsize(14)
+        
+        for text in texts:
+            text.set_fontsize(13)
+            text.set_fontweight('bold')
+        
+        self._save_figure(fig, 'win_loss_distribution.png')
+    
+    def _build_drawdown_recovery_chart(self, fig, ax, months):
+        """Styled drawdown axes with the drawdown line and the max-drawdown callout"""
+        line, = ax.plot(months, np.zeros(len(months)), color=self.colors['loss'], linewidth=2, marker='o', markersize=8)
+        
+        ax.axhline(y=0, color=self.colors['profit'], linestyle='--', linewidth=2)
+        
+        annotation = ax.annotate('',
+                   xy=(months[0], 0),
+                   xytext=(10, -30), textcoords='offset points', fontsize=11, fontweight='bold',
+                   color=self.colors['loss'],
+                   bbox=dict(boxstyle='round,pad=0.5', facecolor=self.style['background_color'],
+                            edgecolor=self.colors['loss'], linewidth=2),
+                   arrowprops=dict(arrowstyle='->', color=self.colors['loss'], lw=2))
+        
+        ax.set_xlabel('Month', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.set_ylabel('Drawdown (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        
+        self._apply_style(ax, 'Drawdown Analysis & Recovery Path')
+        return {'line': line, 'annotation': annotation, 'fill': None}
+    
+    @timed
+    def create_drawdown_recovery_chart(self):
+        """Drawdown and recovery"""
+        months = tuple(self.df['Month'])
+        cumulative = self.df['Cumulative_PnL'].values
+        
+        running_max = np.maximum.accumulate(cumulative)
+        drawdown = cumulative - running_max
+        
+        fig, ax, artists = self._template('drawdown_recovery', months, self.style['figure_size'], self._build_drawdown_recovery_chart)
+        
+        # fill_between has no data setter, so its collection is replaced; the legend keeps the first one's entry
+        if artists['fill'] is not None:
+            artists['fill'].remove()
+        artists['fill'] = ax.fill_between(months, 0, drawdown, color=self.colors['loss'], alpha=0.4, label='Drawdown')
+        if ax.get_legend() is None:
+            ax.legend(fontsize=self.style['legend_size'], framealpha=0.9, facecolor=self.style['background_color'], edgecolor=self.colors['loss'])
+        artists['line'].set_ydata(drawdown)
+        
+        min_dd_idx = np.argmin(drawdown)
+        artists['annotation'].xy = (months[min_dd_idx], drawdown[min_dd_idx])
+        artists['annotation'].set_text(f'Max DD: ₹{drawdown[min_dd_idx]:,.0f}')
+        
+        self._rescale(ax, [artists['fill']])
+        self._save_figure(fig, 'drawdown_recovery.png')
+    
+    def _build_rolling_metrics_chart(self, fig, axes, months):
+        """Styled Sharpe, win-rate and drawdown axes for the charted rolling window"""
+        window = ROLLING_CHART_WINDOW
+        ax1, ax2, ax3 = axes
+        placeholder = np.zeros(len(months))
+        
+        # Rolling Sharpe
+        sharpe, = ax1.plot(months, placeholder, marker='o', linewidth=2.5, markersize=9, color=self.colors['kotak_derivative'])
+        ax1.axhline(y=0, color=self.style['grid_color'], linestyle='-', linewidth=2)
+        ax1.set_ylabel('Sharpe Ratio', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        self._apply_style(ax1, f'Rolling Sharpe ({window}M)')
+        
+        # Rolling win rate
+        win_rate = ax2.bar(months, placeholder, color=self.colors['learning'], edgecolor='white', linewidth=1.5, width=0.6)
+        ax2.set_ylabel('Win Rate (%)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax2.set_ylim(0, 110)
+        self._apply_style(ax2, f'Rolling Win Rate ({window}M)')
+        
+        # Drawdown within the trailing window: current, and the deepest reached in the window
+        worst, = ax3.plot(months, placeholder, color=self.colors['loss'], linewidth=2, marker='o', markersize=7, label='Worst in window')
+        ax3.set_ylabel('Drawdown (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax3.legend(fontsize=self.style['legend_size'], framealpha=0.9, facecolor=self.style['background_color'], edgecolor=self.colors['loss'])
+        self._apply_style(ax3, f'Rolling Drawdown ({window}M)')
+        
+        fig.suptitle('Rolling Risk Metrics', fontsize=16, fontweight='bold', color=self.style['text_color'], y=0.98)
+        return {'sharpe': sharpe, 'win_rate': win_rate, 'worst': worst, 'fill': None}
+    
+    @timed
+    def create_rolling_metrics_chart(self):
+        """Rolling Sharpe, win rate, and current and worst drawdown within the trailing window"""
+        window = ROLLING_CHART_WINDOW
+        rolling = RollingAnalytics(self.df).calculate([window])
+        months = tuple(self.df['Month'])
+        
+        fig, (ax1, ax2, ax3), artists = self._template('rolling_metrics', months, (18, 6), self._build_rolling_metrics_chart, ncols=3)
+        
+        artists['sharpe'].set_ydata(rolling[f'rolling_sharpe_{window}'].values)
+        
+        win_rate = np.nan_to_num(rolling[f'rolling_win_rate_{window}'].values)
+        for bar, value in zip(artists['win_rate'], win_rate):
+            bar.set_height(value)
+            bar.set_facecolor(self.colors['profit'] if value >= 50 else self.colors['learning'])
+        
+        if artists['fill'] is not None:
+            artists['fill'].remove()
+        artists['fill'] = ax3.fill_between(months, 0, rolling[f'rolling_drawdown_{window}'].values, color=self.colors['loss'], alpha=0.4)
+        artists['worst'].set_ydata(rolling[f'rolling_max_drawdown_{window}'].values)
+        
+        self._rescale(ax1)
+        self._rescale(ax3, [artists['fill']])
+        self._save_figure(fig, 'rolling_metrics.png')
+    
+    def _build_tail_risk_chart(self, fig, ax, key):
+        """Styled tail axes: P&L histogram bars, the fitted normal density and a VaR/ES line pair per method"""
+        bins, confidence = key
+        level = level_suffix(confidence)
+        bars = ax.bar(np.zeros(bins), np.zeros(bins), width=1, align='edge', color=self.colors['neutral'], edgecolor='white', linewidth=1.5)
+        normal, = ax.plot([], [], color=self.style['text_color'], linewidth=2, alpha=0.7, label='Normal fit')
+        
+        # Dashed VaR and dotted Expected Shortfall lines, one color per method
+        method_colors = [self.colors['loss'], self.colors['learning'], self.colors['kotak_derivative']]
+        lines = {}
+        for method, color in zip(TAIL_METHODS, method_colors):
+            name = method.replace('_', ' ').title()
+            lines[method] = (ax.axvline(0, color=color, linestyle='--', linewidth=2, label=f'{name} VaR {level}%'),
+                             ax.axvline(0, color=color, linestyle=':', linewidth=2, label=f'{name} ES {level}%'))
+        
+        ax.set_xlabel('P&L per Period (₹)', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.set_ylabel('Periods', fontsize=self.style['label_size'], color=self.style['text_color'], fontweight='bold')
+        ax.legend(fontsize=self.style['legend_size'], framealpha=0.9, facecolor=self.style['background_color'], edgecolor=self.colors['loss'])
+        
+        self._apply_style(ax, f'Tail Risk: P&L Distribution, VaR and Expected Shortfall at {level}%')
+        return {'bars': bars, 'normal': normal, 'lines': lines}
+    
+    @timed
+    def create_tail_risk_chart(self):
+        """Traded P&L histogram with historical, parametric and filtered-historical VaR/ES at the headline level"""
+        risk = self.context.tail_risk
+        confidence = risk['confidence_levels'][0]
+        pnl = self.df['Total_PnL'].values
+        traded = pnl[pnl != 0]
+        
+        fig, ax, artists = self._template('tail_risk', (TAIL_RISK['histogram_bins'], confidence), self.style['figure_size'],
+                                          self._build_tail_risk_chart)
+        
+        counts, edges = np.histogram(traded, bins=TAIL_RISK['histogram_bins'])
+        for bar, count, left, right in zip(artists['bars'], counts, edges[:-1], edges[1:]):
+            bar.set_x(left)
+            bar.set_width(right - left)
+            bar.set_height(count)
+            bar.set_facecolor(self.colors['loss'] if right <= 0 else self.colors['profit'] if left >= 0 else self.colors['neutral'])
+        
+        results = {method: risk['methods'][method][confidence] for method in TAIL_METHODS}
+        for method, (var_line, es_line) in artists['lines'].items():
+            var_line.set_xdata([-results[method]['var']] * 2)
+            es_line.set_xdata([-results[method]['expected_shortfall']] * 2)
+        
+        # Normal density in periods per bin, drawn out to the deepest tail line
+        if risk['volatility'] > 0:
+            deepest = max(max(result.values()) for result in results.values())
+            x = np.linspace(min(edges[0], -deepest), edges[-1], 200)
+            density = len(traded) * (edges[1] - edges[0]) * norm_pdf((x - risk['mean']) / risk['volatility']) / risk['volatility']
+            artists['normal'].set_data(x, density)
+        else:
+            artists['normal'].set_data([], [])
+        
+        self._rescale(ax)
+        self._save_figure(fig, 'tail_risk.png')
+    
+    def chart_keys(self):
+        """Cache key of every CHART_TASKS chart, by chart method"""
+        return {name: self._chart_cache_key(name, self.chart_filename(filename)) for name, filename, _ in CHART_TASKS}
+    
+    def generate_all_visualizations(self, workers=None, use_cache=None, charts=None):
+        """
+        Generate all visualizations (or only the CHART_TASKS methods in `charts`), reusing cached
+        charts and optionally rendering across a process pool
+        """
+        workers = RENDER_WORKERS if workers is None else workers
+        use_cache = CHART_CACHE['enabled'] if use_cache is None else use_cache
+        print("Generating visualizations...")
+        os.makedirs(self.charts_dir, exist_ok=True)
+        
+        cache = ChartCache() if use_cache else None
+        messages = {name: message for name, _, message in CHART_TASKS}
+        tasks = CHART_TASKS if charts is None else [task for task in CHART_TASKS if task[0] in charts]
+        pending = []
+        keys = {}
+        
+        for name, filename, message in tasks:
+            filename = self.chart_filename(filename)
+            if cache is not None:
+                keys[name] = self._chart_cache_key(name, filename)
+                if cache.fetch(keys[name], os.path.join(self.charts_dir, filename)):
+                    print(f"✓ {message} reused from cache")
+                    continue
+            pending.append(name)
+        
+        if workers > 1 and len(pending) > 1:
+            # Each chart is an independent Agg figure, so workers share no pyplot state
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker, initargs=(self,)) as pool:
+                rendered = pool.map(_render_chart, pending)
+                for name, timings in rendered:
+                    merge_stage_timings(timings)
+                    print(f"✓ {messages[name]} created")
+        else:
+            for name in pending:
+                getattr(self, name)()
+                print(f"✓ {messages[name]} created")
+        
+        if cache is not None:
+            filenames = {name: self.chart_filename(filename) for name, filename, _ in CHART_TASKS}
+            for name in pending:
+                cache.store(keys[name], os.path.join(self.charts_dir, filenames[name]))
+            cache.evict()
+            self.cache_report = cache.report()
+            print(f"\n♻️ Chart cache: {self.cache_report['hits']} reused, {self.cache_report['misses']} rendered")
+        
+        print(f"\n✅ All visualizations saved to: {self.charts_dir}")
\ No newline at end of file